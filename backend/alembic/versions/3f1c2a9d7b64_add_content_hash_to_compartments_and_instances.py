@@ -0,0 +1,36 @@
+"""add content_hash to compartments and instances
+
+Revision ID: 3f1c2a9d7b64
+Revises: 15b7965b718e
+Create Date: 2026-10-17 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9d7b64"
+down_revision: Union[str, None] = "15b7965b718e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable: linhas existentes ficam sem hash e são reescritas uma única vez
+    # no próximo sync, que passa a gravar o fingerprint.
+    op.add_column(
+        "compartments",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "instances",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("instances", "content_hash")
+    op.drop_column("compartments", "content_hash")
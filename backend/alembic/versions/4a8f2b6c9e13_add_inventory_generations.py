@@ -0,0 +1,32 @@
+"""add inventory_generations
+
+Revision ID: 4a8f2b6c9e13
+Revises: c71d5e0f3a28
+Create Date: 2026-10-17 12:02:41.730915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4a8f2b6c9e13"
+down_revision: Union[str, None] = "c71d5e0f3a28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_generations",
+        sa.Column("tenancy_ocid", sa.String(length=255), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("tenancy_ocid"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_generations")
@@ -0,0 +1,41 @@
+"""add subtree path pattern indexes
+
+Revision ID: 5d8f1b3a7e64
+Revises: 9c3e7a1d5b82
+Create Date: 2026-10-17 15:22:07.861349
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8f1b3a7e64"
+down_revision: Union[str, None] = "9c3e7a1d5b82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Prefixo (LIKE 'path/%') indexável mesmo em bancos com collation != C
+    op.create_index(
+        "ix_compartments_path_pattern",
+        "compartments",
+        ["path"],
+        unique=False,
+        postgresql_ops={"path": "text_pattern_ops"},
+    )
+    op.create_index(
+        "ix_instances_compartment_path_pattern",
+        "instances",
+        ["compartment_path_cache"],
+        unique=False,
+        postgresql_ops={"compartment_path_cache": "text_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_instances_compartment_path_pattern", table_name="instances")
+    op.drop_index("ix_compartments_path_pattern", table_name="compartments")
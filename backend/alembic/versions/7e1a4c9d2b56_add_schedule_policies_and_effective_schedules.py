@@ -0,0 +1,157 @@
+"""add compartment_schedule_policies and instance_effective_schedules
+
+Revision ID: 7e1a4c9d2b56
+Revises: b6e2c8f4a019
+Create Date: 2026-10-17 17:02:19.604412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7e1a4c9d2b56"
+down_revision: Union[str, None] = "b6e2c8f4a019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "compartment_schedule_policies",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("compartment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("managed", sa.Boolean(), nullable=False),
+        sa.Column("default_start_cron", sa.String(length=64), nullable=True),
+        sa.Column("default_stop_cron", sa.String(length=64), nullable=True),
+        sa.Column("timezone", sa.String(length=64), nullable=False),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["compartment_id"],
+            ["compartments.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_compartment_schedule_policies_compartment_id"),
+        "compartment_schedule_policies",
+        ["compartment_id"],
+        unique=True,
+    )
+
+    op.create_table(
+        "instance_effective_schedules",
+        sa.Column("instance_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("policy_compartment_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("managed", sa.Boolean(), nullable=False),
+        sa.Column("protection_flag", sa.Boolean(), nullable=False),
+        sa.Column("default_start_cron", sa.String(length=64), nullable=True),
+        sa.Column("default_stop_cron", sa.String(length=64), nullable=True),
+        sa.Column("timezone", sa.String(length=64), nullable=False),
+        sa.Column("next_start_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("next_stop_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["instance_id"],
+            ["instances.id"],
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["policy_compartment_id"],
+            ["compartments.id"],
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("instance_id"),
+    )
+    op.create_index(
+        "ix_instance_effective_schedules_next_start_at",
+        "instance_effective_schedules",
+        ["next_start_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+    op.create_index(
+        "ix_instance_effective_schedules_next_stop_at",
+        "instance_effective_schedules",
+        ["next_stop_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+
+    # Ainda não há políticas: o agendamento efetivo é a própria configuração,
+    # com os próximos disparos já calculados (nenhum disparo pendente se perde)
+    op.execute(
+        """
+        INSERT INTO instance_effective_schedules (
+            instance_id, source, managed, protection_flag, default_start_cron,
+            default_stop_cron, timezone, next_start_at, next_stop_at, updated_at
+        )
+        SELECT instance_id, 'instance', managed, protection_flag, default_start_cron,
+               default_stop_cron, timezone, next_start_at, next_stop_at, now()
+        FROM instance_configs
+        """
+    )
+
+    op.drop_index("ix_instance_configs_next_stop_at", table_name="instance_configs")
+    op.drop_index("ix_instance_configs_next_start_at", table_name="instance_configs")
+    op.drop_column("instance_configs", "next_stop_at")
+    op.drop_column("instance_configs", "next_start_at")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "instance_configs",
+        sa.Column("next_start_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "instance_configs",
+        sa.Column("next_stop_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_instance_configs_next_start_at",
+        "instance_configs",
+        ["next_start_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+    op.create_index(
+        "ix_instance_configs_next_stop_at",
+        "instance_configs",
+        ["next_stop_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+
+    # Só os disparos da própria configuração voltam; os herdados de políticas se perdem
+    op.execute(
+        """
+        UPDATE instance_configs c
+        SET next_start_at = e.next_start_at,
+            next_stop_at = e.next_stop_at
+        FROM instance_effective_schedules e
+        WHERE e.instance_id = c.instance_id
+          AND e.source = 'instance'
+        """
+    )
+
+    op.drop_index(
+        "ix_instance_effective_schedules_next_stop_at",
+        table_name="instance_effective_schedules",
+    )
+    op.drop_index(
+        "ix_instance_effective_schedules_next_start_at",
+        table_name="instance_effective_schedules",
+    )
+    op.drop_table("instance_effective_schedules")
+    op.drop_index(
+        op.f("ix_compartment_schedule_policies_compartment_id"),
+        table_name="compartment_schedule_policies",
+    )
+    op.drop_table("compartment_schedule_policies")
@@ -0,0 +1,55 @@
+"""add next fire times to instance_configs
+
+Revision ID: 9b4e61d2c0a7
+Revises: 3f1c2a9d7b64
+Create Date: 2026-10-17 10:05:48.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b4e61d2c0a7"
+down_revision: Union[str, None] = "3f1c2a9d7b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "instance_configs",
+        sa.Column("next_start_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "instance_configs",
+        sa.Column("next_stop_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    # Índices parciais: o tick só olha configurações gerenciadas
+    op.create_index(
+        "ix_instance_configs_next_start_at",
+        "instance_configs",
+        ["next_start_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+    op.create_index(
+        "ix_instance_configs_next_stop_at",
+        "instance_configs",
+        ["next_stop_at"],
+        unique=False,
+        postgresql_where=sa.text("managed"),
+    )
+
+    # As colunas nascem vazias: popular com
+    #   python -m app.cli scheduler-recompute
+
+
+def downgrade() -> None:
+    op.drop_index("ix_instance_configs_next_stop_at", table_name="instance_configs")
+    op.drop_index("ix_instance_configs_next_start_at", table_name="instance_configs")
+    op.drop_column("instance_configs", "next_stop_at")
+    op.drop_column("instance_configs", "next_start_at")
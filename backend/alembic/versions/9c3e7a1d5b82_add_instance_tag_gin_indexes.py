@@ -0,0 +1,43 @@
+"""add instance tag gin indexes
+
+Revision ID: 9c3e7a1d5b82
+Revises: e2b9d4f7a561
+Create Date: 2026-10-17 14:05:41.518220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3e7a1d5b82"
+down_revision: Union[str, None] = "e2b9d4f7a561"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Containment (@>) por tag; jsonb_path_ops só indexa pares caminho/valor
+    op.create_index(
+        "ix_instances_freeform_tags",
+        "instances",
+        ["freeform_tags"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"freeform_tags": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_instances_defined_tags",
+        "instances",
+        ["defined_tags"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"defined_tags": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_instances_defined_tags", table_name="instances")
+    op.drop_index("ix_instances_freeform_tags", table_name="instances")
@@ -0,0 +1,45 @@
+"""add effective schedule flag indexes
+
+Revision ID: a3c7e1f9b248
+Revises: d4f8a2c6e913
+Create Date: 2026-10-17 21:12:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c7e1f9b248"
+down_revision: Union[str, None] = "d4f8a2c6e913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # EXISTS / NOT EXISTS dos filtros managed e protection_flag da listagem
+    op.create_index(
+        "ix_instance_effective_schedules_managed_instance",
+        "instance_effective_schedules",
+        ["managed", "instance_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_instance_effective_schedules_protection_instance",
+        "instance_effective_schedules",
+        ["protection_flag", "instance_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_instance_effective_schedules_protection_instance",
+        table_name="instance_effective_schedules",
+    )
+    op.drop_index(
+        "ix_instance_effective_schedules_managed_instance",
+        table_name="instance_effective_schedules",
+    )
@@ -0,0 +1,62 @@
+"""add compartment_rollups
+
+Revision ID: b6e2c8f4a019
+Revises: 5d8f1b3a7e64
+Create Date: 2026-10-17 16:10:52.340187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e2c8f4a019"
+down_revision: Union[str, None] = "5d8f1b3a7e64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Preenchida no próximo sync de cada tenancy (rebuild quando não há linhas)
+    op.create_table(
+        "compartment_rollups",
+        sa.Column("compartment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("tenancy_ocid", sa.String(length=255), nullable=False),
+        sa.Column("direct_total", sa.Integer(), nullable=False),
+        sa.Column("direct_running", sa.Integer(), nullable=False),
+        sa.Column("direct_stopped", sa.Integer(), nullable=False),
+        sa.Column("direct_starting", sa.Integer(), nullable=False),
+        sa.Column("direct_stopping", sa.Integer(), nullable=False),
+        sa.Column("direct_provisioning", sa.Integer(), nullable=False),
+        sa.Column("direct_managed", sa.Integer(), nullable=False),
+        sa.Column("direct_protected", sa.Integer(), nullable=False),
+        sa.Column("subtree_total", sa.Integer(), nullable=False),
+        sa.Column("subtree_running", sa.Integer(), nullable=False),
+        sa.Column("subtree_stopped", sa.Integer(), nullable=False),
+        sa.Column("subtree_starting", sa.Integer(), nullable=False),
+        sa.Column("subtree_stopping", sa.Integer(), nullable=False),
+        sa.Column("subtree_provisioning", sa.Integer(), nullable=False),
+        sa.Column("subtree_managed", sa.Integer(), nullable=False),
+        sa.Column("subtree_protected", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["compartment_id"],
+            ["compartments.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("compartment_id"),
+    )
+    op.create_index(
+        op.f("ix_compartment_rollups_tenancy_ocid"),
+        "compartment_rollups",
+        ["tenancy_ocid"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_compartment_rollups_tenancy_ocid"), table_name="compartment_rollups")
+    op.drop_table("compartment_rollups")
@@ -0,0 +1,75 @@
+"""add instance_actions queue
+
+Revision ID: c71d5e0f3a28
+Revises: 9b4e61d2c0a7
+Create Date: 2026-10-17 11:20:03.551870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c71d5e0f3a28"
+down_revision: Union[str, None] = "9b4e61d2c0a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "instance_actions",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("instance_id", sa.UUID(), nullable=False),
+        sa.Column("action", sa.String(length=16), nullable=False),
+        sa.Column("source", sa.String(length=16), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("lease_owner", sa.String(length=128), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["instance_id"], ["instances.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "instance_id",
+            "action",
+            "scheduled_at",
+            name="uq_instance_actions_instance_action_scheduled",
+        ),
+    )
+    op.create_index(
+        op.f("ix_instance_actions_instance_id"),
+        "instance_actions",
+        ["instance_id"],
+        unique=False,
+    )
+
+    # Índices parciais consultados pelo claim dos workers
+    op.create_index(
+        "ix_instance_actions_pending",
+        "instance_actions",
+        ["available_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index(
+        "ix_instance_actions_running_lease",
+        "instance_actions",
+        ["lease_expires_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_instance_actions_running_lease", table_name="instance_actions")
+    op.drop_index("ix_instance_actions_pending", table_name="instance_actions")
+    op.drop_index(op.f("ix_instance_actions_instance_id"), table_name="instance_actions")
+    op.drop_table("instance_actions")
@@ -0,0 +1,58 @@
+"""add sync_runs
+
+Revision ID: d4f8a2c6e913
+Revises: 7e1a4c9d2b56
+Create Date: 2026-10-17 18:40:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f8a2c6e913"
+down_revision: Union[str, None] = "7e1a4c9d2b56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_runs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("tenancy_ocid", sa.String(length=255), nullable=True),
+        sa.Column("region", sa.String(length=64), nullable=True),
+        sa.Column("trigger", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_seconds", sa.Float(), nullable=True),
+        sa.Column("phase_seconds", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("row_counts", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("oci_calls", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("failed_regions", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("generation", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_sync_runs_tenancy_started",
+        "sync_runs",
+        ["tenancy_ocid", "started_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sync_runs_started",
+        "sync_runs",
+        ["started_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_runs_started", table_name="sync_runs")
+    op.drop_index("ix_sync_runs_tenancy_started", table_name="sync_runs")
+    op.drop_table("sync_runs")
@@ -0,0 +1,53 @@
+"""add instance listing indexes
+
+Revision ID: e2b9d4f7a561
+Revises: 4a8f2b6c9e13
+Create Date: 2026-10-17 12:48:19.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9d4f7a561"
+down_revision: Union[str, None] = "4a8f2b6c9e13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset (display_name, id) com o filtro de igualdade na frente
+    op.create_index(
+        "ix_instances_active_name_id",
+        "instances",
+        ["is_active", "display_name", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_instances_lifecycle_name_id",
+        "instances",
+        ["lifecycle_state", "display_name", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_instances_region_name_id",
+        "instances",
+        ["region", "display_name", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_instances_shape_name_id",
+        "instances",
+        ["shape", "display_name", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_instances_shape_name_id", table_name="instances")
+    op.drop_index("ix_instances_region_name_id", table_name="instances")
+    op.drop_index("ix_instances_lifecycle_name_id", table_name="instances")
+    op.drop_index("ix_instances_active_name_id", table_name="instances")
@@ -0,0 +1,51 @@
+"""split effective schedule timezone per cron
+
+Revision ID: f5a9c3e7b214
+Revises: a3c7e1f9b248
+Create Date: 2026-10-17 23:40:12.118407
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5a9c3e7b214"
+down_revision: Union[str, None] = "a3c7e1f9b248"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "instance_effective_schedules",
+        sa.Column("start_timezone", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "instance_effective_schedules",
+        sa.Column("stop_timezone", sa.String(length=64), nullable=True),
+    )
+    # Mantém o comportamento atual; as linhas que herdam só um dos CRONs da
+    # política são corrigidas pelo comando ``effective-schedules-refresh``
+    op.execute(
+        """
+        UPDATE instance_effective_schedules
+        SET start_timezone = timezone, stop_timezone = timezone
+        """
+    )
+    op.alter_column("instance_effective_schedules", "start_timezone", nullable=False)
+    op.alter_column("instance_effective_schedules", "stop_timezone", nullable=False)
+    op.drop_column("instance_effective_schedules", "timezone")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "instance_effective_schedules",
+        sa.Column("timezone", sa.String(length=64), nullable=True),
+    )
+    op.execute("UPDATE instance_effective_schedules SET timezone = start_timezone")
+    op.alter_column("instance_effective_schedules", "timezone", nullable=False)
+    op.drop_column("instance_effective_schedules", "stop_timezone")
+    op.drop_column("instance_effective_schedules", "start_timezone")
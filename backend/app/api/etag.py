@@ -0,0 +1,59 @@
+# app/api/etag.py
+
+"""
+Helpers de ETag / GET condicional (If-None-Match -> 304 Not Modified).
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Navegadores/clients devem revalidar sempre (com If-None-Match), mas podem
+# reaproveitar o corpo quando a resposta for 304
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """ETag forte (entre aspas) a partir das partes que versionam a resposta."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True se o header If-None-Match contém ``etag`` (ou ``*``).
+
+    Usa comparação fraca (RFC 9110, 13.1.2): ``W/"x"`` casa com ``"x"``. Um
+    proxy que comprime a resposta (ex: gzip no nginx) enfraquece o ETag, e o
+    client passa a mandar a versão ``W/``.
+    """
+    if not if_none_match:
+        return False
+
+    target = _opaque_tag(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque_tag(candidate) == target:
+            return True
+    return False
+
+
+def _opaque_tag(etag: str) -> str:
+    """ETag sem o prefixo de validador fraco ``W/``."""
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """Resposta 304 se o request já tem a versão ``etag``; senão None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+    return None
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
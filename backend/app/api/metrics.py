@@ -0,0 +1,140 @@
+# backend/app/api/metrics.py
+
+import logging
+import time
+
+from fastapi import APIRouter, Response
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.metrics import (
+    CONTENT_TYPE_LATEST,
+    HTTP_LATENCY_BUCKETS,
+    register_collector,
+    render_metrics,
+)
+from app.db.session import SessionLocal
+from app.services.sync_runs import get_last_success_times
+
+logger = logging.getLogger(__name__)
+
+# Métodos usados como label; qualquer outro vira "OTHER" (cardinalidade fixa)
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+# Label de rota para requests que não casaram com nenhuma rota (404)
+_UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "stopstart_http_requests",
+    "Requests HTTP atendidos, por método, rota e status.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "stopstart_http_request_duration_seconds",
+    "Latência dos requests HTTP por método e rota (template do path).",
+    ["method", "route"],
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "stopstart_http_requests_in_progress",
+    "Requests HTTP em andamento, por método.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+router = APIRouter()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware, que copia o corpo e cria
+    tasks por request): mede latência, status e requests em andamento.
+
+    A rota é o template do path (``/api/v1/instances/{instance_id}/config``),
+    lido de ``scope["route"]`` depois que o roteamento do FastAPI rodou, para
+    não criar uma série por ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = getattr(scope.get("route"), "path", None) or _UNMATCHED_ROUTE
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, status_code).inc()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """
+    Métricas no formato texto do Prometheus.
+
+    Com vários workers, só agrega todos eles com ``PROMETHEUS_MULTIPROC_DIR``
+    definido (ver :mod:`app.core.metrics`); sem ele, cada scrape mostra os
+    contadores do worker que o atendeu.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+class SyncLastSuccessCollector:
+    """
+    Último sync concluído por tenancy, lido de sync_runs a cada scrape: o sync
+    roda em outro processo (CLI/scheduler), cuja memória a API não vê, e o
+    valor é o mesmo em qualquer worker.
+    """
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        timestamps = GaugeMetricFamily(
+            "stopstart_sync_last_success_timestamp_seconds",
+            "Unix timestamp do último sync concluído (com commit) da tenancy.",
+            labels=["tenancy"],
+        )
+        ages = GaugeMetricFamily(
+            "stopstart_sync_last_success_age_seconds",
+            "Segundos desde o último sync concluído (com commit) da tenancy.",
+            labels=["tenancy"],
+        )
+        try:
+            db = SessionLocal()
+            try:
+                finished = get_last_success_times(db)
+            finally:
+                db.close()
+        except Exception:
+            # Banco fora do ar não derruba o /metrics inteiro
+            logger.exception("Erro ao ler o último sync concluído para /metrics")
+            finished = {}
+
+        now = time.time()
+        for tenancy_ocid, finished_at in finished.items():
+            timestamp = finished_at.timestamp()
+            timestamps.add_metric([tenancy_ocid], timestamp)
+            ages.add_metric([tenancy_ocid], now - timestamp)
+        yield timestamps
+        yield ages
+
+
+register_collector(SyncLastSuccessCollector())
@@ -1,204 +1,448 @@
-from typing import Optional, List
+from dataclasses import dataclass, field
+from typing import Annotated, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, literal, literal_column, null, select, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import Session, aliased
 
-from app.api.deps import get_db
-from app.models.tenancy import Tenancy
+from app.api.etag import make_etag, not_modified_response, set_etag
+from app.core.config import get_settings
+from app.db.session import get_db
 from app.models.compartment import Compartment
 from app.models.instance import Instance
-from app.models.instance_config import InstanceConfig
+from app.models.compartment_rollup import CompartmentRollup
+from app.models.instance_effective_schedule import InstanceEffectiveSchedule
 from app.schemas.compartment_navigation import (
     CompartmentNavigationResponse,
     CompartmentBase,
     CompartmentBreadcrumb,
+    CompartmentChild,
+    CompartmentCounts,
+    CompartmentRollupCounts,
+    InstanceSchedule,
     InstanceWithConfig,
 )
+from app.services.compartment_rollups import ROLLUP_COUNTERS, get_compartment_rollups
+from app.services.compartment_tree_cache import (
+    CompartmentNode,
+    CompartmentTreeSnapshot,
+    InstanceNode,
+    tree_cache,
+)
+from app.services.inventory_generation import get_inventory_generation
 
 router = APIRouter(prefix="/tenancies/{tenancy_id}/compartments", tags=["compartments"])
 
+DbSessionDep = Annotated[Session, Depends(get_db)]
 
-def _get_tenancy_or_404(db: Session, tenancy_id):
-    tenancy = db.query(Tenancy).filter(Tenancy.id == tenancy_id).first()
-    if not tenancy:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tenancy não encontrada",
-        )
-    return tenancy
+# Limite de profundidade da subida recursiva (o OCI permite até 6 níveis;
+# a margem protege contra ciclos em dados inconsistentes)
+_MAX_TREE_DEPTH = 64
 
 
-def _get_root_compartment(db: Session, tenancy_id):
+@dataclass
+class _NavigationTree:
+    """Compartment atual com ancestrais e filhos, resolvidos em uma consulta."""
+    current: CompartmentBase
+    breadcrumbs: List[CompartmentBreadcrumb] = field(default_factory=list)
+    parent: Optional[CompartmentBase] = None
+    children: List[CompartmentBase] = field(default_factory=list)
+
+
+def _get_navigation_tree(
+    db: Session,
+    tenancy_id: str,
+    compartment_ocid: Optional[str] = None,
+) -> _NavigationTree:
     """
-    Considerando que o root compartment é aquele com parent_ocid == None
-    dentro da tenancy. Ajuste se na sua modelagem for diferente.
+    Resolve compartment atual, trilha até a raiz, pai e filhos em um único
+    round trip:
+
+    - um ``WITH RECURSIVE`` sobe por ``parent_id`` a partir do compartment
+      (ou da raiz da tenancy, se ``compartment_ocid`` for None), numerando a
+      profundidade (0 = atual, 1 = pai, ...);
+    - um ``UNION ALL`` traz os filhos ativos do compartment atual.
+
+    O custo fica constante em número de consultas, independente da
+    profundidade da árvore.
     """
-    root = (
-        db.query(Compartment)
-        .filter(
-            Compartment.tenancy_id == tenancy_id,
-            Compartment.parent_ocid.is_(None),
+    anchor_filter = (
+        Compartment.compartment_ocid == compartment_ocid
+        if compartment_ocid is not None
+        else Compartment.is_tenancy_root.is_(True)
+    )
+
+    ancestry = (
+        select(
+            Compartment.id,
+            Compartment.parent_id,
+            Compartment.compartment_ocid,
+            Compartment.name,
+            Compartment.description,
+            literal(0).label("depth"),
+        )
+        .where(
+            Compartment.tenancy_ocid == tenancy_id,
+            Compartment.is_active.is_(True),
+            anchor_filter,
         )
-        .first()
+        .cte("ancestry", recursive=True)
     )
-    if not root:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Root compartment não encontrado para esta tenancy",
+
+    ancestor = aliased(Compartment)
+    ancestry = ancestry.union_all(
+        select(
+            ancestor.id,
+            ancestor.parent_id,
+            ancestor.compartment_ocid,
+            ancestor.name,
+            ancestor.description,
+            ancestry.c.depth + 1,
         )
-    return root
+        .join(ancestry, ancestor.id == ancestry.c.parent_id)
+        .where(ancestry.c.depth < _MAX_TREE_DEPTH)
+    )
 
+    current_id = select(ancestry.c.id).where(ancestry.c.depth == 0).scalar_subquery()
+
+    query = union_all(
+        select(
+            literal("ancestor").label("kind"),
+            ancestry.c.depth,
+            ancestry.c.id,
+            ancestry.c.compartment_ocid,
+            ancestry.c.name,
+            ancestry.c.description,
+        ),
+        select(
+            literal("child").label("kind"),
+            null(),
+            Compartment.id,
+            Compartment.compartment_ocid,
+            Compartment.name,
+            Compartment.description,
+        ).where(
+            Compartment.parent_id == current_id,
+            Compartment.is_active.is_(True),
+        ),
+    )
 
-def _get_compartment_or_404(db: Session, tenancy_id, compartment_ocid: str):
-    compartment = (
-        db.query(Compartment)
-        .filter(
-            Compartment.tenancy_id == tenancy_id,
-            Compartment.ocid == compartment_ocid,
+    ancestors: List[Tuple[int, CompartmentBase]] = []
+    children: List[CompartmentBase] = []
+    for row in db.execute(query).all():
+        item = CompartmentBase(
+            id=row.id,
+            ocid=row.compartment_ocid,
+            name=row.name,
+            description=row.description,
         )
-        .first()
-    )
-    if not compartment:
+        if row.kind == "ancestor":
+            ancestors.append((row.depth, item))
+        else:
+            children.append(item)
+
+    if not ancestors:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Compartment não encontrado para esta tenancy",
+            detail=(
+                "Compartment não encontrado para esta tenancy"
+                if compartment_ocid is not None
+                else "Root compartment não encontrado para esta tenancy"
+            ),
         )
-    return compartment
 
+    # da raiz até o atual
+    ancestors.sort(key=lambda pair: pair[0], reverse=True)
+    chain = [item for _, item in ancestors]
+    children.sort(key=lambda c: c.name)
 
-def _build_breadcrumbs(db: Session, tenancy_id, compartment: Compartment) -> List[CompartmentBreadcrumb]:
-    """
-    Sobe na hierarquia a partir do compartment atual até o root,
-    montando a trilha (root -> ... -> current).
-    """
-    breadcrumbs: List[CompartmentBreadcrumb] = []
+    return _NavigationTree(
+        current=chain[-1],
+        breadcrumbs=[CompartmentBreadcrumb(ocid=c.ocid, name=c.name) for c in chain],
+        parent=chain[-2] if len(chain) > 1 else None,
+        children=children,
+    )
 
-    current = compartment
-    visited = set()
 
-    while current is not None and current.ocid not in visited:
-        visited.add(current.ocid)
-        breadcrumbs.append(
-            CompartmentBreadcrumb(
-                ocid=current.ocid,
-                name=current.name,
-            )
+def _get_instances_with_config(
+    db: Session,
+    compartment: CompartmentBase,
+) -> List[InstanceWithConfig]:
+    """
+    Retorna as instâncias do nível atual, incluindo o agendamento efetivo
+    (linha já resolvida: CRON próprio ou política herdada do compartment).
+    Sem agendamento efetivo, assume managed=False e protection_flag=False.
+    """
+    # LEFT OUTER JOIN InstanceEffectiveSchedule
+    query = (
+        db.query(Instance, InstanceEffectiveSchedule)
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .filter(
+            Instance.compartment_id == compartment.id,
+            Instance.is_active.is_(True),
         )
+        .order_by(Instance.display_name.asc())
+    )
 
-        if current.parent_ocid is None:
-            break
+    results: List[InstanceWithConfig] = []
 
-        current = (
-            db.query(Compartment)
-            .filter(
-                Compartment.tenancy_id == tenancy_id,
-                Compartment.ocid == current.parent_ocid,
+    for instance, schedule in query.all():
+        results.append(
+            InstanceWithConfig(
+                id=instance.id,
+                ocid=instance.instance_ocid,
+                display_name=instance.display_name,
+                lifecycle_state=instance.lifecycle_state,
+                region=instance.region,
+                availability_domain=instance.availability_domain,
+                managed=bool(schedule.managed) if schedule else False,
+                protection_flag=bool(schedule.protection_flag) if schedule else False,
+                schedule=InstanceSchedule.model_validate(schedule) if schedule else None,
             )
-            .first()
         )
 
-    # invertendo para ficar da raiz até o atual
-    breadcrumbs.reverse()
-    return breadcrumbs
-
+    return results
 
-def _get_parent(db: Session, tenancy_id, compartment: Compartment) -> Optional[Compartment]:
-    if compartment.parent_ocid is None:
-        return None
 
-    return (
-        db.query(Compartment)
-        .filter(
-            Compartment.tenancy_id == tenancy_id,
-            Compartment.ocid == compartment.parent_ocid,
-        )
-        .first()
+def _compartment_from_node(node: CompartmentNode) -> CompartmentBase:
+    return CompartmentBase(
+        id=node.id,
+        ocid=node.ocid,
+        name=node.name,
+        description=node.description,
     )
 
 
-def _get_children(db: Session, tenancy_id, compartment: Compartment) -> List[Compartment]:
-    return (
-        db.query(Compartment)
-        .filter(
-            Compartment.tenancy_id == tenancy_id,
-            Compartment.parent_ocid == compartment.ocid,
+def _navigation_tree_from_snapshot(
+    snapshot: CompartmentTreeSnapshot,
+    compartment_ocid: Optional[str] = None,
+) -> _NavigationTree:
+    """Monta a navegação a partir da snapshot em memória (sem consultar o banco)."""
+    ocid = compartment_ocid if compartment_ocid is not None else snapshot.root_ocid
+    if ocid not in snapshot.nodes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Compartment não encontrado para esta tenancy",
         )
-        .order_by(Compartment.name.asc())
-        .all()
+
+    parent = snapshot.parent_of(ocid)
+    return _NavigationTree(
+        current=_compartment_from_node(snapshot.nodes[ocid]),
+        breadcrumbs=[
+            CompartmentBreadcrumb(ocid=a, name=snapshot.nodes[a].name)
+            for a in snapshot.ancestry[ocid]
+        ],
+        parent=_compartment_from_node(parent) if parent else None,
+        children=[_compartment_from_node(snapshot.nodes[c]) for c in snapshot.children[ocid]],
     )
 
 
-def _get_instances_with_config(
+def _get_instances_from_snapshot(
     db: Session,
-    tenancy_id,
-    compartment: Compartment,
+    instance_nodes: Tuple[InstanceNode, ...],
 ) -> List[InstanceWithConfig]:
     """
-    Retorna as instâncias do nível atual, incluindo flags de InstanceConfig.
-    Caso não exista InstanceConfig, assume managed=False e protection_flag=False.
+    Instâncias do nível atual a partir da snapshot; só os campos voláteis
+    (lifecycle_state e agendamento efetivo) são lidos do banco, por PK.
     """
-    # LEFT OUTER JOIN InstanceConfig
-    query = (
-        db.query(Instance, InstanceConfig)
-        .outerjoin(InstanceConfig, InstanceConfig.instance_id == Instance.id)
-        .filter(
-            Instance.tenancy_id == tenancy_id,
-            Instance.compartment_ocid == compartment.ocid,
-        )
-        .order_by(Instance.display_name.asc())
+    if not instance_nodes:
+        return []
+
+    rows = (
+        db.query(Instance.id, Instance.lifecycle_state, InstanceEffectiveSchedule)
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .filter(Instance.id.in_([node.id for node in instance_nodes]))
+        .all()
     )
+    volatile = {row.id: row for row in rows}
 
     results: List[InstanceWithConfig] = []
-
-    for instance, config in query.all():
+    for node in instance_nodes:
+        row = volatile.get(node.id)
+        schedule = row.InstanceEffectiveSchedule if row else None
         results.append(
             InstanceWithConfig(
-                id=instance.id,
-                ocid=instance.ocid,
-                display_name=instance.display_name,
-                lifecycle_state=instance.lifecycle_state,
-                region=getattr(instance, "region", None),
-                availability_domain=getattr(instance, "availability_domain", None),
-                managed=bool(getattr(config, "managed", False)) if config else False,
-                protection_flag=bool(
-                    getattr(config, "protection_flag", False)
-                )
-                if config
-                else False,
+                id=node.id,
+                ocid=node.ocid,
+                display_name=node.display_name,
+                lifecycle_state=row.lifecycle_state if row else None,
+                region=node.region,
+                availability_domain=node.availability_domain,
+                managed=bool(schedule.managed) if schedule else False,
+                protection_flag=bool(schedule.protection_flag) if schedule else False,
+                schedule=InstanceSchedule.model_validate(schedule) if schedule else None,
             )
         )
 
     return results
 
 
+def _instances_version(db: Session, *criteria) -> Tuple:
+    """
+    Versão das linhas voláteis do nível (instâncias + agendamentos efetivos),
+    em uma consulta agregada que não carrega nenhuma linha: quantidade de
+    cada tabela e um hash dos ``xmin`` (id da transação que gravou a versão
+    atual da linha) de todas as linhas. Cobre lifecycle_state (gravado pelo
+    executor de ações), mudanças de configuração/política que alteram o
+    agendamento efetivo e os próximos disparos avançados pelo tick.
+
+    Não usa ``max(updated_at)``: o ``now()`` do Postgres é o início da
+    transação, e uma transação que começou antes mas commitou depois grava um
+    valor abaixo do máximo atual (o ETag não mudaria e o client receberia um
+    304 desatualizado). O ``xmin`` muda a cada escrita commitada da linha,
+    seja qual for a ordem dos commits.
+    """
+    instance_xmin = literal_column(f"{Instance.__tablename__}.xmin::text")
+    schedule_xmin = literal_column(f"{InstanceEffectiveSchedule.__tablename__}.xmin::text")
+    row_version = func.concat_ws(":", Instance.id, instance_xmin, schedule_xmin)
+    row = (
+        db.query(
+            func.count(Instance.id),
+            func.count(InstanceEffectiveSchedule.instance_id),
+            func.md5(func.string_agg(row_version, aggregate_order_by(literal(","), Instance.id))),
+        )
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .filter(*criteria)
+        .one()
+    )
+    return tuple(row)
+
+
+def _rollups_version(children: List[CompartmentBase], rollups: Dict) -> Tuple:
+    """
+    Versão dos rollups dos filhos: os próprios contadores (são exatamente o
+    que a resposta serve), sem depender do updated_at das linhas.
+    """
+    version = []
+    for child in children:
+        rollup = rollups.get(child.id)
+        if rollup is None:
+            version.append((child.id,))
+            continue
+        version.append(
+            (child.id,)
+            + tuple(getattr(rollup, f"direct_{name}") for name in ROLLUP_COUNTERS)
+            + tuple(getattr(rollup, f"subtree_{name}") for name in ROLLUP_COUNTERS)
+        )
+    return tuple(version)
+
+
+def _child_with_rollup(
+    child: CompartmentBase,
+    rollup: Optional[CompartmentRollup],
+) -> CompartmentChild:
+    counts = None
+    if rollup is not None:
+        counts = CompartmentRollupCounts(
+            direct=CompartmentCounts(
+                **{name: getattr(rollup, f"direct_{name}") for name in ROLLUP_COUNTERS}
+            ),
+            subtree=CompartmentCounts(
+                **{name: getattr(rollup, f"subtree_{name}") for name in ROLLUP_COUNTERS}
+            ),
+        )
+    return CompartmentChild(**child.model_dump(), rollup=counts)
+
+
+def _snapshot_or_404(snapshot: Optional[CompartmentTreeSnapshot]) -> CompartmentTreeSnapshot:
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Root compartment não encontrado para esta tenancy",
+        )
+    return snapshot
+
+
+def _build_navigation_response(
+    db: Session,
+    request: Request,
+    response: Response,
+    tenancy_id: str,
+    compartment_ocid: Optional[str] = None,
+    snapshot: Optional[CompartmentTreeSnapshot] = None,
+):
+    """
+    Monta a navegação com ETag forte (geração do inventário + versão das
+    instâncias/configurações do nível + versão dos rollups dos filhos). Se o
+    ``If-None-Match`` do request bater, responde 304 antes de carregar ou
+    serializar as instâncias.
+
+    Os contadores dos filhos vêm da tabela materializada de rollups, em uma
+    única consulta por PK (sem uma consulta por filho).
+
+    :param snapshot: snapshot já obtida do cache (rotas async, ver
+                     ``CompartmentTreeCache.get_async``); None = busca aqui
+    """
+    use_cache = get_settings().COMPARTMENT_TREE_CACHE_ENABLED
+
+    if use_cache:
+        # Estrutura da árvore vem da snapshot em memória; o banco só é
+        # consultado para a geração e para os campos voláteis das instâncias
+        snapshot = _snapshot_or_404(snapshot or tree_cache.get(db, tenancy_id))
+        generation = snapshot.generation
+        tree = _navigation_tree_from_snapshot(snapshot, compartment_ocid)
+        instance_nodes = snapshot.instances.get(tree.current.ocid, ())
+        version = (
+            _instances_version(db, Instance.id.in_([node.id for node in instance_nodes]))
+            if instance_nodes
+            else ()
+        )
+    else:
+        generation = get_inventory_generation(db, tenancy_id)
+        tree = _get_navigation_tree(db, tenancy_id, compartment_ocid)
+        version = _instances_version(
+            db,
+            Instance.compartment_id == tree.current.id,
+            Instance.is_active.is_(True),
+        )
+
+    rollups = get_compartment_rollups(db, [child.id for child in tree.children])
+    etag = make_etag(
+        "navigation",
+        tenancy_id,
+        generation,
+        tree.current.ocid,
+        *version,
+        _rollups_version(tree.children, rollups),
+    )
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    if use_cache:
+        instances = _get_instances_from_snapshot(db, instance_nodes)
+    else:
+        instances = _get_instances_with_config(db, tree.current)
+
+    set_etag(response, etag)
+    return CompartmentNavigationResponse(
+        tenancy_id=tenancy_id,
+        current=tree.current,
+        breadcrumbs=tree.breadcrumbs,
+        parent=tree.parent,
+        children=[_child_with_rollup(child, rollups.get(child.id)) for child in tree.children],
+        instances=instances,
+    )
+
+
 @router.get(
     "/root",
     response_model=CompartmentNavigationResponse,
     summary="Navegação no root compartment da tenancy",
 )
 def get_root_compartment_navigation(
-    tenancy_id: int,  # ou str/UUID
-    db: Session = Depends(get_db),
+    tenancy_id: str,  # OCID da tenancy
+    request: Request,
+    response: Response,
+    db: DbSessionDep,
 ):
     """
     Retorna a navegação hierárquica a partir do root compartment da tenancy.
-    """
-    tenancy = _get_tenancy_or_404(db, tenancy_id)
-    root_compartment = _get_root_compartment(db, tenancy_id)
 
-    breadcrumbs = _build_breadcrumbs(db, tenancy_id, root_compartment)
-    parent = _get_parent(db, tenancy_id, root_compartment)
-    children = _get_children(db, tenancy_id, root_compartment)
-    instances = _get_instances_with_config(db, tenancy_id, root_compartment)
-
-    return CompartmentNavigationResponse(
-        tenancy_id=tenancy.id,
-        current=CompartmentBase.from_orm(root_compartment),
-        breadcrumbs=breadcrumbs,
-        parent=CompartmentBase.from_orm(parent) if parent else None,
-        children=[CompartmentBase.from_orm(c) for c in children],
-        instances=instances,
-    )
+    Suporta GET condicional (ETag / If-None-Match -> 304).
+    """
+    return _build_navigation_response(db, request, response, tenancy_id)
 
 
 @router.get(
@@ -207,26 +451,15 @@ def get_root_compartment_navigation(
     summary="Navegação em um compartment específico",
 )
 def get_compartment_navigation(
-    tenancy_id: int,  # ou str/UUID
+    tenancy_id: str,  # OCID da tenancy
     compartment_ocid: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: DbSessionDep,
 ):
     """
     Retorna a navegação hierárquica para um compartment específico.
-    """
-    tenancy = _get_tenancy_or_404(db, tenancy_id)
-    compartment = _get_compartment_or_404(db, tenancy_id, compartment_ocid)
-
-    breadcrumbs = _build_breadcrumbs(db, tenancy_id, compartment)
-    parent = _get_parent(db, tenancy_id, compartment)
-    children = _get_children(db, tenancy_id, compartment)
-    instances = _get_instances_with_config(db, tenancy_id, compartment)
 
-    return CompartmentNavigationResponse(
-        tenancy_id=tenancy.id,
-        current=CompartmentBase.from_orm(compartment),
-        breadcrumbs=breadcrumbs,
-        parent=CompartmentBase.from_orm(parent) if parent else None,
-        children=[CompartmentBase.from_orm(c) for c in children],
-        instances=instances,
-    )
+    Suporta GET condicional (ETag / If-None-Match -> 304).
+    """
+    return _build_navigation_response(db, request, response, tenancy_id, compartment_ocid)
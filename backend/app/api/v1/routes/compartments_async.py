@@ -0,0 +1,77 @@
+# app/api/v1/routes/compartments_async.py
+
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.routes.compartments import _build_navigation_response, _snapshot_or_404
+from app.core.config import get_settings
+from app.db.session import get_async_db
+from app.schemas.compartment_navigation import CompartmentNavigationResponse
+from app.services.compartment_tree_cache import CompartmentTreeSnapshot, tree_cache
+
+# Versão async das rotas de compartments.py (DATABASE_ASYNC_ENABLED=true):
+# mesmos paths, schemas e ETags; a montagem roda via run_sync sobre asyncpg.
+# Só o I/O de banco é async: a montagem da navegação (CPU) roda na thread do
+# event loop e bloqueia os outros requests do worker enquanto executa
+router = APIRouter(prefix="/tenancies/{tenancy_id}/compartments", tags=["compartments"])
+
+AsyncDbSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+async def _navigation(
+    db: AsyncSession,
+    request: Request,
+    response: Response,
+    tenancy_id: str,
+    compartment_ocid: Optional[str] = None,
+):
+    snapshot: Optional[CompartmentTreeSnapshot] = None
+    if get_settings().COMPARTMENT_TREE_CACHE_ENABLED:
+        snapshot = _snapshot_or_404(await tree_cache.get_async(db, tenancy_id))
+
+    return await db.run_sync(
+        lambda session: _build_navigation_response(
+            session, request, response, tenancy_id, compartment_ocid, snapshot
+        )
+    )
+
+
+@router.get(
+    "/root",
+    response_model=CompartmentNavigationResponse,
+    summary="Navegação no root compartment da tenancy",
+)
+async def get_root_compartment_navigation(
+    tenancy_id: str,  # OCID da tenancy
+    request: Request,
+    response: Response,
+    db: AsyncDbSessionDep,
+):
+    """
+    Retorna a navegação hierárquica a partir do root compartment da tenancy.
+
+    Suporta GET condicional (ETag / If-None-Match -> 304).
+    """
+    return await _navigation(db, request, response, tenancy_id)
+
+
+@router.get(
+    "/{compartment_ocid}",
+    response_model=CompartmentNavigationResponse,
+    summary="Navegação em um compartment específico",
+)
+async def get_compartment_navigation(
+    tenancy_id: str,  # OCID da tenancy
+    compartment_ocid: str,
+    request: Request,
+    response: Response,
+    db: AsyncDbSessionDep,
+):
+    """
+    Retorna a navegação hierárquica para um compartment específico.
+
+    Suporta GET condicional (ETag / If-None-Match -> 304).
+    """
+    return await _navigation(db, request, response, tenancy_id, compartment_ocid)
@@ -1,8 +1,44 @@
-from fastapi import APIRouter
+import logging
+from dataclasses import asdict
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db.pool_metrics import get_pool_stats
+from app.db.session import get_db
+from app.services.leader_election import get_leaders
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+DbSessionDep = Annotated[Session, Depends(get_db)]
+
 
 @router.get("/health", summary="Healthcheck da API")
-async def healthcheck():
-    return {"status": "ok"}
+def healthcheck(db: DbSessionDep):
+    """
+    Healthcheck da API.
+
+    Inclui o líder atual de cada job singleton (tick do scheduler, sync de
+    inventário) e há quanto tempo ele segura o lock, e os contadores dos
+    pools de conexão deste processo (espera de checkout, conexões em uso).
+    """
+    pools = {name: stats.snapshot() for name, stats in get_pool_stats().items()}
+
+    try:
+        leaders = get_leaders(db)
+    except SQLAlchemyError:
+        logger.exception("Erro ao consultar líderes no healthcheck")
+        return {"status": "degraded", "database": "unavailable", "leaders": None, "db_pools": pools}
+
+    return {
+        "status": "ok",
+        "leaders": {
+            job: asdict(info) if info is not None else None
+            for job, info in leaders.items()
+        },
+        "db_pools": pools,
+    }
@@ -0,0 +1,91 @@
+# app/api/v1/routes/instance_actions.py
+
+import logging
+from typing import Annotated, List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.instance import Instance
+from app.models.instance_action import InstanceAction
+from app.schemas.instance_action import InstanceActionCreate, InstanceActionResponse
+from app.services.action_queue import enqueue_manual_action
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DbSessionDep = Annotated[Session, Depends(get_db)]
+
+
+def _get_active_instance_or_404(db: Session, instance_id: UUID) -> Instance:
+    instance = (
+        db.query(Instance)
+        .filter(Instance.id == instance_id, Instance.is_active.is_(True))
+        .first()
+    )
+    if not instance:
+        logger.info("Instância não encontrada ao acessar ações: %s", instance_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instance not found",
+        )
+    return instance
+
+
+@router.post(
+    "/instances/{instance_id}/actions",
+    response_model=InstanceActionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_instance_action(
+    instance_id: UUID,
+    payload: InstanceActionCreate,
+    db: DbSessionDep,
+) -> InstanceActionResponse:
+    """
+    Enfileira uma ação manual (START/STOP/SOFTSTOP/RESET) para a instância.
+
+    A ação é executada de forma assíncrona pelos workers da fila
+    (``python -m app.cli action-worker``), com as mesmas regras do scheduler:
+    instâncias não gerenciadas e ações de stop em instâncias protegidas são
+    ignoradas (status "skipped").
+    """
+    instance = _get_active_instance_or_404(db, instance_id)
+
+    row = enqueue_manual_action(db, instance.id, payload.action)
+    db.commit()
+
+    logger.info(
+        "Ação manual %s enfileirada para a instância %s (InstanceAction.id=%s)",
+        payload.action,
+        instance.id,
+        row.id,
+    )
+    return InstanceActionResponse.model_validate(row)
+
+
+@router.get(
+    "/instances/{instance_id}/actions",
+    response_model=List[InstanceActionResponse],
+)
+def list_instance_actions(
+    instance_id: UUID,
+    db: DbSessionDep,
+    limit: int = Query(20, ge=1, le=200),
+) -> List[InstanceActionResponse]:
+    """
+    Lista as ações mais recentes da instância (mais novas primeiro).
+    """
+    instance = _get_active_instance_or_404(db, instance_id)
+
+    rows = (
+        db.query(InstanceAction)
+        .filter(InstanceAction.instance_id == instance.id)
+        .order_by(InstanceAction.created_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [InstanceActionResponse.model_validate(row) for row in rows]
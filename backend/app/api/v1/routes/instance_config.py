@@ -4,21 +4,48 @@ import logging
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.etag import make_etag, not_modified_response, set_etag
+from app.core.config import get_settings
 from app.db.session import get_db
 from app.models.instance import Instance
 from app.models.instance_config import InstanceConfig
 from app.schemas.instance_config import (
+    InstanceConfigBulkItemResult,
+    InstanceConfigBulkRequest,
+    InstanceConfigBulkResponse,
     InstanceConfigResponse,
     InstanceConfigUpdate,
+    InstanceSelector,
 )
+from app.models.instance_effective_schedule import InstanceEffectiveSchedule
+from app.services.compartment_rollups import refresh_compartment_rollups
+from app.services.effective_schedules import (
+    get_effective_schedules,
+    refresh_effective_schedules,
+)
+from app.services.instance_config_bulk import (
+    BulkConfigItem,
+    bulk_upsert_instance_configs,
+    select_instance_ids,
+)
+from app.services.instance_query import (
+    InstanceFilters,
+    parse_tag_predicate,
+    resolve_compartment_path,
+    validate_tag_predicates,
+)
+from app.services.scheduler import validate_schedule
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Campos validados antes de gravar (CRON/timezone)
+_SCHEDULE_FIELDS = {"default_start_cron", "default_stop_cron", "timezone"}
+
 DbSessionDep = Annotated[Session, Depends(get_db)]
 
 
@@ -37,12 +64,49 @@ def _get_instance_or_404(db: Session, instance_id: UUID) -> Instance:
     return instance
 
 
+def _config_etag(
+    instance_id: UUID,
+    cfg: InstanceConfig | None,
+    schedule: InstanceEffectiveSchedule | None,
+) -> str:
+    """
+    ETag da configuração: o updated_at da linha versiona os campos próprios;
+    o do agendamento efetivo, os próximos disparos (que mudam a cada tick e
+    com a política herdada). Sem linhas, a resposta é o default e só depende
+    da instância.
+    """
+    return make_etag(
+        "instance-config",
+        instance_id,
+        cfg.id if cfg is not None else "default",
+        cfg.updated_at.isoformat() if cfg is not None else None,
+        schedule.updated_at.isoformat() if schedule is not None else None,
+    )
+
+
+def _config_response(
+    cfg: InstanceConfig,
+    schedule: InstanceEffectiveSchedule | None,
+) -> InstanceConfigResponse:
+    result = InstanceConfigResponse.model_validate(cfg)
+    return result.model_copy(
+        update={
+            "configurado": True,
+            "schedule_source": schedule.source if schedule is not None else None,
+            "next_start_at": schedule.next_start_at if schedule is not None else None,
+            "next_stop_at": schedule.next_stop_at if schedule is not None else None,
+        }
+    )
+
+
 @router.get(
     "/instances/{instance_id}/config",
     response_model=InstanceConfigResponse,
 )
 def get_instance_config(
     instance_id: UUID,
+    request: Request,
+    response: Response,
     db: DbSessionDep,
 ) -> InstanceConfigResponse:
     """
@@ -51,6 +115,7 @@ def get_instance_config(
     - Se a instância não existir → 404.
     - Se não existir config em InstanceConfig → objeto default
       (managed=False, protection_flag=False, timezone='UTC', configurado=False).
+    - Suporta GET condicional (ETag / If-None-Match → 304).
     """
     instance = _get_instance_or_404(db, instance_id)
 
@@ -60,6 +125,14 @@ def get_instance_config(
         .first()
     )
 
+    schedule = get_effective_schedules(db, [instance.id]).get(instance.id)
+
+    etag = _config_etag(instance.id, cfg, schedule)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    set_etag(response, etag)
+
     if cfg is None:
         # Retorna objeto default, sem registro persistido
         logger.debug(
@@ -70,12 +143,14 @@ def get_instance_config(
             instance_id=instance.id,
             # demais campos usam os defaults do schema
             configurado=False,
+            # Agendamento herdado da política do compartment, se houver
+            schedule_source=schedule.source if schedule is not None else None,
+            next_start_at=schedule.next_start_at if schedule is not None else None,
+            next_stop_at=schedule.next_stop_at if schedule is not None else None,
         )
 
     # Usa from_attributes=True para preencher todos os campos que batem com o modelo
-    response = InstanceConfigResponse.model_validate(cfg)
-    # Marca como configurado
-    return response.model_copy(update={"configurado": True})
+    return _config_response(cfg, schedule)
 
 
 @router.put(
@@ -85,6 +160,7 @@ def get_instance_config(
 def upsert_instance_config(
     instance_id: UUID,
     payload: InstanceConfigUpdate,
+    response: Response,
     db: DbSessionDep,
 ) -> InstanceConfigResponse:
     """
@@ -93,6 +169,10 @@ def upsert_instance_config(
     - 404 se a instância não existir.
     - Se não houver config, cria.
     - Se já houver config, atualiza campos a partir do payload.
+    - CRON/timezone inválidos → 422.
+    - Recalcula o agendamento efetivo da instância (managed da config; CRONs
+      vazios herdados da política do compartment) e, se managed/protection_flag
+      efetivos mudaram, os rollups do compartment.
     """
     instance = _get_instance_or_404(db, instance_id)
 
@@ -102,6 +182,7 @@ def upsert_instance_config(
         .first()
     )
 
+    is_new = cfg is None
     if cfg is None:
         logger.info(
             "Criando nova configuração para a instância %s", instance.id
@@ -121,11 +202,26 @@ def upsert_instance_config(
                 field_name,
             )
 
+    if is_new or _SCHEDULE_FIELDS.intersection(update_data):
+        try:
+            validate_schedule(cfg.default_start_cron, cfg.default_stop_cron, cfg.timezone)
+        except ValueError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Agendamento inválido: {exc}",
+            ) from exc
+
+    db.flush()
+    changes = refresh_effective_schedules(db, instance_ids=[instance.id])
+    refresh_compartment_rollups(db, changes.rollup_compartments)
+
     db.commit()
     db.refresh(cfg)
+    schedule = get_effective_schedules(db, [instance.id]).get(instance.id)
 
-    response = InstanceConfigResponse.model_validate(cfg)
-    return response.model_copy(update={"configurado": True})
+    set_etag(response, _config_etag(instance.id, cfg, schedule))
+    return _config_response(cfg, schedule)
 
 
 @router.delete(
@@ -165,6 +261,92 @@ def delete_instance_config(
     )
 
     db.delete(cfg)
+    db.flush()
+    # Sem configuração, a instância volta a herdar a política do compartment (se houver)
+    changes = refresh_effective_schedules(db, instance_ids=[instance.id])
+    refresh_compartment_rollups(db, changes.rollup_compartments)
     db.commit()
     # 204 No Content
     return
+
+
+def _selector_filters(db: Session, selector: InstanceSelector) -> InstanceFilters:
+    """Converte o seletor do upsert em lote nos filtros da listagem (400/404 como em GET /instances)."""
+    try:
+        tags = [parse_tag_predicate(raw) for raw in selector.tag]
+        tags += [parse_tag_predicate(raw, defined=True) for raw in selector.defined_tag]
+        validate_tag_predicates(tags)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    compartment_path = None
+    if selector.compartment_ocid is not None:
+        compartment_path = resolve_compartment_path(db, selector.compartment_ocid)
+        if compartment_path is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Compartment not found",
+            )
+
+    return InstanceFilters(
+        lifecycle_state=selector.lifecycle_state,
+        region=selector.region,
+        shape=selector.shape,
+        compartment_path=compartment_path,
+        tags=tags,
+    )
+
+
+@router.post(
+    "/instances/config/bulk",
+    response_model=InstanceConfigBulkResponse,
+)
+def bulk_upsert_instance_config(
+    payload: InstanceConfigBulkRequest,
+    db: DbSessionDep,
+) -> InstanceConfigBulkResponse:
+    """
+    Cria ou atualiza a configuração de várias instâncias em uma transação.
+
+    - ``items``: um patch (mesma semântica do PUT) por instância.
+    - ``selector`` + ``patch``: o mesmo patch para todas as instâncias ativas
+      selecionadas (subárvore de compartment e/ou tags).
+
+    Todos os itens válidos são gravados com um único INSERT ... ON CONFLICT
+    (instance_id). O resultado é por item: instâncias inexistentes
+    (``not_found``) e agendamentos inválidos (``invalid``) não impedem os
+    demais.
+
+    - 422 se o lote passar de ``Settings.INSTANCE_CONFIG_BULK_MAX_ITEMS``.
+    """
+    max_items = get_settings().INSTANCE_CONFIG_BULK_MAX_ITEMS
+
+    if payload.items is not None:
+        items = [
+            BulkConfigItem(item.instance_id, item.config.model_dump(exclude_unset=True))
+            for item in payload.items
+        ]
+    else:
+        filters = _selector_filters(db, payload.selector)
+        patch = payload.patch.model_dump(exclude_unset=True)
+        items = [
+            BulkConfigItem(instance_id, patch)
+            for instance_id in select_instance_ids(db, filters, limit=max_items + 1)
+        ]
+
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Lote acima do limite de {max_items} instâncias",
+        )
+
+    report = bulk_upsert_instance_configs(db, items)
+    db.commit()
+
+    return InstanceConfigBulkResponse(
+        results=[InstanceConfigBulkItemResult.model_validate(r) for r in report.results],
+        counts=report.counts(),
+    )
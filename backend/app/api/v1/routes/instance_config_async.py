@@ -0,0 +1,83 @@
+# app/api/v1/routes/instance_config_async.py
+
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.routes import instance_config as sync_routes
+from app.db.session import get_async_db
+from app.schemas.instance_config import (
+    InstanceConfigBulkRequest,
+    InstanceConfigBulkResponse,
+    InstanceConfigResponse,
+    InstanceConfigUpdate,
+)
+
+# Versão async das rotas de instance_config.py (DATABASE_ASYNC_ENABLED=true).
+# Cada handler roda o handler síncrono via run_sync sobre a conexão asyncpg:
+# mesma validação, mesmos refreshes (agendamento efetivo, rollups) e mesma
+# transação, sem ocupar uma thread do threadpool por request (a parte de CPU
+# do handler roda na thread do event loop).
+router = APIRouter()
+
+AsyncDbSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+@router.get(
+    "/instances/{instance_id}/config",
+    response_model=InstanceConfigResponse,
+)
+async def get_instance_config(
+    instance_id: UUID,
+    request: Request,
+    response: Response,
+    db: AsyncDbSessionDep,
+) -> InstanceConfigResponse:
+    """Ver :func:`app.api.v1.routes.instance_config.get_instance_config`."""
+    return await db.run_sync(
+        lambda session: sync_routes.get_instance_config(instance_id, request, response, session)
+    )
+
+
+@router.put(
+    "/instances/{instance_id}/config",
+    response_model=InstanceConfigResponse,
+)
+async def upsert_instance_config(
+    instance_id: UUID,
+    payload: InstanceConfigUpdate,
+    response: Response,
+    db: AsyncDbSessionDep,
+) -> InstanceConfigResponse:
+    """Ver :func:`app.api.v1.routes.instance_config.upsert_instance_config`."""
+    return await db.run_sync(
+        lambda session: sync_routes.upsert_instance_config(instance_id, payload, response, session)
+    )
+
+
+@router.delete(
+    "/instances/{instance_id}/config",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def delete_instance_config(
+    instance_id: UUID,
+    db: AsyncDbSessionDep,
+) -> None:
+    """Ver :func:`app.api.v1.routes.instance_config.delete_instance_config`."""
+    await db.run_sync(lambda session: sync_routes.delete_instance_config(instance_id, session))
+
+
+@router.post(
+    "/instances/config/bulk",
+    response_model=InstanceConfigBulkResponse,
+)
+async def bulk_upsert_instance_config(
+    payload: InstanceConfigBulkRequest,
+    db: AsyncDbSessionDep,
+) -> InstanceConfigBulkResponse:
+    """Ver :func:`app.api.v1.routes.instance_config.bulk_upsert_instance_config`."""
+    return await db.run_sync(
+        lambda session: sync_routes.bulk_upsert_instance_config(payload, session)
+    )
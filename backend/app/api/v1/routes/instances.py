@@ -0,0 +1,155 @@
+# app/api/v1/routes/instances.py
+
+import logging
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.instance_list import InstanceCount, InstanceListItem, InstanceListPage
+from app.services.instance_query import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InstanceFilters,
+    count_instances,
+    list_instances_page,
+    parse_tag_predicate,
+    resolve_compartment_path,
+    validate_tag_predicates,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DbSessionDep = Annotated[Session, Depends(get_db)]
+
+
+def get_instance_filters(
+    db: DbSessionDep,
+    lifecycle_state: Optional[str] = Query(None, description="Ex: RUNNING, STOPPED."),
+    region: Optional[str] = Query(None, description="Ex: sa-saopaulo-1."),
+    shape: Optional[str] = Query(None, description="Ex: VM.Standard.E4.Flex."),
+    managed: Optional[bool] = Query(None),
+    protection_flag: Optional[bool] = Query(None),
+    is_active: Optional[bool] = Query(True, description="Default: só instâncias ativas."),
+    compartment_ocid: Optional[str] = Query(
+        None,
+        description="Restringe ao compartment e a todos os seus descendentes.",
+    ),
+    tag: List[str] = Query(
+        [],
+        description="Freeform tag: Key=Value (ou só Key). Repetível; todos precisam casar.",
+    ),
+    defined_tag: List[str] = Query(
+        [],
+        description="Defined tag: Namespace.Key=Value (ou Namespace.Key). Repetível.",
+    ),
+) -> InstanceFilters:
+    """
+    Filtros comuns das rotas de listagem/contagem, a partir da query string.
+
+    - 404 se ``compartment_ocid`` não existir.
+    - 400 se algum predicado de tag for inválido, ou se todos forem só de chave.
+    """
+    try:
+        tags = [parse_tag_predicate(raw) for raw in tag]
+        tags += [parse_tag_predicate(raw, defined=True) for raw in defined_tag]
+        validate_tag_predicates(tags)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    compartment_path = None
+    if compartment_ocid is not None:
+        compartment_path = resolve_compartment_path(db, compartment_ocid)
+        if compartment_path is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Compartment not found",
+            )
+
+    return InstanceFilters(
+        lifecycle_state=lifecycle_state,
+        region=region,
+        shape=shape,
+        managed=managed,
+        protection_flag=protection_flag,
+        is_active=is_active,
+        compartment_path=compartment_path,
+        tags=tags,
+    )
+
+
+InstanceFiltersDep = Annotated[InstanceFilters, Depends(get_instance_filters)]
+
+
+@router.get(
+    "/instances",
+    response_model=InstanceListPage,
+    summary="Listagem paginada e filtrável das instâncias",
+)
+def list_instances(
+    db: DbSessionDep,
+    filters: InstanceFiltersDep,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior."),
+) -> InstanceListPage:
+    """
+    Lista instâncias ordenadas por (display_name, id), com paginação por
+    keyset: o custo de qualquer página é o mesmo da primeira.
+
+    Filtros por tag usam containment sobre os índices GIN de
+    ``freeform_tags``/``defined_tags``; o filtro de subárvore usa o índice
+    de prefixo de ``compartment_path_cache``.
+
+    - 404 se ``compartment_ocid`` não existir.
+    - 400 se o cursor ou algum predicado de tag for inválido.
+    """
+    try:
+        page = list_instances_page(db, filters, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    return InstanceListPage(
+        items=[
+            InstanceListItem(
+                id=row.instance.id,
+                ocid=row.instance.instance_ocid,
+                display_name=row.instance.display_name,
+                compartment_ocid=row.instance.compartment_ocid,
+                compartment_path=row.instance.compartment_path_cache,
+                region=row.instance.region,
+                availability_domain=row.instance.availability_domain,
+                shape=row.instance.shape,
+                lifecycle_state=row.instance.lifecycle_state,
+                is_active=row.instance.is_active,
+                managed=row.managed,
+                protection_flag=row.protection_flag,
+            )
+            for row in page.items
+        ],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get(
+    "/instances/count",
+    response_model=InstanceCount,
+    summary="Quantidade de instâncias que casam com os filtros",
+)
+def count_instances_route(
+    db: DbSessionDep,
+    filters: InstanceFiltersDep,
+) -> InstanceCount:
+    """
+    Aceita os mesmos filtros de ``GET /instances`` (ex: ``compartment_ocid``
+    para contar a subárvore inteira).
+    """
+    return InstanceCount(count=count_instances(db, filters))
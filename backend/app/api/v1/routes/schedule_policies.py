@@ -0,0 +1,176 @@
+# app/api/v1/routes/schedule_policies.py
+
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.compartment import Compartment
+from app.models.compartment_schedule_policy import CompartmentSchedulePolicy
+from app.schemas.schedule_policy import SchedulePolicyResponse, SchedulePolicyUpdate
+from app.services.compartment_rollups import refresh_compartment_rollups
+from app.services.effective_schedules import refresh_policy_subtree
+from app.services.scheduler import validate_schedule
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Campos validados antes de gravar (CRON/timezone)
+_SCHEDULE_FIELDS = {"default_start_cron", "default_stop_cron", "timezone"}
+
+DbSessionDep = Annotated[Session, Depends(get_db)]
+
+
+def _get_compartment_or_404(db: Session, compartment_ocid: str) -> Compartment:
+    compartment = (
+        db.query(Compartment)
+        .filter(
+            Compartment.compartment_ocid == compartment_ocid,
+            Compartment.is_active.is_(True),
+        )
+        .first()
+    )
+    if not compartment:
+        logger.info("Compartment não encontrado ao acessar política: %s", compartment_ocid)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Compartment not found",
+        )
+    return compartment
+
+
+def _get_policy(db: Session, compartment: Compartment) -> CompartmentSchedulePolicy | None:
+    return (
+        db.query(CompartmentSchedulePolicy)
+        .filter(CompartmentSchedulePolicy.compartment_id == compartment.id)
+        .first()
+    )
+
+
+def _policy_response(
+    compartment: Compartment,
+    policy: CompartmentSchedulePolicy,
+    affected: int = 0,
+) -> SchedulePolicyResponse:
+    return SchedulePolicyResponse(
+        compartment_id=policy.compartment_id,
+        compartment_ocid=compartment.compartment_ocid,
+        managed=policy.managed,
+        default_start_cron=policy.default_start_cron,
+        default_stop_cron=policy.default_stop_cron,
+        timezone=policy.timezone,
+        notes=policy.notes,
+        created_at=policy.created_at,
+        updated_at=policy.updated_at,
+        affected_instances=affected,
+    )
+
+
+@router.get(
+    "/compartments/{compartment_ocid}/schedule-policy",
+    response_model=SchedulePolicyResponse,
+)
+def get_schedule_policy(
+    compartment_ocid: str,
+    db: DbSessionDep,
+) -> SchedulePolicyResponse:
+    """
+    Retorna a política de agendamento do compartment.
+
+    - 404 se o compartment não existir ou não tiver política própria (a
+      subárvore pode estar herdando a de um ancestral).
+    """
+    compartment = _get_compartment_or_404(db, compartment_ocid)
+    policy = _get_policy(db, compartment)
+    if policy is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule policy not found",
+        )
+    return _policy_response(compartment, policy)
+
+
+@router.put(
+    "/compartments/{compartment_ocid}/schedule-policy",
+    response_model=SchedulePolicyResponse,
+)
+def upsert_schedule_policy(
+    compartment_ocid: str,
+    payload: SchedulePolicyUpdate,
+    db: DbSessionDep,
+) -> SchedulePolicyResponse:
+    """
+    Cria ou atualiza a política de agendamento do compartment (upsert).
+
+    - 404 se o compartment não existir.
+    - CRON/timezone inválidos → 422.
+    - Recalcula o agendamento efetivo das instâncias da subárvore que não têm
+      CRON próprio (e os rollups dos compartments cujas flags efetivas mudaram).
+    """
+    compartment = _get_compartment_or_404(db, compartment_ocid)
+    policy = _get_policy(db, compartment)
+
+    is_new = policy is None
+    if policy is None:
+        logger.info("Criando política de agendamento para o compartment %s", compartment_ocid)
+        policy = CompartmentSchedulePolicy(compartment_id=compartment.id)
+        db.add(policy)
+
+    update_data = payload.model_dump(exclude_unset=True)
+    for field_name, value in update_data.items():
+        if value is None and field_name in ("managed", "timezone"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Campo {field_name} não pode ser nulo",
+            )
+        setattr(policy, field_name, value)
+
+    if is_new or _SCHEDULE_FIELDS.intersection(update_data):
+        try:
+            validate_schedule(policy.default_start_cron, policy.default_stop_cron, policy.timezone)
+        except ValueError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Agendamento inválido: {exc}",
+            ) from exc
+
+    db.flush()
+    changes = refresh_policy_subtree(db, compartment)
+    refresh_compartment_rollups(db, changes.rollup_compartments)
+
+    db.commit()
+    db.refresh(policy)
+    return _policy_response(compartment, policy, changes.upserted + changes.deleted)
+
+
+@router.delete(
+    "/compartments/{compartment_ocid}/schedule-policy",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+def delete_schedule_policy(
+    compartment_ocid: str,
+    db: DbSessionDep,
+) -> None:
+    """
+    Remove a política do compartment; a subárvore passa a herdar a do
+    ancestral mais próximo (se houver).
+
+    - 404 se o compartment não existir.
+    - Se não houver política, operação é idempotente (204).
+    """
+    compartment = _get_compartment_or_404(db, compartment_ocid)
+    policy = _get_policy(db, compartment)
+    if policy is None:
+        return
+
+    logger.info("Removendo política de agendamento do compartment %s", compartment_ocid)
+    db.delete(policy)
+    db.flush()
+    changes = refresh_policy_subtree(db, compartment)
+    refresh_compartment_rollups(db, changes.rollup_compartments)
+    db.commit()
+    return
@@ -0,0 +1,89 @@
+# app/api/v1/routes/sync_runs.py
+
+import logging
+from datetime import datetime, timezone
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.sync_run import LastSyncResponse, SyncRunPage, SyncRunResponse
+from app.services.sync_runs import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_last_successful_sync,
+    list_sync_runs_page,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DbSessionDep = Annotated[Session, Depends(get_db)]
+
+
+@router.get(
+    "/sync-runs",
+    response_model=SyncRunPage,
+    summary="Histórico paginado das execuções do sync de inventário",
+)
+def list_sync_runs(
+    db: DbSessionDep,
+    tenancy_ocid: Optional[str] = Query(None),
+    run_status: Optional[Literal["running", "success", "failed"]] = Query(None, alias="status"),
+    trigger: Optional[Literal["cli", "scheduler"]] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior."),
+) -> SyncRunPage:
+    """
+    Lista as execuções mais novas primeiro, com paginação por keyset (durações
+    por fase, linhas por resultado e estatísticas das chamadas OCI de cada uma).
+
+    - 400 se o cursor for inválido.
+    """
+    try:
+        page = list_sync_runs_page(
+            db,
+            tenancy_ocid=tenancy_ocid,
+            status=run_status,
+            trigger=trigger,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from exc
+
+    return SyncRunPage(
+        items=[SyncRunResponse.model_validate(run) for run in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.get(
+    "/tenancies/{tenancy_id}/last-sync",
+    response_model=LastSyncResponse,
+    summary="Último sync concluído com sucesso da tenancy",
+)
+def get_last_sync(
+    tenancy_id: str,  # OCID da tenancy
+    db: DbSessionDep,
+) -> LastSyncResponse:
+    """
+    Retorna o último sync com sucesso e há quantos segundos ele terminou
+    ("sincronizado há N minutos" na UI).
+
+    - 404 se a tenancy nunca teve um sync com sucesso.
+    """
+    run = get_last_successful_sync(db, tenancy_id)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No successful sync found",
+        )
+
+    age = (datetime.now(timezone.utc) - run.finished_at).total_seconds()
+    return LastSyncResponse(run=SyncRunResponse.model_validate(run), age_seconds=max(0.0, age))
@@ -4,13 +4,31 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
+import threading
 from typing import Any, Mapping
 
 import oci
 from sqlalchemy.orm import Session
 
-from .db.session import SessionLocal  # ajuste se o nome for diferente
-from .services.oci_inventory_sync import sync_inventory
+from .core.config import get_settings
+from .core.metrics import start_metrics_server
+from .db.session import WorkerSessionLocal, worker_engine
+from .models.sync_run import TRIGGER_CLI, TRIGGER_SCHEDULER
+from .services.action_queue import default_worker_id, enqueue_actions, run_action_worker
+from .services.compartment_rollups import refresh_compartment_rollups
+from .services.effective_schedules import refresh_all_effective_schedules
+from .services.leader_election import run_leader_loop
+from .services.oci_action_executor import build_action_clients
+from .services.oci_inventory_sync import (
+    COMMIT_MODES,
+    INVENTORY_SOURCES,
+    SyncReport,
+    compare_inventory_sources,
+    sync_inventory,
+)
+from .services.scheduler import recompute_all_next_fire_times, run_scheduler_tick
+from .services.sync_metrics import record_sync_failure, record_sync_success
+from .services.sync_runs import finish_sync_run, publish_failed_sync_generation, start_sync_run
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +49,338 @@ def _load_oci_config(profile: str | None = None, config_file: str | None = None)
     return oci.config.from_file(**kwargs)
 
 
-def cmd_sync_oci_inventory(profile: str | None, config_file: str | None) -> None:
+def cmd_sync_oci_inventory(
+    profile: str | None,
+    config_file: str | None,
+    max_in_flight: int | None = None,
+    bulk: bool | None = None,
+    all_regions: bool | None = None,
+    source: str | None = None,
+    trigger: str = TRIGGER_CLI,
+    commit_mode: str | None = None,
+) -> None:
     """
     Executa o serviço de sincronização de inventário OCI (compartments + instances).
+
+    A execução é registrada em sync_runs (início, fases, linhas, chamadas OCI
+    e erro). No modo de commit "compartment", uma falha só desfaz o que ainda
+    não tinha sido commitado.
     """
     logger.info("Carregando configuração OCI (profile=%r, config_file=%r)", profile, config_file)
     oci_config = _load_oci_config(profile=profile, config_file=config_file)
 
-    db: Session = SessionLocal()
+    db: Session = WorkerSessionLocal()
     try:
-        logger.info("Iniciando sincronização de inventário OCI...")
-        sync_inventory(db, oci_config)
+        run = start_sync_run(
+            db,
+            trigger,
+            tenancy_ocid=oci_config.get("tenancy"),
+            region=oci_config.get("region"),
+        )
         db.commit()
-        logger.info("Sincronização de inventário OCI concluída com sucesso.")
+    except Exception:
+        db.close()
+        raise
+
+    # Preenchido pelo sync à medida que avança: na falha, guarda o parcial
+    report = SyncReport()
+    try:
+        logger.info("Iniciando sincronização de inventário OCI (execução %s)...", run.id)
+        sync_inventory(
+            db,
+            oci_config,
+            max_in_flight=max_in_flight,
+            bulk=bulk,
+            all_regions=all_regions,
+            source=source,
+            commit_mode=commit_mode,
+            report=report,
+        )
+        finish_sync_run(db, run.id, report=report)
+        db.commit()
+        record_sync_success(report)
+        logger.info(
+            "Sincronização de inventário OCI concluída com sucesso. "
+            "Compartments: %s | Instâncias: %s",
+            report.compartments,
+            report.instances,
+        )
+        for region, error in report.failed_regions.items():
+            logger.warning("Região %s não foi sincronizada: %s", region, error)
     except Exception:
         logger.exception("Erro ao executar sincronização de inventário OCI. Fazendo rollback.")
         db.rollback()
+        record_sync_failure()
+        _record_failed_sync_run(db, run.id, sys.exc_info()[1], report)
         raise
     finally:
         db.close()
 
 
+def _record_failed_sync_run(
+    db: Session,
+    run_id: Any,
+    error: BaseException,
+    report: SyncReport,
+) -> None:
+    """
+    Fecha a execução como failed, com o relatório parcial do sync e a
+    geração que o modo "compartment" deixou commitada (sem mascarar o erro
+    original).
+    """
+    try:
+        publish_failed_sync_generation(db, report)
+        finish_sync_run(db, run_id, report=report, error=error)
+        db.commit()
+    except Exception:
+        logger.exception("Não foi possível registrar a falha da execução de sync %s", run_id)
+        db.rollback()
+
+
+def cmd_compare_inventory_sources(
+    num_compartments: int,
+    num_instances: int,
+    empty_ratio: float,
+    latency_ms: float,
+    hydrate_ratio: float,
+    max_in_flight: int | None,
+) -> bool:
+    """
+    Compara as fontes de inventário ("list" x "search") contra um backend OCI
+    falso e local: tempo de cada uma e se geram as mesmas linhas de instances.
+
+    :return: True se todas as fontes geraram exatamente as mesmas linhas
+    """
+    from .testing.oci_fake_backend import build_fake_clients, build_fake_tenancy
+
+    tenancy = build_fake_tenancy(
+        num_compartments=num_compartments,
+        num_instances=num_instances,
+        empty_ratio=empty_ratio,
+    )
+    clients = build_fake_clients(
+        tenancy,
+        latency=latency_ms / 1000.0,
+        hydrate_ratio=hydrate_ratio,
+    )
+
+    runs = compare_inventory_sources(clients, max_in_flight=max_in_flight)
+    for run in runs:
+        logger.info("Fonte %-6s: %8.3fs, %d instâncias", run.source, run.seconds, len(run.rows))
+    logger.info(
+        "Chamadas OCI simuladas: compute=%s search=%s",
+        dict(clients.compute.calls),
+        dict(clients.search.calls),
+    )
+
+    reference = runs[0]
+    identical = True
+    for run in runs[1:]:
+        if run.rows != reference.rows:
+            identical = False
+            diff = set(run.rows) ^ set(reference.rows)
+            diff |= {
+                ocid for ocid in set(run.rows) & set(reference.rows)
+                if run.rows[ocid] != reference.rows[ocid]
+            }
+            logger.error(
+                "Fonte %r diverge de %r em %d instâncias (ex: %s)",
+                run.source,
+                reference.source,
+                len(diff),
+                sorted(diff)[:5],
+            )
+
+    if identical:
+        logger.info("Todas as fontes geraram as mesmas linhas.")
+    return identical
+
+
+def cmd_benchmark_api(
+    tenancy_ocid: str | None,
+    requests: int,
+    concurrency: int,
+    port: int,
+) -> None:
+    """
+    Compara as stacks da API (sync: psycopg2 + threadpool x async: asyncpg +
+    event loop) sob a mesma carga de GETs de navegação e de configuração,
+    usando o inventário já sincronizado no banco.
+    """
+    from .models.compartment import Compartment
+    from .services.api_benchmark import benchmark_paths, run_api_benchmark
+
+    db: Session = WorkerSessionLocal()
+    try:
+        if tenancy_ocid is None:
+            tenancy_ocid = db.query(Compartment.tenancy_ocid).filter(
+                Compartment.is_tenancy_root.is_(True)
+            ).order_by(Compartment.tenancy_ocid).limit(1).scalar()
+        if tenancy_ocid is None:
+            logger.error("Nenhuma tenancy sincronizada; rode sync-oci-inventory antes.")
+            return
+        paths = benchmark_paths(db, tenancy_ocid)
+    finally:
+        db.close()
+
+    logger.info(
+        "Benchmark da API: tenancy=%s, %d paths, %d requests, concorrência %d",
+        tenancy_ocid,
+        len(paths),
+        requests,
+        concurrency,
+    )
+    run_api_benchmark(paths, requests=requests, concurrency=concurrency, port=port)
+
+
+def cmd_scheduler_tick() -> None:
+    """
+    Executa um único tick do scheduler: coleta as ações vencidas, enfileira em
+    instance_actions e reagenda os próximos disparos (na mesma transação).
+    """
+    db: Session = WorkerSessionLocal()
+    try:
+        actions = run_scheduler_tick(db)
+        enqueue_actions(db, actions)
+        db.commit()
+        for action in actions:
+            logger.info(
+                "Ação vencida: %s instância %s (agendada para %s)",
+                action.action,
+                action.instance_id,
+                action.scheduled_at.isoformat(),
+            )
+    except Exception:
+        logger.exception("Erro ao executar tick do scheduler. Fazendo rollback.")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_scheduler_recompute() -> None:
+    """
+    Recalcula next_start_at/next_stop_at de todos os agendamentos efetivos.
+    """
+    db: Session = WorkerSessionLocal()
+    try:
+        count = recompute_all_next_fire_times(db)
+        db.commit()
+        logger.info("Próximos disparos recalculados para %d agendamentos.", count)
+    except Exception:
+        logger.exception("Erro ao recalcular próximos disparos. Fazendo rollback.")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_effective_schedules_refresh() -> None:
+    """
+    Recalcula os agendamentos efetivos de todas as instâncias ativas (e os
+    rollups afetados), ex: depois de uma mudança na regra de resolução.
+    """
+    db: Session = WorkerSessionLocal()
+    try:
+        changes = refresh_all_effective_schedules(db)
+        refresh_compartment_rollups(db, changes.rollup_compartments)
+        db.commit()
+        logger.info(
+            "Agendamentos efetivos recalculados: %d gravados, %d removidos.",
+            changes.upserted,
+            changes.deleted,
+        )
+    except Exception:
+        logger.exception("Erro ao recalcular agendamentos efetivos. Fazendo rollback.")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cmd_scheduler(
+    profile: str | None,
+    config_file: str | None,
+    sync: bool = True,
+    metrics_port: int | None = None,
+) -> None:
+    """
+    Processo de longa duração do scheduler: roda o tick (e, opcionalmente, o
+    sync periódico de inventário) só enquanto for o líder de cada job.
+
+    Vários processos podem rodar ao mesmo tempo (alta disponibilidade); a
+    liderança de cada job é decidida por advisory lock no Postgres.
+
+    Com ``metrics_port``, expõe GET /metrics (fases e linhas do sync, idade do
+    último sync, pools de conexão) deste processo.
+    """
+    settings = get_settings()
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    holder = default_worker_id()
+    stop_event = threading.Event()
+
+    def sync_job() -> None:
+        cmd_sync_oci_inventory(profile=profile, config_file=config_file, trigger=TRIGGER_SCHEDULER)
+
+    loops = [("scheduler", settings.SCHEDULER_TICK_SECONDS, cmd_scheduler_tick)]
+    if sync:
+        loops.append(("sync", settings.OCI_SYNC_INTERVAL_SECONDS, sync_job))
+
+    threads = [
+        threading.Thread(
+            target=run_leader_loop,
+            args=(worker_engine, job, holder, interval, fn, stop_event),
+            name=f"leader-{job}",
+        )
+        for job, interval, fn in loops
+    ]
+    for thread in threads:
+        thread.start()
+
+    logger.info("Scheduler %s iniciado (jobs: %s)", holder, ", ".join(job for job, _, _ in loops))
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        logger.info("Scheduler interrompido; liberando liderança.")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+
+
+def cmd_action_worker(
+    profile: str | None,
+    config_file: str | None,
+    worker_id: str | None = None,
+    batch_size: int | None = None,
+    lease_seconds: int | None = None,
+    max_workers: int | None = None,
+    once: bool = False,
+) -> None:
+    """
+    Roda um worker da fila de ações (instance_actions). Vários workers (em
+    processos/máquinas diferentes) podem rodar ao mesmo tempo; o rate limit
+    (ACTION_RATE_PER_SECOND) vale por worker, não para o conjunto.
+    """
+    logger.info("Carregando configuração OCI (profile=%r, config_file=%r)", profile, config_file)
+    oci_config = _load_oci_config(profile=profile, config_file=config_file)
+
+    try:
+        run_action_worker(
+            WorkerSessionLocal,
+            build_action_clients(oci_config),
+            worker_id=worker_id,
+            batch_size=batch_size,
+            lease_seconds=lease_seconds,
+            max_workers=max_workers,
+            once=once,
+        )
+    except KeyboardInterrupt:
+        logger.info("Worker da fila de ações interrompido.")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="python -m app.cli",
@@ -86,6 +415,203 @@ def build_parser() -> argparse.ArgumentParser:
         default=None,
         help="Caminho para o arquivo de configuração OCI (default: ~/.oci/config).",
     )
+    sync_parser.add_argument(
+        "--max-in-flight",
+        dest="max_in_flight",
+        type=int,
+        default=None,
+        help="Máximo de compartments listados em paralelo (default: OCI_SYNC_MAX_IN_FLIGHT).",
+    )
+    sync_parser.add_argument(
+        "--bulk",
+        dest="bulk",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Usa persistência set-based (INSERT ... ON CONFLICT) (default: OCI_SYNC_BULK_UPSERT).",
+    )
+    sync_parser.add_argument(
+        "--all-regions",
+        dest="all_regions",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Sincroniza instâncias de todas as regiões assinadas (default: OCI_SYNC_ALL_REGIONS).",
+    )
+    sync_parser.add_argument(
+        "--source",
+        dest="source",
+        choices=INVENTORY_SOURCES,
+        default=None,
+        help="Fonte do inventário de instâncias (default: OCI_SYNC_INVENTORY_SOURCE).",
+    )
+    sync_parser.add_argument(
+        "--commit-mode",
+        dest="commit_mode",
+        choices=COMMIT_MODES,
+        default=None,
+        help=(
+            "run = um commit no final; compartment = commit a cada compartment listado "
+            "(default: OCI_SYNC_COMMIT_MODE)."
+        ),
+    )
+
+    # ------------------------------------------------------------------
+    # scheduler-tick / scheduler-recompute
+    # ------------------------------------------------------------------
+    subparsers.add_parser(
+        "scheduler-tick",
+        help="Executa um tick do scheduler (enfileira ações vencidas e reagenda).",
+    )
+    subparsers.add_parser(
+        "scheduler-recompute",
+        help="Recalcula os próximos disparos de todas as configurações de instância.",
+    )
+    subparsers.add_parser(
+        "effective-schedules-refresh",
+        help="Recalcula os agendamentos efetivos (config + políticas) de todas as instâncias.",
+    )
+
+    # ------------------------------------------------------------------
+    # scheduler (loop com eleição de líder)
+    # ------------------------------------------------------------------
+    scheduler_parser = subparsers.add_parser(
+        "scheduler",
+        help="Roda o tick do scheduler e o sync periódico (só no processo líder).",
+    )
+    scheduler_parser.add_argument(
+        "--profile",
+        dest="profile",
+        default=None,
+        help="Profile do arquivo ~/.oci/config (default: profile padrão).",
+    )
+    scheduler_parser.add_argument(
+        "--config-file",
+        dest="config_file",
+        default=None,
+        help="Caminho para o arquivo de configuração OCI (default: ~/.oci/config).",
+    )
+    scheduler_parser.add_argument(
+        "--sync",
+        dest="sync",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Roda também o sync periódico de inventário (default: sim).",
+    )
+    scheduler_parser.add_argument(
+        "--metrics-port",
+        dest="metrics_port",
+        type=int,
+        default=None,
+        help="Porta para expor GET /metrics deste processo (default: desligado).",
+    )
+
+    # ------------------------------------------------------------------
+    # action-worker
+    # ------------------------------------------------------------------
+    worker_parser = subparsers.add_parser(
+        "action-worker",
+        help="Consome a fila de ações (instance_actions) e envia as ações ao OCI.",
+    )
+    worker_parser.add_argument(
+        "--profile",
+        dest="profile",
+        default=None,
+        help="Profile do arquivo ~/.oci/config (default: profile padrão).",
+    )
+    worker_parser.add_argument(
+        "--config-file",
+        dest="config_file",
+        default=None,
+        help="Caminho para o arquivo de configuração OCI (default: ~/.oci/config).",
+    )
+    worker_parser.add_argument(
+        "--worker-id",
+        dest="worker_id",
+        default=None,
+        help="Identificador do worker nos leases (default: host:pid).",
+    )
+    worker_parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=None,
+        help="Ações pegas por lote (default: ACTION_QUEUE_BATCH_SIZE).",
+    )
+    worker_parser.add_argument(
+        "--lease-seconds",
+        dest="lease_seconds",
+        type=int,
+        default=None,
+        help="Duração do lease de um lote (default: ACTION_QUEUE_LEASE_SECONDS).",
+    )
+    worker_parser.add_argument(
+        "--max-workers",
+        dest="max_workers",
+        type=int,
+        default=None,
+        help="Máximo de ações enviadas em paralelo (default: ACTION_MAX_WORKERS).",
+    )
+    worker_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Sai quando a fila não tiver ações disponíveis.",
+    )
+
+    # ------------------------------------------------------------------
+    # compare-inventory-sources
+    # ------------------------------------------------------------------
+    compare_parser = subparsers.add_parser(
+        "compare-inventory-sources",
+        help="Compara as fontes de inventário (list x search) contra um backend OCI falso e local.",
+    )
+    compare_parser.add_argument("--compartments", type=int, default=1500, help="Quantidade de compartments.")
+    compare_parser.add_argument("--instances", type=int, default=5000, help="Quantidade de instâncias.")
+    compare_parser.add_argument(
+        "--empty-ratio",
+        type=float,
+        default=0.7,
+        help="Fração de compartments sem instâncias (default: 0.7).",
+    )
+    compare_parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=20.0,
+        help="Latência simulada por chamada OCI, em ms (default: 20).",
+    )
+    compare_parser.add_argument(
+        "--hydrate-ratio",
+        type=float,
+        default=0.0,
+        help="Fração de resultados de busca sem shape/imageId (exigem GetInstance).",
+    )
+    compare_parser.add_argument(
+        "--max-in-flight",
+        dest="max_in_flight",
+        type=int,
+        default=None,
+        help="Paralelismo das fontes (default: OCI_SYNC_MAX_IN_FLIGHT).",
+    )
+
+    # ------------------------------------------------------------------
+    # benchmark-api
+    # ------------------------------------------------------------------
+    bench_parser = subparsers.add_parser(
+        "benchmark-api",
+        help="Compara a API nas stacks sync (psycopg2) e async (asyncpg) sob a mesma carga.",
+    )
+    bench_parser.add_argument(
+        "--tenancy",
+        dest="tenancy_ocid",
+        default=None,
+        help="OCID da tenancy usada nos paths (default: a primeira sincronizada).",
+    )
+    bench_parser.add_argument("--requests", type=int, default=5000, help="Requests por stack.")
+    bench_parser.add_argument("--concurrency", type=int, default=50, help="Conexões simultâneas.")
+    bench_parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Porta local onde cada stack é servida durante a medição (default: 8765).",
+    )
 
     return parser
 
@@ -104,7 +630,56 @@ def main(argv: list[str] | None = None) -> None:
     )
 
     if args.command == "sync-oci-inventory":
-        cmd_sync_oci_inventory(profile=args.profile, config_file=args.config_file)
+        cmd_sync_oci_inventory(
+            profile=args.profile,
+            config_file=args.config_file,
+            max_in_flight=args.max_in_flight,
+            bulk=args.bulk,
+            all_regions=args.all_regions,
+            source=args.source,
+            commit_mode=args.commit_mode,
+        )
+    elif args.command == "scheduler-tick":
+        cmd_scheduler_tick()
+    elif args.command == "scheduler-recompute":
+        cmd_scheduler_recompute()
+    elif args.command == "effective-schedules-refresh":
+        cmd_effective_schedules_refresh()
+    elif args.command == "scheduler":
+        cmd_scheduler(
+            profile=args.profile,
+            config_file=args.config_file,
+            sync=args.sync,
+            metrics_port=args.metrics_port,
+        )
+    elif args.command == "action-worker":
+        cmd_action_worker(
+            profile=args.profile,
+            config_file=args.config_file,
+            worker_id=args.worker_id,
+            batch_size=args.batch_size,
+            lease_seconds=args.lease_seconds,
+            max_workers=args.max_workers,
+            once=args.once,
+        )
+    elif args.command == "compare-inventory-sources":
+        identical = cmd_compare_inventory_sources(
+            num_compartments=args.compartments,
+            num_instances=args.instances,
+            empty_ratio=args.empty_ratio,
+            latency_ms=args.latency_ms,
+            hydrate_ratio=args.hydrate_ratio,
+            max_in_flight=args.max_in_flight,
+        )
+        if not identical:
+            sys.exit(1)
+    elif args.command == "benchmark-api":
+        cmd_benchmark_api(
+            tenancy_ocid=args.tenancy_ocid,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            port=args.port,
+        )
     else:
         parser.error(f"Comando desconhecido: {args.command!r}")
 
@@ -13,6 +13,112 @@ class Settings(BaseSettings):
 
     # Banco (vamos usar isso depois no SQLAlchemy)
     DATABASE_URL: str = "postgresql+psycopg2://stopstart:stopstart@db:5432/stopstart"
+    # Stack async da API (asyncpg + rotas async de navegação e configuração)
+    DATABASE_ASYNC_ENABLED: bool = False
+    # URL do engine async; vazio = DATABASE_URL com o driver trocado para asyncpg
+    DATABASE_ASYNC_URL: str = ""
+
+    # Pool de conexões do engine da API (requests interativos; também usado
+    # pelo engine async)
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    # Pool separado para o sync de inventário, o scheduler e o worker de ações,
+    # que seguram conexões por minutos sem disputar com a API
+    DB_WORKER_POOL_SIZE: int = 5
+    DB_WORKER_POOL_MAX_OVERFLOW: int = 5
+    # Espera máxima por uma conexão livre antes de falhar (nos dois pools)
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Conexões mais velhas que isso são recriadas no checkout (-1 = nunca)
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Testa a conexão no checkout (evita erro na primeira query após restart/failover do banco)
+    DB_POOL_PRE_PING: bool = True
+    # Esperas por conexão acima disso são logadas com o status do pool
+    DB_POOL_SLOW_CHECKOUT_SECONDS: float = 0.5
+
+    # Métricas Prometheus (GET /metrics e middleware de latência por rota)
+    METRICS_ENABLED: bool = True
+
+    # Sync de inventário OCI
+    # Máximo de compartments listados em paralelo (1 = sequencial)
+    OCI_SYNC_MAX_IN_FLIGHT: int = 8
+    # Retentativas em caso de throttling (HTTP 429)
+    OCI_SYNC_MAX_RETRIES: int = 5
+    OCI_SYNC_BACKOFF_BASE_SECONDS: float = 1.0
+    OCI_SYNC_BACKOFF_MAX_SECONDS: float = 30.0
+    # Persistência set-based (INSERT ... ON CONFLICT) em vez do unit-of-work do ORM
+    OCI_SYNC_BULK_UPSERT: bool = False
+    # Linhas por lote gravado (um statement no modo bulk, um flush no ORM)
+    OCI_SYNC_BATCH_SIZE: int = 1000
+    # Savepoint por lote: um lote que falhar no banco é descartado sem abortar o sync
+    OCI_SYNC_BATCH_SAVEPOINTS: bool = False
+    # Commit do sync: "run" (uma transação, commitada no final) ou
+    # "compartment" (commit a cada compartment listado; opt-in, só com a fonte "list")
+    OCI_SYNC_COMMIT_MODE: str = "run"
+    # Sincroniza instâncias de todas as regiões assinadas (em paralelo), e não só a do config
+    OCI_SYNC_ALL_REGIONS: bool = False
+    # Fonte do inventário de instâncias: "list" (ListInstances por compartment)
+    # ou "search" (Resource Search estruturado)
+    OCI_SYNC_INVENTORY_SOURCE: str = "list"
+    # Intervalo do sync periódico rodado pelo processo líder (comando "scheduler")
+    OCI_SYNC_INTERVAL_SECONDS: int = 3600
+    # Execuções de sync em "running" há mais que isso são de processos que
+    # morreram no meio; o próximo sync as fecha como failed
+    OCI_SYNC_RUN_STALE_SECONDS: int = 21600
+
+    # Cache em memória (por processo) da árvore de compartments da navegação
+    COMPARTMENT_TREE_CACHE_ENABLED: bool = True
+    # Intervalo mínimo entre checagens da geração do inventário no banco
+    COMPARTMENT_TREE_CACHE_CHECK_SECONDS: float = 1.0
+
+    # Scheduler
+    # Intervalo entre ticks do scheduler
+    SCHEDULER_TICK_SECONDS: int = 30
+    # Disparos atrasados além disso são descartados (apenas reagendados)
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 300
+
+    # Eleição de líder (comando "scheduler")
+    # Intervalo entre checagens da liderança, independente do intervalo do job:
+    # limita o tempo de failover quando o líder libera o lock ou cai
+    LEADER_POLL_SECONDS: float = 5.0
+    # TCP keepalive da conexão do lock (cliente e servidor): se o host do líder
+    # morrer, o Postgres derruba a conexão e libera o lock em
+    # ~IDLE + INTERVAL * COUNT segundos
+    LEADER_KEEPALIVE_IDLE_SECONDS: int = 10
+    LEADER_KEEPALIVE_INTERVAL_SECONDS: int = 5
+    LEADER_KEEPALIVE_COUNT: int = 3
+
+    # Upsert em lote de configurações (POST /instances/config/bulk)
+    # Máximo de instâncias por request (lista explícita ou resultado do seletor)
+    INSTANCE_CONFIG_BULK_MAX_ITEMS: int = 10000
+
+    # Executor de ações de lifecycle (START/STOP/SOFTSTOP/RESET)
+    # Máximo de chamadas instance_action em paralelo
+    ACTION_MAX_WORKERS: int = 16
+    # Token bucket por região e por API: taxa sustentada (req/s) e rajada máxima.
+    # O bucket é POR PROCESSO (não é coordenado entre processos): com N
+    # processos "action-worker" a taxa real chega a N × ACTION_RATE_PER_SECOND,
+    # então divida o limite do OCI pelo número de workers
+    ACTION_RATE_PER_SECOND: float = 8.0
+    ACTION_BURST: int = 16
+    # Retentativas em caso de throttling (429) ou erro do serviço (5xx)
+    ACTION_MAX_RETRIES: int = 5
+    ACTION_BACKOFF_BASE_SECONDS: float = 1.0
+    ACTION_BACKOFF_MAX_SECONDS: float = 30.0
+
+    # Fila durável de ações (instance_actions)
+    # Ações pegas por lote por um worker
+    ACTION_QUEUE_BATCH_SIZE: int = 50
+    # Duração do lease; deve ser maior que o tempo de processamento de um lote
+    ACTION_QUEUE_LEASE_SECONDS: int = 120
+    # Intervalo entre consultas quando a fila está vazia
+    ACTION_QUEUE_POLL_SECONDS: float = 2.0
+    # Tentativas por ação antes de marcar como failed
+    ACTION_QUEUE_MAX_ATTEMPTS: int = 3
+    # Atraso base antes de uma nova tentativa (multiplicado pelo nº de tentativas)
+    ACTION_QUEUE_RETRY_DELAY_SECONDS: int = 30
+    # Espera máxima do worker após erros transitórios seguidos (banco/OCI fora
+    # do ar); começa em ACTION_QUEUE_POLL_SECONDS e dobra a cada erro
+    ACTION_QUEUE_ERROR_BACKOFF_MAX_SECONDS: float = 60.0
 
     class Config:
         env_file = ".env"
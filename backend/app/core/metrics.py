@@ -0,0 +1,125 @@
+# backend/app/core/metrics.py
+
+"""
+Métricas Prometheus (``prometheus_client``).
+
+As métricas são declaradas com os tipos do ``prometheus_client`` (Counter,
+Gauge, Histogram) em cada módulo; este módulo só decide como renderizá-las.
+
+- Processo único (CLI, comando ``scheduler``, API com um worker): registry
+  padrão do processo.
+- API com vários workers do uvicorn (``--workers N``): o registry de cada
+  worker só vê os próprios requests, e cada scrape cairia em um worker
+  qualquer. Definir ``PROMETHEUS_MULTIPROC_DIR`` com um diretório vazio a
+  cada subida, compartilhado pelos workers: cada worker grava os valores em
+  arquivos no diretório e o ``/metrics`` de qualquer worker agrega todos
+  (modo multiprocess do ``prometheus_client``). Gauges declaram como os
+  valores dos workers se combinam (``multiprocess_mode``); os ``live*``
+  descartam os workers encerrados (ver :func:`mark_process_dead`).
+
+Coletores registrados com :func:`register_collector` rodam a cada scrape no
+processo que o atende: só servem para valores que não dependem do processo
+(ex: lidos do banco).
+
+A API expõe as métricas em ``GET /metrics``; processos de longa duração
+(comando ``scheduler``) podem expor as suas com :func:`start_metrics_server`.
+"""
+
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    disable_created_metrics,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.registry import Collector
+
+logger = logging.getLogger(__name__)
+
+# Buckets (segundos) da latência de requests HTTP
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets (segundos) das fases do sync de inventário
+SYNC_PHASE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# Sem as séries *_created (não existem no modo multiprocess; assim a saída
+# é a mesma nos dois modos)
+disable_created_metrics()
+
+# Coletores por scrape (ver register_collector)
+_COLLECTORS: List[Collector] = []
+
+
+# ============================================================
+# Funções públicas
+# ============================================================
+
+def multiprocess_enabled() -> bool:
+    """True se ``PROMETHEUS_MULTIPROC_DIR`` está definido (métricas agregadas entre processos)."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def register_collector(collector: Collector) -> None:
+    """
+    Registra um coletor chamado a cada scrape (``collect()`` devolve as
+    famílias de métricas). Deve definir ``describe()`` para não ser chamado
+    já no registro.
+    """
+    _COLLECTORS.append(collector)
+    if not multiprocess_enabled():
+        REGISTRY.register(collector)
+
+
+def render_metrics() -> bytes:
+    """Todas as métricas no formato texto do Prometheus (agregadas entre workers no modo multiprocess)."""
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _COLLECTORS:
+        registry.register(collector)
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    """
+    No modo multiprocess, remove os gauges ``live*`` do processo encerrado
+    (chamado no shutdown de cada worker). Sem efeito fora desse modo.
+    """
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid if pid is not None else os.getpid())
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve ``GET /metrics`` (:func:`render_metrics`) em uma thread daemon, para
+    processos sem a API (ex: comando ``scheduler``).
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 (nome exigido pelo http.server)
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE_LATEST)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            logger.debug("metrics: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info("Métricas expostas em http://%s:%d/metrics", host, port)
+    return server
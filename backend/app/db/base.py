@@ -4,6 +4,12 @@ from .base_class import Base  # noqa: F401
 from app.models.compartment import Compartment  # noqa: F401
 from app.models.instance import Instance  # noqa: F401
 from app.models.instance_config import InstanceConfig  # noqa: F401
+from app.models.instance_action import InstanceAction  # noqa: F401
+from app.models.inventory_generation import InventoryGeneration  # noqa: F401
+from app.models.compartment_rollup import CompartmentRollup  # noqa: F401
+from app.models.compartment_schedule_policy import CompartmentSchedulePolicy  # noqa: F401
+from app.models.instance_effective_schedule import InstanceEffectiveSchedule  # noqa: F401
+from app.models.sync_run import SyncRun  # noqa: F401
 
 # Se tiver outros models, importa aqui também
 # from app.models.user import User  # noqa: F401
@@ -0,0 +1,263 @@
+# backend/app/db/pool_metrics.py
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """
+    Contadores de um pool de conexões, alimentados pelos eventos do pool
+    (checkout/checkin/connect/invalidate) e pela espera em ``Pool.connect``.
+    """
+    name: str
+    checkouts: int = 0
+    checkout_timeouts: int = 0
+    # Esperas acima de DB_POOL_SLOW_CHECKOUT_SECONDS
+    slow_checkouts: int = 0
+    checkout_wait_seconds_total: float = 0.0
+    checkout_wait_seconds_max: float = 0.0
+    # Conexões emprestadas agora e o maior valor já visto
+    in_use: int = 0
+    in_use_peak: int = 0
+    connections_opened: int = 0
+    connections_invalidated: int = 0
+    engine: Optional[Engine] = field(default=None, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        slow = not timed_out and seconds >= get_settings().DB_POOL_SLOW_CHECKOUT_SECONDS
+        with self._lock:
+            self.checkout_wait_seconds_total += seconds
+            self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, seconds)
+            if timed_out:
+                self.checkout_timeouts += 1
+            elif slow:
+                self.slow_checkouts += 1
+
+        POOL_CHECKOUT_WAIT_SECONDS.labels(self.name).inc(seconds)
+        if timed_out:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.name).inc()
+        elif slow:
+            POOL_SLOW_CHECKOUTS.labels(self.name).inc()
+        _export_gauges(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cópia dos contadores + tamanho atual do pool (para health/métricas)."""
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "checkout_wait_seconds_total": round(self.checkout_wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.checkout_wait_seconds_max, 6),
+                "in_use": self.in_use,
+                "in_use_peak": self.in_use_peak,
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+            }
+        if self.engine is not None:
+            pool = self.engine.pool
+            data["pool_size"] = pool.size()
+            data["idle"] = pool.checkedin()
+            data["overflow"] = max(0, pool.overflow())
+        return data
+
+
+# Um PoolStats por engine instrumentado, pelo nome do pool ("api", "worker", ...)
+_POOL_STATS: Dict[str, PoolStats] = {}
+
+
+class _TimedCheckoutMixin:
+    """
+    Mede a espera por uma conexão em ``connect()``.
+
+    O SQLAlchemy não tem evento antes do checkout (só depois), então a espera
+    (fila do pool + abertura/pre-ping da conexão) é cronometrada aqui e
+    atribuída ao PoolStats pelo ``pool_logging_name``, que o pool preserva ao
+    ser recriado (``engine.dispose()``).
+    """
+
+    def connect(self):
+        stats = _POOL_STATS.get(self._orig_logging_name)
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if stats is not None:
+                stats.record_wait(time.perf_counter() - started, timed_out=True)
+            logger.warning(
+                "Timeout aguardando conexão no pool '%s' (%s)",
+                self._orig_logging_name,
+                self.status(),
+            )
+            raise
+
+        waited = time.perf_counter() - started
+        if stats is not None:
+            stats.record_wait(waited)
+        if waited >= get_settings().DB_POOL_SLOW_CHECKOUT_SECONDS:
+            logger.warning(
+                "Espera de %.3fs por conexão no pool '%s' (%s)",
+                waited,
+                self._orig_logging_name,
+                self.status(),
+            )
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool com a espera de checkout medida (engines síncronos)."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool com a espera de checkout medida (engine asyncpg)."""
+
+
+# ============================================================
+# Funções públicas
+# ============================================================
+
+def instrument_engine(engine: Engine, name: str) -> PoolStats:
+    """
+    Registra os eventos do pool de ``engine`` em um PoolStats chamado ``name``.
+
+    O engine deve ter sido criado com ``pool_logging_name=name`` e um dos
+    pools instrumentados acima para que a espera de checkout seja medida.
+    Para engines async, passe ``async_engine.sync_engine``.
+    """
+    stats = PoolStats(name=name, engine=engine)
+    _POOL_STATS[name] = stats
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        with stats._lock:
+            stats.connections_opened += 1
+        POOL_CONNECTIONS_OPENED.labels(name).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        with stats._lock:
+            stats.checkouts += 1
+            stats.in_use += 1
+            stats.in_use_peak = max(stats.in_use_peak, stats.in_use)
+        POOL_CHECKOUTS.labels(name).inc()
+        _export_gauges(stats)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        with stats._lock:
+            stats.in_use = max(0, stats.in_use - 1)
+        _export_gauges(stats, returning=True)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        with stats._lock:
+            stats.connections_invalidated += 1
+        POOL_CONNECTIONS_INVALIDATED.labels(name).inc()
+
+    _export_gauges(stats)
+    return stats
+
+
+def get_pool_stats() -> Dict[str, PoolStats]:
+    """PoolStats de todos os engines instrumentados neste processo."""
+    return dict(_POOL_STATS)
+
+
+# ============================================================
+# Exportação para /metrics
+# ============================================================
+
+# Atualizadas nos próprios eventos do pool (e não lidas do PoolStats no
+# scrape): no modo multiprocess o scrape roda em um worker só, e cada worker
+# tem os seus pools. Os gauges somam (ou pegam o máximo) entre os workers vivos.
+POOL_CHECKOUTS = Counter(
+    "stopstart_db_pool_checkouts", "Conexões emprestadas pelo pool.", ["pool"]
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "stopstart_db_pool_checkout_timeouts",
+    "Checkouts que estouraram DB_POOL_TIMEOUT_SECONDS.",
+    ["pool"],
+)
+POOL_SLOW_CHECKOUTS = Counter(
+    "stopstart_db_pool_slow_checkouts",
+    "Checkouts com espera acima de DB_POOL_SLOW_CHECKOUT_SECONDS.",
+    ["pool"],
+)
+POOL_CHECKOUT_WAIT_SECONDS = Counter(
+    "stopstart_db_pool_checkout_wait_seconds",
+    "Tempo total esperando por conexões, em segundos.",
+    ["pool"],
+)
+POOL_CONNECTIONS_OPENED = Counter(
+    "stopstart_db_pool_connections_opened", "Conexões abertas com o banco.", ["pool"]
+)
+POOL_CONNECTIONS_INVALIDATED = Counter(
+    "stopstart_db_pool_connections_invalidated",
+    "Conexões invalidadas (erro de conexão, pre-ping).",
+    ["pool"],
+)
+
+# Campo do snapshot -> gauge exportado como stopstart_db_pool_<campo>
+_POOL_GAUGES = {
+    "checkout_wait_seconds_max": Gauge(
+        "stopstart_db_pool_checkout_wait_seconds_max",
+        "Maior espera por uma conexão, em segundos.",
+        ["pool"],
+        multiprocess_mode="livemax",
+    ),
+    "in_use": Gauge(
+        "stopstart_db_pool_in_use",
+        "Conexões emprestadas agora.",
+        ["pool"],
+        multiprocess_mode="livesum",
+    ),
+    "in_use_peak": Gauge(
+        "stopstart_db_pool_in_use_peak",
+        "Maior número de conexões emprestadas ao mesmo tempo (por processo).",
+        ["pool"],
+        multiprocess_mode="livemax",
+    ),
+    "idle": Gauge(
+        "stopstart_db_pool_idle",
+        "Conexões ociosas no pool.",
+        ["pool"],
+        multiprocess_mode="livesum",
+    ),
+    "overflow": Gauge(
+        "stopstart_db_pool_overflow",
+        "Conexões abertas além de pool_size.",
+        ["pool"],
+        multiprocess_mode="livesum",
+    ),
+    "pool_size": Gauge(
+        "stopstart_db_pool_pool_size",
+        "Tamanho configurado do pool (somado entre os processos).",
+        ["pool"],
+        multiprocess_mode="livesum",
+    ),
+}
+
+
+def _export_gauges(stats: PoolStats, returning: bool = False) -> None:
+    snapshot = stats.snapshot()
+    if returning and "idle" in snapshot:
+        # O evento checkin roda antes de a conexão voltar para a fila do pool
+        snapshot["idle"] += 1
+    for field_name, value in snapshot.items():
+        gauge = _POOL_GAUGES.get(field_name)
+        if gauge is not None:
+            gauge.labels(stats.name).set(value)
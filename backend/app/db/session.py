@@ -1,22 +1,41 @@
 # backend/app/db/session.py
 
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.core.config import get_settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
 
 from app.db import base  # noqa: F401
 
 settings = get_settings()
 
-# echo=True em dev ajuda bastante a ver as queries no log
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=(settings.APP_ENV == "development"),
-    future=True,
-)
+
+def _create_pooled_engine(name: str, pool_size: int, max_overflow: int) -> Engine:
+    """Engine síncrono com o pool configurado pelos DB_POOL_* e instrumentado."""
+    # echo=True em dev ajuda bastante a ver as queries no log
+    pooled_engine = create_engine(
+        settings.DATABASE_URL,
+        echo=(settings.APP_ENV == "development"),
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(pooled_engine, name)
+    return pooled_engine
+
+
+# Engine da API (requests interativos)
+engine = _create_pooled_engine("api", settings.DB_POOL_SIZE, settings.DB_POOL_MAX_OVERFLOW)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -26,6 +45,28 @@ SessionLocal = sessionmaker(
     class_=Session,
 )
 
+# Engine dos processos de longa duração (sync de inventário, scheduler,
+# worker de ações): um sync que segura conexão por minutos não esgota o pool
+# da API. As conexões só são abertas no primeiro uso.
+worker_engine = _create_pooled_engine(
+    "worker",
+    settings.DB_WORKER_POOL_SIZE,
+    settings.DB_WORKER_POOL_MAX_OVERFLOW,
+)
+
+WorkerSessionLocal = sessionmaker(
+    bind=worker_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    class_=Session,
+)
+
+# Stack async: criado só na primeira utilização (asyncpg só é exigido com
+# DATABASE_ASYNC_ENABLED=true)
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -40,3 +81,55 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def async_database_url(url: str) -> str:
+    """URL do DATABASE_URL com o driver trocado para asyncpg (mesmo host, banco e parâmetros)."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Engine async (asyncpg) compartilhado pelo processo."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.DATABASE_ASYNC_URL or async_database_url(settings.DATABASE_URL),
+            echo=(settings.APP_ENV == "development"),
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_logging_name="api_async",
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+        instrument_engine(_async_engine.sync_engine, "api_async")
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency async: sessão AsyncSession para as rotas ``async def``.
+
+    Os serviços continuam síncronos; as rotas async os executam com
+    ``await db.run_sync(...)``, que roda o código síncrono sobre a conexão
+    asyncpg sem ocupar o threadpool. Só o I/O de banco deixa de bloquear o
+    event loop: o resto da função passada ao ``run_sync`` (montagem da
+    resposta, hash do ETag, validação pydantic) roda na thread do loop, e
+    uma rota pesada em CPU segura os outros requests do worker enquanto
+    executa.
+    """
+    async with get_async_session_factory()() as db:
+        yield db
@@ -6,11 +6,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
+from app.api import metrics as metrics_api
 from app.core.config import get_settings
+from app.core.metrics import mark_process_dead
 from app.api.v1.routes import health as health_routes
 from app.api.v1.routes import compartments as compartments_routes  # 👈 novo import
+from app.api.v1.routes import compartments_async as compartments_async_routes
 from app.api.v1.routes import instance_config as instance_config_routes
-from app.db.session import SessionLocal
+from app.api.v1.routes import instance_config_async as instance_config_async_routes
+from app.api.v1.routes import instance_actions as instance_actions_routes
+from app.api.v1.routes import instances as instances_routes
+from app.api.v1.routes import schedule_policies as schedule_policies_routes
+from app.api.v1.routes import sync_runs as sync_runs_routes
+from app.db.session import SessionLocal, get_async_engine
 from app.models.base import Base  # garante que Base está disponível
 
 logger = logging.getLogger(__name__)
@@ -37,8 +45,22 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Latência/status por rota e requests em andamento (GET /metrics)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(metrics_api.MetricsMiddleware)
+        app.include_router(metrics_api.router, tags=["metrics"])
+
     api_v1_prefix = "/api/v1"
 
+    # Navegação e configuração têm versão async (asyncpg, sem threadpool)
+    if settings.DATABASE_ASYNC_ENABLED:
+        logger.info("Stack async habilitada para navegação e configuração de instâncias")
+        compartments_router = compartments_async_routes.router
+        instance_config_router = instance_config_async_routes.router
+    else:
+        compartments_router = compartments_routes.router
+        instance_config_router = instance_config_routes.router
+
     # Health check
     app.include_router(
         health_routes.router,
@@ -46,16 +68,44 @@ def create_app() -> FastAPI:
         tags=["health"],
     )
     
+    # Listagem paginada de instâncias
+    app.include_router(
+        instances_routes.router,
+        prefix=api_v1_prefix,
+        tags=["instances"],
+    )
+
     # Rotas de configuração de instância
     app.include_router(
-        instance_config_routes.router,
+        instance_config_router,
         prefix=api_v1_prefix,
         tags=["instance-config"],
     )
 
+    # Políticas de agendamento por compartment (herdadas pela subárvore)
+    app.include_router(
+        schedule_policies_routes.router,
+        prefix=api_v1_prefix,
+        tags=["schedule-policies"],
+    )
+
+    # Ações de lifecycle (fila instance_actions)
+    app.include_router(
+        instance_actions_routes.router,
+        prefix=api_v1_prefix,
+        tags=["instance-actions"],
+    )
+
+    # Histórico das execuções do sync de inventário
+    app.include_router(
+        sync_runs_routes.router,
+        prefix=api_v1_prefix,
+        tags=["sync-runs"],
+    )
+
     # Navegação hierárquica de compartments
     app.include_router(
-        compartments_routes.router,
+        compartments_router,
         prefix=api_v1_prefix,
         tags=["compartments"],
     )
@@ -77,6 +127,16 @@ def create_app() -> FastAPI:
         finally:
             db.close()
 
+    @app.on_event("shutdown")
+    async def shutdown_async_engine() -> None:
+        if settings.DATABASE_ASYNC_ENABLED:
+            await get_async_engine().dispose()
+
+    @app.on_event("shutdown")
+    def shutdown_metrics() -> None:
+        # Modo multiprocess: tira os gauges deste worker da soma dos demais
+        mark_process_dead()
+
     return app
 
 
@@ -8,6 +8,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     String,
     Text,
     UniqueConstraint,
@@ -57,6 +58,10 @@ class Compartment(Base):
         index=True,
     )
 
+    # Fingerprint (sha256) dos campos sincronizados do OCI; o sync só
+    # reescreve a linha quando ele muda
+    content_hash = Column(String(64), nullable=True)
+
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
@@ -96,6 +101,13 @@ class Compartment(Base):
             "path",
             name="uq_compartments_tenancy_path",
         ),
+        # Subárvore (LIKE 'path/%'): text_pattern_ops permite range scan por
+        # prefixo independente da collation do banco
+        Index(
+            "ix_compartments_path_pattern",
+            "path",
+            postgresql_ops={"path": "text_pattern_ops"},
+        ),
     )
 
     def __repr__(self) -> str:
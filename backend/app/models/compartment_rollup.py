@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..db.base_class import Base
+
+
+class CompartmentRollup(Base):
+    """
+    Contadores materializados de instâncias ativas por compartment.
+
+    ``direct_*`` contam só as instâncias do próprio compartment; ``subtree_*``
+    incluem todos os descendentes ativos. Mantidos incrementalmente por
+    :mod:`app.services.compartment_rollups` (após sync, mudanças de
+    configuração e ações executadas).
+    """
+
+    __tablename__ = "compartment_rollups"
+
+    compartment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("compartments.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tenancy_ocid = Column(String(255), nullable=False, index=True)
+
+    # Instâncias do próprio compartment
+    direct_total = Column(Integer, nullable=False, default=0)
+    direct_running = Column(Integer, nullable=False, default=0)
+    direct_stopped = Column(Integer, nullable=False, default=0)
+    direct_starting = Column(Integer, nullable=False, default=0)
+    direct_stopping = Column(Integer, nullable=False, default=0)
+    direct_provisioning = Column(Integer, nullable=False, default=0)
+    direct_managed = Column(Integer, nullable=False, default=0)
+    direct_protected = Column(Integer, nullable=False, default=0)
+
+    # Compartment + descendentes ativos
+    subtree_total = Column(Integer, nullable=False, default=0)
+    subtree_running = Column(Integer, nullable=False, default=0)
+    subtree_stopped = Column(Integer, nullable=False, default=0)
+    subtree_starting = Column(Integer, nullable=False, default=0)
+    subtree_stopping = Column(Integer, nullable=False, default=0)
+    subtree_provisioning = Column(Integer, nullable=False, default=0)
+    subtree_managed = Column(Integer, nullable=False, default=0)
+    subtree_protected = Column(Integer, nullable=False, default=0)
+
+    # Só muda quando algum contador muda (usado nos ETags da navegação)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompartmentRollup compartment_id={self.compartment_id} "
+            f"direct_total={self.direct_total} subtree_total={self.subtree_total}>"
+        )
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..db.base_class import Base
+
+
+class CompartmentSchedulePolicy(Base):
+    """
+    Agendamento padrão de um compartment, herdado pelas instâncias de toda a
+    subárvore (vale a política do ancestral mais próximo).
+
+    Instâncias com InstanceConfig usam o próprio ``managed`` e só herdam os
+    CRONs que deixaram vazios; o
+    resultado por instância fica materializado em
+    :class:`~app.models.instance_effective_schedule.InstanceEffectiveSchedule`.
+    """
+
+    __tablename__ = "compartment_schedule_policies"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    # Uma política por compartment
+    compartment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("compartments.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+        index=True,
+    )
+
+    # Se False, a subárvore herda "não gerenciada" (desliga a política de um ancestral)
+    managed = Column(
+        Boolean,
+        nullable=False,
+        default=True,
+        doc="Se True, as instâncias que herdam esta política são gerenciadas pelo scheduler",
+    )
+
+    default_start_cron = Column(String(64), nullable=True)
+    default_stop_cron = Column(String(64), nullable=True)
+    timezone = Column(String(64), nullable=False, default="UTC")
+
+    notes = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompartmentSchedulePolicy id={self.id} compartment_id={self.compartment_id} "
+            f"managed={self.managed}>"
+        )
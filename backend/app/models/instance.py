@@ -8,6 +8,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     String,
     Text,
 )
@@ -73,6 +74,10 @@ class Instance(Base):
         index=True,
     )
 
+    # Fingerprint (sha256) dos campos sincronizados do OCI; o sync só
+    # reescreve a linha quando ele muda
+    content_hash = Column(String(64), nullable=True)
+
     # Timestamps
     created_at = Column(
         DateTime(timezone=True),
@@ -99,6 +104,36 @@ class Instance(Base):
         cascade="all, delete-orphan",
     )
 
+    # Índices da listagem /instances: keyset em (display_name, id), com o
+    # filtro de igualdade como primeira coluna
+    __table_args__ = (
+        Index("ix_instances_active_name_id", "is_active", "display_name", "id"),
+        Index("ix_instances_lifecycle_name_id", "lifecycle_state", "display_name", "id"),
+        Index("ix_instances_region_name_id", "region", "display_name", "id"),
+        Index("ix_instances_shape_name_id", "shape", "display_name", "id"),
+        # Subárvore (LIKE 'path/%'): text_pattern_ops permite range scan por
+        # prefixo independente da collation do banco
+        Index(
+            "ix_instances_compartment_path_pattern",
+            "compartment_path_cache",
+            postgresql_ops={"compartment_path_cache": "text_pattern_ops"},
+        ),
+        # Consultas por tag (containment @>); jsonb_path_ops é menor e mais
+        # rápido que o opclass default para @>
+        Index(
+            "ix_instances_freeform_tags",
+            "freeform_tags",
+            postgresql_using="gin",
+            postgresql_ops={"freeform_tags": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_instances_defined_tags",
+            "defined_tags",
+            postgresql_using="gin",
+            postgresql_ops={"defined_tags": "jsonb_path_ops"},
+        ),
+    )
+
     def __repr__(self) -> str:
         return (
             f"<Instance id={self.id} display_name={self.display_name!r} "
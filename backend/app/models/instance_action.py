@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from ..db.base_class import Base
+
+
+class InstanceAction(Base):
+    """
+    Fila durável de ações de lifecycle (START/STOP/SOFTSTOP/RESET).
+
+    Ciclo de vida de uma linha:
+    pending -> running (lease de um worker) -> done | skipped | failed
+    Uma falha com tentativas restantes volta para pending com ``available_at``
+    no futuro; um lease expirado (worker morreu) é retomado por outro worker.
+    """
+
+    __tablename__ = "instance_actions"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    instance_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("instances.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    action = Column(String(16), nullable=False)
+    # Origem: "scheduler" (tick) ou "manual" (API)
+    source = Column(String(16), nullable=False, default="scheduler")
+
+    # Horário agendado (base do atraso agendado -> envio) e horário a partir do
+    # qual a ação pode ser pega por um worker (adiado em retentativas)
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+
+    status = Column(
+        String(16),
+        nullable=False,
+        default="pending",
+        doc="pending | running | done | skipped | failed",
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+    # Lease do worker que está processando a ação
+    lease_owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    instance = relationship("Instance")
+
+    __table_args__ = (
+        # Um tick repetido não enfileira o mesmo disparo duas vezes
+        UniqueConstraint(
+            "instance_id",
+            "action",
+            "scheduled_at",
+            name="uq_instance_actions_instance_action_scheduled",
+        ),
+        # Índices parciais consultados pelo claim dos workers
+        Index(
+            "ix_instance_actions_pending",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_instance_actions_running_lease",
+            "lease_expires_at",
+            postgresql_where=text("status = 'running'"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<InstanceAction id={self.id} instance_id={self.instance_id} "
+            f"action={self.action} status={self.status} attempts={self.attempts}>"
+        )
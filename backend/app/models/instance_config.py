@@ -45,7 +45,9 @@ class InstanceConfig(Base):
         doc="Se True, esta instância é gerenciada pelo scheduler Stop/Start",
     )
 
-    # CRON defaults (vamos validar sintaxe na camada de serviço)
+    # CRON defaults (vamos validar sintaxe na camada de serviço). Os que
+    # estiverem preenchidos sobrescrevem os da política herdada do
+    # compartment; managed vale mesmo sem CRON (ver InstanceEffectiveSchedule)
     default_start_cron = Column(
         String(64),
         nullable=True,
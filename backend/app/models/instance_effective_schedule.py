@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from ..db.base_class import Base
+
+# Origem do agendamento efetivo
+SOURCE_INSTANCE = "instance"
+SOURCE_COMPARTMENT = "compartment"
+
+
+class InstanceEffectiveSchedule(Base):
+    """
+    Agendamento efetivo de uma instância, já resolvido (linha plana).
+
+    - ``source = "instance"``: InstanceConfig com CRON próprio, ou sem nenhuma
+      política na trilha do compartment;
+    - ``source = "compartment"``: CRONs da política do ancestral mais próximo.
+
+    ``policy_compartment_id`` aponta a política sempre que algum CRON veio
+    dela. Havendo InstanceConfig, ``managed`` vem sempre dela (mesmo sem CRON
+    próprio); ``protection_flag`` vem sempre de InstanceConfig. Cada CRON
+    guarda o timezone de onde veio (``start_timezone``/``stop_timezone``): um
+    CRON herdado da política continua avaliado no timezone da política mesmo
+    ao lado de um CRON próprio da configuração. Instâncias sem
+    configuração e sem política não têm linha. Mantida incrementalmente por
+    :mod:`app.services.effective_schedules`; o tick do scheduler, o executor,
+    a listagem e a navegação leem só esta tabela.
+    """
+
+    __tablename__ = "instance_effective_schedules"
+
+    instance_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("instances.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    source = Column(String(16), nullable=False)
+    policy_compartment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("compartments.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    managed = Column(Boolean, nullable=False, default=False)
+    protection_flag = Column(Boolean, nullable=False, default=False)
+    default_start_cron = Column(String(64), nullable=True)
+    default_stop_cron = Column(String(64), nullable=True)
+    start_timezone = Column(String(64), nullable=False, default="UTC")
+    stop_timezone = Column(String(64), nullable=False, default="UTC")
+
+    # Próximos disparos (UTC) pré-calculados; o tick só consulta essas colunas
+    # (índices parciais abaixo) e as recalcula quando disparam
+    next_start_at = Column(DateTime(timezone=True), nullable=True)
+    next_stop_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Só muda quando a linha muda (usado nos ETags)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_instance_effective_schedules_next_start_at",
+            "next_start_at",
+            postgresql_where=text("managed"),
+        ),
+        Index(
+            "ix_instance_effective_schedules_next_stop_at",
+            "next_stop_at",
+            postgresql_where=text("managed"),
+        ),
+        # Filtros managed/protection_flag da listagem (EXISTS por instância)
+        Index(
+            "ix_instance_effective_schedules_managed_instance",
+            "managed",
+            "instance_id",
+        ),
+        Index(
+            "ix_instance_effective_schedules_protection_instance",
+            "protection_flag",
+            "instance_id",
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<InstanceEffectiveSchedule instance_id={self.instance_id} source={self.source} "
+            f"managed={self.managed}>"
+        )
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+from ..db.base_class import Base
+
+
+class InventoryGeneration(Base):
+    """
+    Contador de versão do inventário de uma tenancy.
+
+    Incrementado (na mesma transação) por todo sync que altera compartments
+    ou instâncias; caches em memória comparam o valor para saber se estão
+    desatualizados.
+    """
+
+    __tablename__ = "inventory_generations"
+
+    tenancy_ocid = Column(String(255), primary_key=True)
+    generation = Column(BigInteger, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<InventoryGeneration tenancy_ocid={self.tenancy_ocid!r} "
+            f"generation={self.generation}>"
+        )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from ..db.base_class import Base
+
+# Origem do sync
+TRIGGER_CLI = "cli"
+TRIGGER_SCHEDULER = "scheduler"
+
+# Estados de uma execução
+STATUS_RUNNING = "running"
+STATUS_SUCCESS = "success"
+STATUS_FAILED = "failed"
+
+
+class SyncRun(Base):
+    """
+    Histórico das execuções do sync de inventário OCI.
+
+    A linha é criada (running) e commitada antes do sync; o fechamento com
+    sucesso é gravado na mesma transação dos dados sincronizados, e o de
+    falha depois do rollback, com o relatório parcial. Uma linha presa em
+    running indica um processo que morreu no meio do sync; o próximo sync a
+    fecha como failed depois de ``OCI_SYNC_RUN_STALE_SECONDS``.
+    """
+
+    __tablename__ = "sync_runs"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    tenancy_ocid = Column(String(255), nullable=True)
+    # Região do config OCI (com all_regions, as demais ficam em row_counts)
+    region = Column(String(64), nullable=True)
+    trigger = Column(String(16), nullable=False, doc="cli | scheduler")
+    status = Column(
+        String(16),
+        nullable=False,
+        default=STATUS_RUNNING,
+        doc="running | success | failed",
+    )
+
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+    # {"tree_fetch": 1.2, ..., "total": 42.0} (ver SYNC_PHASES)
+    phase_seconds = Column(JSONB, nullable=True)
+    # {"compartments": {"inserted": .., ...}, "instances": {...}, "regions": {região: {...}},
+    #  "batches": {"batches": .., "flush_seconds_max": .., "rss_mb_max": .., ...}}
+    row_counts = Column(JSONB, nullable=True)
+    # {"compute.list_instances": {"calls": .., "pages": .., "p95_ms": .., ...}}
+    oci_calls = Column(JSONB, nullable=True)
+    # Regiões cuja listagem falhou (região -> erro)
+    failed_regions = Column(JSONB, nullable=True)
+    # Geração do inventário publicada pelo sync; numa falha, só no modo de
+    # commit "compartment" (o que já tinha sido commitado)
+    generation = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Histórico por tenancy (mais novas primeiro)
+        Index("ix_sync_runs_tenancy_started", "tenancy_ocid", "started_at", "id"),
+        Index("ix_sync_runs_started", "started_at", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncRun id={self.id} tenancy={self.tenancy_ocid} trigger={self.trigger} "
+            f"status={self.status} started_at={self.started_at}>"
+        )
@@ -1,44 +1,88 @@
+from datetime import datetime
 from typing import List, Optional
-from pydantic import BaseModel
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
 
 
 class CompartmentBase(BaseModel):
-    id: int  # ou UUID, ajuste conforme seu modelo
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
     ocid: str
     name: str
     description: Optional[str] = None
 
-    class Config:
-        orm_mode = True
+
+class CompartmentCounts(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    total: int = 0
+    running: int = 0
+    stopped: int = 0
+    starting: int = 0
+    stopping: int = 0
+    provisioning: int = 0
+    managed: int = 0
+    protected: int = 0
+
+
+class CompartmentRollupCounts(BaseModel):
+    # Só as instâncias do próprio compartment
+    direct: CompartmentCounts
+    # Compartment + todos os descendentes ativos
+    subtree: CompartmentCounts
+
+
+class CompartmentChild(CompartmentBase):
+    # None enquanto a tenancy não tiver passado por um sync com rollups
+    rollup: Optional[CompartmentRollupCounts] = None
 
 
 class CompartmentBreadcrumb(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     ocid: str
     name: str
 
-    class Config:
-        orm_mode = True
+
+class InstanceSchedule(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    # "instance" (CRON próprio) ou "compartment" (política herdada)
+    source: str
+    # Compartment da política herdada (None se source = "instance")
+    policy_compartment_id: Optional[UUID] = None
+    default_start_cron: Optional[str] = None
+    default_stop_cron: Optional[str] = None
+    # Timezone de cada CRON (o herdado da política fica no timezone dela)
+    start_timezone: str = "UTC"
+    stop_timezone: str = "UTC"
+    next_start_at: Optional[datetime] = None
+    next_stop_at: Optional[datetime] = None
 
 
 class InstanceWithConfig(BaseModel):
-    id: int  # ou UUID
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
     ocid: str
     display_name: str
-    lifecycle_state: str
+    lifecycle_state: Optional[str] = None
     region: Optional[str] = None
     availability_domain: Optional[str] = None
 
+    # Flags efetivas (managed pode vir da política do compartment)
     managed: bool
     protection_flag: bool
-
-    class Config:
-        orm_mode = True
+    # Agendamento efetivo; None se a instância não tem config nem política herdada
+    schedule: Optional[InstanceSchedule] = None
 
 
 class CompartmentNavigationResponse(BaseModel):
-    tenancy_id: int  # ou str, conforme Tenancy.id
+    tenancy_id: str  # OCID da tenancy
     current: CompartmentBase
     breadcrumbs: List[CompartmentBreadcrumb]
     parent: Optional[CompartmentBase]
-    children: List[CompartmentBase]
+    children: List[CompartmentChild]
     instances: List[InstanceWithConfig]
@@ -0,0 +1,45 @@
+# app/schemas/instance_action.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class InstanceActionCreate(BaseModel):
+    """
+    Payload para disparar manualmente uma ação de lifecycle (POST).
+    """
+
+    action: Literal["START", "STOP", "SOFTSTOP", "RESET"] = Field(
+        ...,
+        description="Ação de lifecycle a ser enviada ao OCI.",
+    )
+
+
+class InstanceActionResponse(BaseModel):
+    """
+    Schema de resposta de uma ação da fila (instance_actions).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(..., description="Identificador da ação na fila.")
+    instance_id: UUID = Field(..., description="Instância alvo (UUID da tabela instances).")
+    action: str = Field(..., description="START, STOP, SOFTSTOP ou RESET.")
+    source: str = Field(..., description="Origem: 'scheduler' (tick) ou 'manual' (API).")
+    status: str = Field(
+        ...,
+        description="pending, running, done, skipped ou failed.",
+    )
+    attempts: int = Field(0, description="Tentativas já feitas por algum worker.")
+    last_error: Optional[str] = Field(
+        None,
+        description="Último erro (ou motivo de ter sido ignorada, ex: 'skipped_protected').",
+    )
+    scheduled_at: datetime = Field(..., description="Horário agendado (UTC).")
+    finished_at: Optional[datetime] = Field(None, description="Horário de conclusão (UTC).")
+    created_at: datetime = Field(..., description="Horário em que foi enfileirada (UTC).")
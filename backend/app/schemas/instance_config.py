@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class InstanceConfigBase(BaseModel):
@@ -110,3 +111,93 @@ class InstanceConfigResponse(InstanceConfigBase):
             "False se os valores são default (sem configuração persistida)."
         ),
     )
+
+    schedule_source: Optional[str] = Field(
+        None,
+        description=(
+            "Origem do agendamento efetivo: 'instance' (configuração da instância), "
+            "'compartment' (política herdada) ou None (sem agendamento)."
+        ),
+    )
+
+    next_start_at: Optional[datetime] = Field(
+        None,
+        description="Próximo start efetivo (UTC), do CRON da instância ou da política herdada.",
+    )
+
+    next_stop_at: Optional[datetime] = Field(
+        None,
+        description="Próximo stop efetivo (UTC), do CRON da instância ou da política herdada.",
+    )
+
+
+class InstanceConfigBulkItem(BaseModel):
+    """Item da lista explícita do upsert em lote."""
+
+    instance_id: UUID
+    config: InstanceConfigUpdate
+
+
+class InstanceSelector(BaseModel):
+    """
+    Seleção de instâncias ativas para o upsert em lote (mesma semântica dos
+    filtros de GET /instances). Exige ao menos um critério de escopo.
+    """
+
+    compartment_ocid: Optional[str] = Field(
+        None,
+        description="Compartment e todos os seus descendentes.",
+    )
+    tag: List[str] = Field(
+        default_factory=list,
+        description="Freeform tags: Key=Value (ou só Key); todas precisam casar.",
+        examples=[["Schedule=office-hours"]],
+    )
+    defined_tag: List[str] = Field(
+        default_factory=list,
+        description="Defined tags: Namespace.Key=Value (ou Namespace.Key).",
+    )
+    region: Optional[str] = None
+    shape: Optional[str] = None
+    lifecycle_state: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _require_scope(self) -> "InstanceSelector":
+        if self.compartment_ocid is None and not self.tag and not self.defined_tag:
+            raise ValueError("Informe compartment_ocid, tag ou defined_tag no seletor")
+        return self
+
+
+class InstanceConfigBulkRequest(BaseModel):
+    """
+    Upsert em lote: ou ``items`` (um patch por instância), ou ``selector`` +
+    ``patch`` (o mesmo patch para todas as instâncias selecionadas).
+    """
+
+    items: Optional[List[InstanceConfigBulkItem]] = None
+    selector: Optional[InstanceSelector] = None
+    patch: Optional[InstanceConfigUpdate] = None
+
+    @model_validator(mode="after")
+    def _check_mode(self) -> "InstanceConfigBulkRequest":
+        if self.items is not None:
+            if self.selector is not None or self.patch is not None:
+                raise ValueError("Use items ou selector + patch, não ambos")
+        elif self.selector is None or self.patch is None:
+            raise ValueError("Informe items, ou selector + patch")
+        return self
+
+
+class InstanceConfigBulkItemResult(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    instance_id: UUID
+    status: str = Field(..., description="created, updated, not_found ou invalid.")
+    error: Optional[str] = None
+    next_start_at: Optional[datetime] = None
+    next_stop_at: Optional[datetime] = None
+
+
+class InstanceConfigBulkResponse(BaseModel):
+    results: List[InstanceConfigBulkItemResult]
+    counts: Dict[str, int]
@@ -0,0 +1,49 @@
+# app/schemas/instance_list.py
+
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class InstanceListItem(BaseModel):
+    """
+    Instância na listagem da frota (GET /instances).
+    """
+
+    id: UUID = Field(..., description="Identificador interno da instância (UUID).")
+    ocid: str = Field(..., description="OCID da instância.")
+    display_name: str
+    compartment_ocid: str
+    compartment_path: Optional[str] = Field(
+        None,
+        description="Path do compartment (ex: /tenancy/app/prod).",
+    )
+    region: str
+    availability_domain: Optional[str] = None
+    shape: Optional[str] = None
+    lifecycle_state: Optional[str] = None
+    is_active: bool
+
+    managed: bool = Field(False, description="Flag de InstanceConfig (False se não houver config).")
+    protection_flag: bool = Field(False, description="Flag de InstanceConfig (False se não houver config).")
+
+
+class InstanceListPage(BaseModel):
+    """
+    Página da listagem por keyset em (display_name, id).
+    """
+
+    items: List[InstanceListItem]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor para a próxima página (passar em ?cursor=); None na última página.",
+    )
+
+
+class InstanceCount(BaseModel):
+    """Resposta de GET /instances/count."""
+
+    count: int
@@ -0,0 +1,74 @@
+# app/schemas/schedule_policy.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SchedulePolicyUpdate(BaseModel):
+    """
+    Payload de upsert da política de agendamento de um compartment (PUT).
+
+    Todos os campos são opcionais (update parcial, exclude_unset=True).
+    """
+
+    managed: Optional[bool] = Field(
+        None,
+        description=(
+            "Se as instâncias que herdam a política são gerenciadas. False desliga, "
+            "na subárvore, a política de um ancestral."
+        ),
+    )
+
+    default_start_cron: Optional[str] = Field(
+        None,
+        description="Expressão CRON de start herdada pela subárvore.",
+        examples=["0 8 * * 1-5"],
+    )
+
+    default_stop_cron: Optional[str] = Field(
+        None,
+        description="Expressão CRON de stop herdada pela subárvore.",
+        examples=["0 20 * * 1-5"],
+    )
+
+    timezone: Optional[str] = Field(
+        None,
+        description="Timezone IANA utilizado para o agendamento (ex.: 'America/Sao_Paulo').",
+    )
+
+    notes: Optional[str] = Field(
+        None,
+        description="Notas livres para administrador sobre a política.",
+    )
+
+
+class SchedulePolicyResponse(BaseModel):
+    """
+    Política de agendamento de um compartment.
+
+    Instâncias da subárvore herdam a política do ancestral mais próximo que
+    tiver uma; as que têm configuração própria mantêm o próprio ``managed`` e
+    só herdam os CRONs que deixaram vazios.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    compartment_id: UUID
+    compartment_ocid: str
+    managed: bool
+    default_start_cron: Optional[str] = None
+    default_stop_cron: Optional[str] = None
+    timezone: str
+    notes: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    affected_instances: int = Field(
+        0,
+        description="Agendamentos efetivos gravados ou removidos pela última alteração.",
+    )
@@ -0,0 +1,64 @@
+# app/schemas/sync_run.py
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SyncRunResponse(BaseModel):
+    """
+    Uma execução do sync de inventário (tabela sync_runs).
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    tenancy_ocid: Optional[str] = None
+    region: Optional[str] = Field(None, description="Região do config OCI usado no sync.")
+    trigger: str = Field(..., description="Origem: cli ou scheduler.")
+    status: str = Field(..., description="running, success ou failed.")
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    phase_seconds: Optional[Dict[str, float]] = Field(
+        None,
+        description="Segundos por fase (tree_fetch, compartment_upsert, instance_listing, ...).",
+    )
+    row_counts: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Linhas inseridas/alteradas/inalteradas/desativadas por tabela e por região.",
+    )
+    oci_calls: Optional[Dict[str, Dict[str, Any]]] = Field(
+        None,
+        description="Chamadas OCI por operação: calls, pages, retries, throttled, p50/p95/p99.",
+    )
+    failed_regions: Optional[Dict[str, str]] = None
+    generation: Optional[int] = Field(
+        None,
+        description="Geração do inventário publicada pelo sync (numa falha, a do que ficou commitado).",
+    )
+    error: Optional[str] = None
+
+
+class SyncRunPage(BaseModel):
+    """
+    Página do histórico por keyset em (started_at, id), mais novas primeiro.
+    """
+
+    items: List[SyncRunResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor para a próxima página (passar em ?cursor=); None na última página.",
+    )
+
+
+class LastSyncResponse(BaseModel):
+    """Resposta de GET /tenancies/{tenancy_id}/last-sync."""
+
+    run: SyncRunResponse
+    age_seconds: float = Field(..., description="Segundos desde o fim do último sync com sucesso.")
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import oci
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.instance_action import InstanceAction
+from .oci_action_executor import (
+    STATUS_DISPATCHED,
+    STATUS_FAILED,
+    STATUS_NOT_FOUND,
+    ActionReport,
+    RateLimiter,
+    execute_actions,
+)
+from .oci_clients import OCIClients
+from .scheduler import DueAction
+
+logger = logging.getLogger(__name__)
+
+# Status de uma linha da fila
+QUEUE_PENDING = "pending"
+QUEUE_RUNNING = "running"
+QUEUE_DONE = "done"
+QUEUE_SKIPPED = "skipped"
+QUEUE_FAILED = "failed"
+
+# Erros transitórios no loop do worker (conexão com o banco caiu, pool
+# esgotado, OCI indisponível): o worker faz rollback, espera e continua
+_RECOVERABLE_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    DisconnectionError,
+    PoolTimeoutError,
+    oci.exceptions.ServiceError,
+    oci.exceptions.RequestException,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Origem de uma ação enfileirada
+SOURCE_SCHEDULER = "scheduler"
+SOURCE_MANUAL = "manual"
+
+
+@dataclass
+class QueueWorkerStats:
+    """Totais acumulados por um worker da fila."""
+    batches: int = 0
+    claimed: int = 0
+    outcomes: Counter = field(default_factory=Counter)
+    # Ciclos interrompidos por erros transitórios
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Ações processadas (qualquer desfecho) por segundo."""
+        return self.claimed / self.seconds if self.seconds > 0 else 0.0
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def default_worker_id() -> str:
+    """Identificador do worker: ``host:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_actions(
+    db: Session,
+    actions: Iterable[DueAction],
+    source: str = SOURCE_SCHEDULER,
+) -> int:
+    """
+    Enfileira ações vencidas em um único INSERT.
+
+    Disparos já enfileirados (mesma instância, ação e horário) são ignorados
+    (ON CONFLICT DO NOTHING), então repetir um tick não duplica ações.
+
+    Não faz commit. O commit/rollback é responsabilidade de quem chamou; feito
+    na mesma transação do tick, o reagendamento e o enfileiramento são atômicos.
+
+    :return: quantidade de ações efetivamente enfileiradas
+    """
+    now = _utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "instance_id": action.instance_id,
+            "action": action.action,
+            "source": source,
+            "scheduled_at": action.scheduled_at,
+            "available_at": action.scheduled_at,
+            "status": QUEUE_PENDING,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for action in actions
+    ]
+    if not rows:
+        return 0
+
+    stmt = (
+        pg_insert(InstanceAction.__table__)
+        .values(rows)
+        .on_conflict_do_nothing(constraint="uq_instance_actions_instance_action_scheduled")
+        .returning(InstanceAction.__table__.c.id)
+    )
+    inserted = len(db.execute(stmt).all())
+    logger.info("Fila de ações: %d de %d ações enfileiradas (%s)", inserted, len(rows), source)
+    return inserted
+
+
+def enqueue_manual_action(db: Session, instance_id: Any, action: str) -> InstanceAction:
+    """
+    Enfileira uma ação disparada manualmente (API), para execução imediata.
+
+    Não faz commit.
+    """
+    now = _utcnow()
+    row = InstanceAction(
+        instance_id=instance_id,
+        action=action,
+        source=SOURCE_MANUAL,
+        scheduled_at=now,
+        available_at=now,
+        status=QUEUE_PENDING,
+        attempts=0,
+    )
+    db.add(row)
+    db.flush()
+    return row
+
+
+def claim_actions(
+    db: Session,
+    worker_id: str,
+    batch_size: Optional[int] = None,
+    lease_seconds: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[InstanceAction]:
+    """
+    Pega um lote de ações para ``worker_id``.
+
+    Um único UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED) marca
+    como ``running`` (com lease até ``now + lease_seconds``) as ações pendentes
+    já disponíveis e as ações cujo lease expirou (worker que morreu). Workers
+    concorrentes pulam as linhas travadas uns dos outros, então cada ação é
+    pega por um único worker.
+
+    Leases expirados que já esgotaram ``Settings.ACTION_QUEUE_MAX_ATTEMPTS``
+    são marcados como ``failed`` em vez de retomados.
+
+    O lease precisa ser maior que o tempo de processamento de um lote, senão a
+    ação pode ser retomada por outro worker enquanto ainda está em andamento.
+
+    Não faz commit; o chamador deve commitar logo em seguida para que o lease
+    fique visível e as travas sejam liberadas.
+
+    :return: ações pegas, com ``attempts`` já incrementado
+    """
+    settings = get_settings()
+    if batch_size is None:
+        batch_size = settings.ACTION_QUEUE_BATCH_SIZE
+    if lease_seconds is None:
+        lease_seconds = settings.ACTION_QUEUE_LEASE_SECONDS
+    now = now or _utcnow()
+    max_attempts = settings.ACTION_QUEUE_MAX_ATTEMPTS
+
+    lease_expired = and_(
+        InstanceAction.status == QUEUE_RUNNING,
+        InstanceAction.lease_expires_at < now,
+    )
+
+    exhausted = db.execute(
+        update(InstanceAction)
+        .where(lease_expired, InstanceAction.attempts >= max_attempts)
+        .values(
+            status=QUEUE_FAILED,
+            last_error="Lease expirado após o número máximo de tentativas",
+            lease_owner=None,
+            lease_expires_at=None,
+            finished_at=now,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if exhausted:
+        logger.warning("Fila de ações: %d ações com lease expirado marcadas como failed", exhausted)
+
+    claimable = (
+        select(InstanceAction.id)
+        .where(
+            or_(
+                and_(InstanceAction.status == QUEUE_PENDING, InstanceAction.available_at <= now),
+                lease_expired,
+            )
+        )
+        .order_by(InstanceAction.available_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    claimed = list(
+        db.scalars(
+            update(InstanceAction)
+            .where(InstanceAction.id.in_(claimable))
+            .values(
+                status=QUEUE_RUNNING,
+                attempts=InstanceAction.attempts + 1,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                updated_at=now,
+            )
+            .returning(InstanceAction)
+            .execution_options(synchronize_session="fetch")
+        )
+    )
+    claimed.sort(key=lambda row: row.available_at)
+
+    logger.debug("Fila de ações: worker %s pegou %d ações", worker_id, len(claimed))
+    return claimed
+
+
+def complete_actions(
+    db: Session,
+    worker_id: str,
+    claimed: List[InstanceAction],
+    report: ActionReport,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Grava o desfecho das ações pegas por ``worker_id``.
+
+    ``report.results`` deve estar na mesma ordem de ``claimed`` (como devolvido
+    por :func:`execute_actions`). Falhas com tentativas restantes voltam para
+    ``pending``, adiadas por ``Settings.ACTION_QUEUE_RETRY_DELAY_SECONDS`` x
+    tentativas.
+
+    Só atualiza linhas cujo lease ainda pertence ao worker: se o lease expirou
+    e outra instância do worker retomou a ação, o resultado é descartado
+    (contado como ``lost``).
+
+    Não faz commit.
+
+    :return: quantidade de ações por status final (+ ``lost``)
+    """
+    settings = get_settings()
+    now = now or _utcnow()
+    params = []
+    outcomes: Counter = Counter()
+
+    for row, result in zip(claimed, report.results):
+        status, error, available_at, finished_at = QUEUE_DONE, None, row.available_at, now
+
+        if result.status == STATUS_DISPATCHED:
+            pass
+        elif result.status == STATUS_FAILED:
+            error = result.error
+            if row.attempts < settings.ACTION_QUEUE_MAX_ATTEMPTS:
+                status, finished_at = QUEUE_PENDING, None
+                available_at = now + timedelta(
+                    seconds=settings.ACTION_QUEUE_RETRY_DELAY_SECONDS * row.attempts
+                )
+            else:
+                status = QUEUE_FAILED
+        elif result.status == STATUS_NOT_FOUND:
+            status, error = QUEUE_SKIPPED, "Instância não encontrada ou inativa"
+        else:
+            # skipped_unmanaged / skipped_protected
+            status, error = QUEUE_SKIPPED, result.status
+
+        params.append(
+            {
+                "b_id": row.id,
+                "b_status": status,
+                "b_last_error": error,
+                "b_available_at": available_at,
+                "b_finished_at": finished_at,
+            }
+        )
+        outcomes["retried" if status == QUEUE_PENDING else status] += 1
+
+    if params:
+        table = InstanceAction.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.id == bindparam("b_id"),
+                table.c.lease_owner == worker_id,
+                table.c.status == QUEUE_RUNNING,
+            )
+            .values(
+                status=bindparam("b_status"),
+                last_error=bindparam("b_last_error"),
+                available_at=bindparam("b_available_at"),
+                finished_at=bindparam("b_finished_at"),
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=now,
+            )
+        )
+        updated = db.execute(stmt, params).rowcount
+        if updated >= 0 and updated < len(params):
+            outcomes["lost"] = len(params) - updated
+            logger.warning(
+                "Fila de ações: %d resultados descartados (lease do worker %s expirou)",
+                outcomes["lost"],
+                worker_id,
+            )
+
+    return dict(outcomes)
+
+
+def run_action_worker(
+    session_factory: Callable[[], Session],
+    clients: OCIClients,
+    worker_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    lease_seconds: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    once: bool = False,
+    stop_event: Optional[threading.Event] = None,
+) -> QueueWorkerStats:
+    """
+    Loop de um worker da fila: pega um lote, executa e grava o desfecho.
+
+    Diferente dos demais serviços, gerencia as próprias sessões e transações
+    (uma para o claim, outra para o desfecho de cada lote), já que o lease
+    precisa ficar visível aos outros workers durante a execução.
+
+    Erros transitórios (banco ou OCI indisponível) não derrubam o worker: o
+    ciclo sofre rollback, o worker espera (backoff exponencial até
+    ``Settings.ACTION_QUEUE_ERROR_BACKOFF_MAX_SECONDS``) e tenta de novo; as
+    ações já pegas voltam para a fila quando o lease expira. Demais erros
+    (bugs) são propagados.
+
+    :param session_factory: fábrica de sessões (ex: WorkerSessionLocal)
+    :param clients: clients OCI, reaproveitados entre lotes
+    :param worker_id: identificador do worker (default: host:pid)
+    :param once: se True, sai quando a fila não tiver ações disponíveis (e
+                 propaga também os erros transitórios)
+    :param stop_event: encerra o loop quando setado
+    :return: totais processados pelo worker
+    """
+    settings = get_settings()
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or threading.Event()
+    limiter = RateLimiter(settings.ACTION_RATE_PER_SECOND, settings.ACTION_BURST)
+    stats = QueueWorkerStats()
+    started = time.monotonic()
+    error_delay = 0.0
+
+    logger.info("Worker da fila de ações %s iniciado", worker_id)
+
+    while not stop_event.is_set():
+        db = session_factory()
+        try:
+            claimed = claim_actions(db, worker_id, batch_size=batch_size, lease_seconds=lease_seconds)
+            db.commit()
+
+            if not claimed:
+                if once:
+                    break
+                stop_event.wait(settings.ACTION_QUEUE_POLL_SECONDS)
+                continue
+
+            report = execute_actions(
+                db,
+                clients,
+                [DueAction(row.instance_id, row.action, row.scheduled_at) for row in claimed],
+                max_workers=max_workers,
+                limiter=limiter,
+            )
+            outcomes = complete_actions(db, worker_id, claimed, report)
+            db.commit()
+
+            stats.batches += 1
+            stats.claimed += len(claimed)
+            stats.outcomes.update(outcomes)
+            error_delay = 0.0
+        except _RECOVERABLE_ERRORS:
+            _rollback_quietly(db, worker_id)
+            if once:
+                raise
+            stats.errors += 1
+            error_delay = min(
+                settings.ACTION_QUEUE_ERROR_BACKOFF_MAX_SECONDS,
+                max(settings.ACTION_QUEUE_POLL_SECONDS, error_delay * 2),
+            )
+            logger.exception(
+                "Erro transitório no worker da fila de ações %s. Nova tentativa em %.1fs.",
+                worker_id,
+                error_delay,
+            )
+            stop_event.wait(error_delay)
+        except Exception:
+            logger.exception("Erro no worker da fila de ações %s. Fazendo rollback.", worker_id)
+            _rollback_quietly(db, worker_id)
+            raise
+        finally:
+            db.close()
+
+    stats.seconds = time.monotonic() - started
+    logger.info(
+        "Worker da fila de ações %s: %d lotes, %d ações em %.2fs (%.1f ações/s), %d erros %s",
+        worker_id,
+        stats.batches,
+        stats.claimed,
+        stats.seconds,
+        stats.throughput,
+        stats.errors,
+        dict(stats.outcomes),
+    )
+    return stats
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _rollback_quietly(db: Session, worker_id: str) -> None:
+    """Rollback que não mascara o erro original (a conexão pode já ter caído)."""
+    try:
+        db.rollback()
+    except Exception:  # noqa: BLE001
+        logger.warning("Rollback falhou no worker da fila de ações %s", worker_id, exc_info=True)
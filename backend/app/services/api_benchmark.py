@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import http.client
+import itertools
+import logging
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models.compartment import Compartment
+from ..models.instance import Instance
+
+logger = logging.getLogger(__name__)
+
+# Stacks comparadas: valor de DATABASE_ASYNC_ENABLED de cada uma
+API_STACKS: Dict[str, bool] = {"sync": False, "async": True}
+
+# Tipos de rota do mix, reportados separadamente: a navegação é pesada em
+# CPU (snapshot, hash do ETag, validação pydantic) e a configuração é
+# basicamente I/O de banco
+ROUTE_NAVIGATION = "navigation"
+ROUTE_CONFIG = "config"
+
+# Diretório do backend (onde ``app.main`` é importável pelo uvicorn)
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class StackBenchmark:
+    """Resultado da carga contra uma stack da API."""
+    stack: str
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    # Latência de cada request, em segundos
+    latencies: List[float] = field(default_factory=list, repr=False)
+    # Latências por tipo de rota (ROUTE_NAVIGATION, ROUTE_CONFIG)
+    route_latencies: Dict[str, List[float]] = field(default_factory=dict, repr=False)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.seconds if self.seconds > 0 else 0.0
+
+    def percentile(self, pct: float, route: Optional[str] = None) -> float:
+        """
+        Latência (s) no percentil ``pct`` (0-100), pelo método nearest-rank.
+
+        :param route: só os requests desse tipo de rota; None = todos
+        """
+        latencies = self.latencies if route is None else self.route_latencies.get(route, [])
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+        return ordered[rank - 1]
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def benchmark_paths(db: Session, tenancy_ocid: str, max_paths: int = 200) -> List[str]:
+    """
+    Mix de GETs das rotas que têm versão async: navegação em compartments da
+    tenancy e configuração de instâncias ativas (metade de cada).
+    """
+    half = max(1, max_paths // 2)
+    compartment_ocids = db.scalars(
+        select(Compartment.compartment_ocid)
+        .where(Compartment.tenancy_ocid == tenancy_ocid, Compartment.is_active.is_(True))
+        .order_by(Compartment.path)
+        .limit(half)
+    ).all()
+    instance_ids = db.scalars(
+        select(Instance.id)
+        .join(Compartment, Compartment.id == Instance.compartment_id)
+        .where(Compartment.tenancy_ocid == tenancy_ocid, Instance.is_active.is_(True))
+        .order_by(Instance.display_name)
+        .limit(half)
+    ).all()
+
+    paths = [f"/api/v1/tenancies/{tenancy_ocid}/compartments/{ocid}" for ocid in compartment_ocids]
+    paths += [f"/api/v1/instances/{instance_id}/config" for instance_id in instance_ids]
+    return paths
+
+
+def run_api_benchmark(
+    paths: Sequence[str],
+    requests: int,
+    concurrency: int,
+    stacks: Sequence[str] = tuple(API_STACKS),
+    port: int = 8765,
+    warmup: int = 200,
+) -> List[StackBenchmark]:
+    """
+    Sobe a API (uvicorn, um worker) uma vez por stack, com
+    ``DATABASE_ASYNC_ENABLED`` correspondente, e dispara ``requests`` GETs
+    (``paths`` em rodízio) com ``concurrency`` conexões keep-alive.
+
+    O cliente é o mesmo nas duas rodadas (threads + http.client), então a
+    diferença medida vem do servidor: threadpool + psycopg2 x event loop +
+    asyncpg.
+
+    Navegação e configuração são reportadas separadamente. Na stack async só
+    o I/O de banco deixa de bloquear: o corpo da rota (montagem da snapshot,
+    hash do ETag, validação pydantic) roda via ``run_sync`` na thread do
+    event loop, então uma navegação pesada em CPU segura todos os outros
+    requests do worker (na stack sync ela ocupa uma thread do threadpool,
+    disputando o GIL). O async não remove esse gargalo; a latência da
+    navegação mostra quanto ele pesa.
+
+    :param warmup: requests descartados antes da medição (caches, pool de conexões)
+    :return: um resultado por stack, na ordem de ``stacks``
+    """
+    results = []
+    for stack in stacks:
+        env = dict(os.environ, DATABASE_ASYNC_ENABLED=str(API_STACKS[stack]).lower())
+        process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+            ],
+            cwd=_BACKEND_DIR,
+            env=env,
+        )
+        try:
+            _wait_until_ready(port, process)
+            if warmup:
+                _run_load("warmup", port, paths, warmup, concurrency)
+            result = _run_load(stack, port, paths, requests, concurrency)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        logger.info(
+            "Stack %-5s: %d requests (%d erros) em %.2fs, %.1f req/s, p50=%.1fms p99=%.1fms",
+            stack,
+            result.requests,
+            result.errors,
+            result.seconds,
+            result.requests_per_second,
+            result.percentile(50) * 1000,
+            result.percentile(99) * 1000,
+        )
+        for route in (ROUTE_NAVIGATION, ROUTE_CONFIG):
+            logger.info(
+                "  %-10s: %d requests, p50=%.1fms p99=%.1fms",
+                route,
+                len(result.route_latencies.get(route, [])),
+                result.percentile(50, route) * 1000,
+                result.percentile(99, route) * 1000,
+            )
+        results.append(result)
+    return results
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _wait_until_ready(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn encerrou na subida (código {process.returncode})")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/v1/health")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"API não respondeu em {timeout:.0f}s na porta {port}")
+
+
+def _route_of(path: str) -> str:
+    return ROUTE_NAVIGATION if "/compartments/" in path else ROUTE_CONFIG
+
+
+def _run_load(
+    stack: str,
+    port: int,
+    paths: Sequence[str],
+    requests: int,
+    concurrency: int,
+) -> StackBenchmark:
+    result = StackBenchmark(stack)
+    lock = threading.Lock()
+    cycle = itertools.cycle(paths)
+    remaining = [requests]
+
+    def next_path() -> Optional[str]:
+        with lock:
+            if remaining[0] <= 0:
+                return None
+            remaining[0] -= 1
+            return next(cycle)
+
+    def client() -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        latencies: Dict[str, List[float]] = {}
+        errors = 0
+        while (path := next_path()) is not None:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            latencies.setdefault(_route_of(path), []).append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            for route, values in latencies.items():
+                result.latencies.extend(values)
+                result.route_latencies.setdefault(route, []).extend(values)
+            result.errors += errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        for future in [executor.submit(client) for _ in range(concurrency)]:
+            future.result()
+    result.seconds = time.perf_counter() - started
+    result.requests = len(result.latencies)
+    return result
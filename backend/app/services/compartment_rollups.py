@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import and_, func, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from ..models.compartment import Compartment
+from ..models.compartment_rollup import CompartmentRollup
+from ..models.instance import Instance
+from ..models.instance_effective_schedule import InstanceEffectiveSchedule
+from .tenancy_locks import lock_compartment_tenancies, lock_tenancies
+
+logger = logging.getLogger(__name__)
+
+# Contadores mantidos por compartment (colunas direct_<nome> / subtree_<nome>)
+ROLLUP_COUNTERS = (
+    "total",
+    "running",
+    "stopped",
+    "starting",
+    "stopping",
+    "provisioning",
+    "managed",
+    "protected",
+)
+
+# Contador -> lifecycle_state contado por ele
+_STATE_COUNTERS = {
+    "running": "RUNNING",
+    "stopped": "STOPPED",
+    "starting": "STARTING",
+    "stopping": "STOPPING",
+    "provisioning": "PROVISIONING",
+}
+
+# Limite de profundidade da subida recursiva (proteção contra ciclos)
+_MAX_TREE_DEPTH = 64
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def get_compartment_rollups(db: Session, compartment_ids: Iterable[Any]) -> Dict[Any, CompartmentRollup]:
+    """
+    Rollups dos compartments informados, em uma consulta (``{compartment_id: rollup}``).
+
+    Compartments sem linha (tenancy ainda não sincronizada desde a criação da
+    tabela) ficam de fora do dict.
+    """
+    ids = list(compartment_ids)
+    if not ids:
+        return {}
+    return {
+        rollup.compartment_id: rollup
+        for rollup in db.scalars(
+            select(CompartmentRollup).where(CompartmentRollup.compartment_id.in_(ids))
+        )
+    }
+
+
+def refresh_compartment_rollups(db: Session, compartment_ids: Iterable[Any]) -> int:
+    """
+    Recalcula os rollups após mudanças em instâncias dos compartments informados
+    (ex: configuração alterada, ação executada).
+
+    Só conta as instâncias desses compartments (índice em
+    ``instances.compartment_id``) e propaga os totais de subárvore para os
+    ancestrais, um nível por statement, somando os rollups dos filhos: nenhuma
+    varredura de ``instances`` fora dos compartments afetados.
+
+    Trava as tenancies envolvidas (:func:`lock_tenancies`) antes de recontar,
+    então recontagens concorrentes da mesma tenancy não se sobrescrevem.
+
+    Não faz commit.
+
+    :return: quantidade de linhas de rollup alteradas
+    """
+    ids = {cid for cid in compartment_ids if cid is not None}
+    if not ids:
+        return 0
+
+    lock_compartment_tenancies(db, ids)
+    changed = _refresh_direct(db, ids)
+    changed += _refresh_subtree(db, _ancestor_levels(db, ids))
+    return changed
+
+
+def refresh_rollups_after_sync(
+    db: Session,
+    tenancy_ocid: str,
+    compartment_ids: Iterable[Any],
+    structure_changed: bool = False,
+) -> int:
+    """
+    Atualiza os rollups da tenancy ao fim de um sync.
+
+    - Contagens diretas: só dos compartments com instâncias escritas pelo sync
+      (``compartment_ids``) e dos que ainda não têm linha de rollup (na
+      primeira execução, todos).
+    - Subárvore: dos ancestrais dos compartments afetados; se a árvore mudou
+      (``structure_changed``) ou havia linhas faltando, de todos os
+      compartments da tenancy (custo proporcional ao número de compartments,
+      não de instâncias).
+
+    Trava a tenancy antes de recontar, como :func:`refresh_compartment_rollups`.
+
+    Não faz commit.
+
+    :return: quantidade de linhas de rollup alteradas
+    """
+    ids = {cid for cid in compartment_ids if cid is not None}
+    lock_tenancies(db, [tenancy_ocid])
+
+    missing = set(
+        db.scalars(
+            select(Compartment.id)
+            .outerjoin(CompartmentRollup, CompartmentRollup.compartment_id == Compartment.id)
+            .where(
+                Compartment.tenancy_ocid == tenancy_ocid,
+                Compartment.is_active.is_(True),
+                CompartmentRollup.compartment_id.is_(None),
+            )
+        )
+    )
+
+    changed = _refresh_direct(db, ids | missing)
+
+    if structure_changed or missing:
+        rows = db.execute(
+            select(Compartment.id, Compartment.path).where(
+                Compartment.tenancy_ocid == tenancy_ocid,
+                Compartment.is_active.is_(True),
+            )
+        ).all()
+        levels = _group_by_depth(rows)
+    else:
+        levels = _ancestor_levels(db, ids)
+
+    changed += _refresh_subtree(db, levels)
+
+    logger.info(
+        "Rollups da tenancy %s: %d compartments recontados (%d sem linha), %d linhas alteradas",
+        tenancy_ocid,
+        len(ids | missing),
+        len(missing),
+        changed,
+    )
+    return changed
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _refresh_direct(db: Session, compartment_ids: Set[Any]) -> int:
+    """
+    Recontagem direta (INSERT ... SELECT ... ON CONFLICT DO UPDATE) dos
+    compartments informados. Linhas novas nascem com subtree = direct; o
+    ajuste de subárvore vem depois, em :func:`_refresh_subtree`.
+    """
+    if not compartment_ids:
+        return 0
+
+    counters = [
+        func.count(Instance.id).label("total"),
+        *[
+            func.count(Instance.id)
+            .filter(Instance.lifecycle_state == state)
+            .label(name)
+            for name, state in _STATE_COUNTERS.items()
+        ],
+        func.count(Instance.id).filter(InstanceEffectiveSchedule.managed.is_(True)).label("managed"),
+        func.count(Instance.id).filter(InstanceEffectiveSchedule.protection_flag.is_(True)).label("protected"),
+    ]
+
+    counts = (
+        select(
+            Compartment.id,
+            Compartment.tenancy_ocid,
+            *counters,
+            *[c.label(f"subtree_{c.name}") for c in counters],
+            func.now(),
+        )
+        .select_from(Compartment)
+        .outerjoin(
+            Instance,
+            and_(Instance.compartment_id == Compartment.id, Instance.is_active.is_(True)),
+        )
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .where(Compartment.id.in_(list(compartment_ids)))
+        .group_by(Compartment.id)
+    )
+
+    table = CompartmentRollup.__table__
+    direct = [f"direct_{name}" for name in ROLLUP_COUNTERS]
+    subtree = [f"subtree_{name}" for name in ROLLUP_COUNTERS]
+
+    stmt = pg_insert(table).from_select(
+        ["compartment_id", "tenancy_ocid", *direct, *subtree, "updated_at"],
+        counts,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.compartment_id],
+        set_={
+            **{name: stmt.excluded[name] for name in direct},
+            "updated_at": func.now(),
+        },
+        where=tuple_(*[table.c[name] for name in direct]).is_distinct_from(
+            tuple_(*[stmt.excluded[name] for name in direct])
+        ),
+    )
+    return db.execute(stmt).rowcount
+
+
+def _ancestor_levels(db: Session, compartment_ids: Set[Any]) -> List[List[Any]]:
+    """
+    Os compartments informados e todos os seus ancestrais, agrupados por
+    profundidade (do mais profundo para a raiz), via ``WITH RECURSIVE``.
+    """
+    if not compartment_ids:
+        return []
+
+    chain = (
+        select(Compartment.id, Compartment.parent_id, Compartment.path, literal_column("0").label("depth"))
+        .where(Compartment.id.in_(list(compartment_ids)))
+        .cte("chain", recursive=True)
+    )
+    ancestor = aliased(Compartment)
+    chain = chain.union_all(
+        select(ancestor.id, ancestor.parent_id, ancestor.path, chain.c.depth + 1)
+        .join(chain, ancestor.id == chain.c.parent_id)
+        .where(chain.c.depth < _MAX_TREE_DEPTH)
+    )
+
+    rows = db.execute(select(chain.c.id, chain.c.path).distinct()).all()
+    return _group_by_depth(rows)
+
+
+def _group_by_depth(rows: Iterable[Any]) -> List[List[Any]]:
+    # Profundidade pelo path (/tenancy = 1, /tenancy/a = 2, ...)
+    levels: Dict[int, List[Any]] = defaultdict(list)
+    for row in rows:
+        levels[row.path.count("/")].append(row.id)
+    return [levels[depth] for depth in sorted(levels, reverse=True)]
+
+
+def _refresh_subtree(db: Session, levels: List[List[Any]]) -> int:
+    """
+    subtree = direct + soma dos subtree dos filhos ativos, um UPDATE por nível
+    (do mais profundo para a raiz, então os filhos já estão atualizados).
+    """
+    table = CompartmentRollup.__table__
+    child = aliased(Compartment)
+    child_rollup = table.alias("child_rollup")
+    changed = 0
+
+    for level in levels:
+        sums = (
+            select(
+                Compartment.id.label("compartment_id"),
+                *[
+                    func.coalesce(func.sum(child_rollup.c[f"subtree_{name}"]), 0).label(name)
+                    for name in ROLLUP_COUNTERS
+                ],
+            )
+            .select_from(Compartment)
+            .outerjoin(child, and_(child.parent_id == Compartment.id, child.is_active.is_(True)))
+            .outerjoin(child_rollup, child_rollup.c.compartment_id == child.id)
+            .where(Compartment.id.in_(level))
+            .group_by(Compartment.id)
+            .subquery("sums")
+        )
+
+        new_values = {
+            f"subtree_{name}": table.c[f"direct_{name}"] + sums.c[name]
+            for name in ROLLUP_COUNTERS
+        }
+        changed += db.execute(
+            update(table)
+            .where(
+                table.c.compartment_id == sums.c.compartment_id,
+                tuple_(*[table.c[col] for col in new_values]).is_distinct_from(
+                    tuple_(*new_values.values())
+                ),
+            )
+            .values(**new_values, updated_at=func.now())
+        ).rowcount
+
+    return changed
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.compartment import Compartment
+from ..models.instance import Instance
+from .inventory_generation import get_inventory_generation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CompartmentNode:
+    """Compartment na snapshot (somente campos estruturais/estáveis)."""
+    id: Any
+    ocid: str
+    name: str
+    description: Optional[str]
+    parent_ocid: Optional[str]
+
+
+@dataclass(frozen=True)
+class InstanceNode:
+    """
+    Instância na snapshot. Campos voláteis (lifecycle_state, flags de
+    configuração) não entram aqui: mudam fora do sync e são lidos do banco.
+    """
+    id: Any
+    ocid: str
+    display_name: str
+    region: Optional[str]
+    availability_domain: Optional[str]
+
+
+@dataclass(frozen=True)
+class CompartmentTreeSnapshot:
+    """
+    Árvore de compartments imutável de uma tenancy, em uma geração do inventário.
+
+    Todos os mapas são somente leitura (MappingProxyType + tuplas), então a
+    mesma snapshot pode ser lida por várias threads sem trava.
+    """
+    tenancy_ocid: str
+    generation: int
+    root_ocid: str
+    nodes: Mapping[str, CompartmentNode]
+    # ocid -> filhos ativos, ordenados por nome
+    children: Mapping[str, Tuple[str, ...]]
+    # ocid -> trilha da raiz até o próprio compartment
+    ancestry: Mapping[str, Tuple[str, ...]]
+    # ocid -> instâncias ativas do compartment, ordenadas por display_name
+    instances: Mapping[str, Tuple[InstanceNode, ...]]
+
+    def parent_of(self, ocid: str) -> Optional[CompartmentNode]:
+        parent_ocid = self.nodes[ocid].parent_ocid
+        return self.nodes.get(parent_ocid) if parent_ocid else None
+
+
+class CompartmentTreeCache:
+    """
+    Cache por processo de :class:`CompartmentTreeSnapshot` por tenancy.
+
+    A cada leitura compara a geração da snapshot com a do banco (consulta por
+    chave primária, no máximo uma vez a cada
+    ``Settings.COMPARTMENT_TREE_CACHE_CHECK_SECONDS``) e reconstrói a
+    snapshot só quando um sync commitado mudou o inventário.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, CompartmentTreeSnapshot] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Criado no event loop da stack async (ver get_async)
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def get(self, db: Session, tenancy_ocid: str) -> Optional[CompartmentTreeSnapshot]:
+        """
+        Snapshot atual da tenancy (None se a tenancy não tiver raiz sincronizada).
+
+        :param db: sessão usada para checar a geração (e reconstruir, se preciso)
+        """
+        check_interval = get_settings().COMPARTMENT_TREE_CACHE_CHECK_SECONDS
+        snapshot = self._snapshots.get(tenancy_ocid)
+
+        if (
+            snapshot is not None
+            and time.monotonic() - self._checked_at.get(tenancy_ocid, 0.0) < check_interval
+        ):
+            return snapshot
+
+        generation = get_inventory_generation(db, tenancy_ocid)
+        if snapshot is not None and snapshot.generation == generation:
+            self._checked_at[tenancy_ocid] = time.monotonic()
+            return snapshot
+
+        with self._lock:
+            # Outra thread pode ter reconstruído enquanto esperávamos a trava
+            snapshot = self._snapshots.get(tenancy_ocid)
+            if snapshot is None or snapshot.generation != generation:
+                snapshot = build_tree_snapshot(db, tenancy_ocid, generation)
+                if snapshot is None:
+                    return None
+                self._snapshots[tenancy_ocid] = snapshot
+            self._checked_at[tenancy_ocid] = time.monotonic()
+
+        return snapshot
+
+    async def get_async(
+        self,
+        db: AsyncSession,
+        tenancy_ocid: str,
+    ) -> Optional[CompartmentTreeSnapshot]:
+        """
+        Versão de :meth:`get` para as rotas async (mesma checagem de geração).
+
+        A reconstrução é serializada por um ``asyncio.Lock``: o
+        ``threading.Lock`` de :meth:`get` não pode ficar preso durante o I/O
+        de um ``run_sync``, porque outra corrotina da mesma thread travaria o
+        event loop tentando adquiri-lo.
+        """
+        check_interval = get_settings().COMPARTMENT_TREE_CACHE_CHECK_SECONDS
+        snapshot = self._snapshots.get(tenancy_ocid)
+
+        if (
+            snapshot is not None
+            and time.monotonic() - self._checked_at.get(tenancy_ocid, 0.0) < check_interval
+        ):
+            return snapshot
+
+        generation = await db.run_sync(get_inventory_generation, tenancy_ocid)
+        if snapshot is not None and snapshot.generation == generation:
+            self._checked_at[tenancy_ocid] = time.monotonic()
+            return snapshot
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            snapshot = self._snapshots.get(tenancy_ocid)
+            if snapshot is None or snapshot.generation != generation:
+                snapshot = await db.run_sync(build_tree_snapshot, tenancy_ocid, generation)
+                if snapshot is None:
+                    return None
+                self._snapshots[tenancy_ocid] = snapshot
+            self._checked_at[tenancy_ocid] = time.monotonic()
+
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._checked_at.clear()
+
+
+# Cache compartilhado pelas rotas do processo
+tree_cache = CompartmentTreeCache()
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def build_tree_snapshot(
+    db: Session,
+    tenancy_ocid: str,
+    generation: int,
+) -> Optional[CompartmentTreeSnapshot]:
+    """
+    Monta a snapshot da tenancy com duas consultas (compartments e instâncias
+    ativos).
+
+    A geração deve ser lida *antes* da montagem: se um sync commitar no meio,
+    a snapshot fica rotulada com a geração antiga e é reconstruída na próxima
+    leitura, nunca o contrário.
+
+    :return: snapshot, ou None se a tenancy não tiver raiz sincronizada
+    """
+    started = time.monotonic()
+
+    rows = db.execute(
+        select(
+            Compartment.id,
+            Compartment.compartment_ocid,
+            Compartment.name,
+            Compartment.description,
+            Compartment.parent_ocid,
+            Compartment.is_tenancy_root,
+        ).where(
+            Compartment.tenancy_ocid == tenancy_ocid,
+            Compartment.is_active.is_(True),
+        )
+    ).all()
+
+    nodes: Dict[str, CompartmentNode] = {}
+    ids: Dict[Any, str] = {}
+    root_ocid: Optional[str] = None
+    for row in rows:
+        nodes[row.compartment_ocid] = CompartmentNode(
+            id=row.id,
+            ocid=row.compartment_ocid,
+            name=row.name,
+            description=row.description,
+            parent_ocid=None if row.is_tenancy_root else row.parent_ocid,
+        )
+        ids[row.id] = row.compartment_ocid
+        if row.is_tenancy_root:
+            root_ocid = row.compartment_ocid
+
+    if root_ocid is None:
+        return None
+
+    children: Dict[str, List[str]] = {ocid: [] for ocid in nodes}
+    for node in nodes.values():
+        if node.parent_ocid in children:
+            children[node.parent_ocid].append(node.ocid)
+    for child_list in children.values():
+        child_list.sort(key=lambda ocid: nodes[ocid].name)
+
+    ancestry: Dict[str, Tuple[str, ...]] = {}
+    for ocid in nodes:
+        _resolve_ancestry(ocid, nodes, ancestry)
+
+    instances: Dict[str, List[InstanceNode]] = {}
+    instance_rows = db.execute(
+        select(
+            Instance.id,
+            Instance.instance_ocid,
+            Instance.compartment_id,
+            Instance.display_name,
+            Instance.region,
+            Instance.availability_domain,
+        )
+        .where(
+            Instance.compartment_id.in_(list(ids)),
+            Instance.is_active.is_(True),
+        )
+        .order_by(Instance.display_name.asc())
+    ).all()
+    for row in instance_rows:
+        instances.setdefault(ids[row.compartment_id], []).append(
+            InstanceNode(
+                id=row.id,
+                ocid=row.instance_ocid,
+                display_name=row.display_name,
+                region=row.region,
+                availability_domain=row.availability_domain,
+            )
+        )
+
+    snapshot = CompartmentTreeSnapshot(
+        tenancy_ocid=tenancy_ocid,
+        generation=generation,
+        root_ocid=root_ocid,
+        nodes=MappingProxyType(nodes),
+        children=MappingProxyType({k: tuple(v) for k, v in children.items()}),
+        ancestry=MappingProxyType(ancestry),
+        instances=MappingProxyType({k: tuple(v) for k, v in instances.items()}),
+    )
+
+    logger.info(
+        "Snapshot da árvore da tenancy %s (geração %d): %d compartments, %d instâncias em %.3fs",
+        tenancy_ocid,
+        generation,
+        len(nodes),
+        len(instance_rows),
+        time.monotonic() - started,
+    )
+    return snapshot
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _resolve_ancestry(
+    ocid: str,
+    nodes: Mapping[str, CompartmentNode],
+    ancestry: Dict[str, Tuple[str, ...]],
+) -> Tuple[str, ...]:
+    """Trilha raiz -> ``ocid``, memoizada em ``ancestry`` (tolera ciclos/órfãos)."""
+    chain: List[str] = []
+    seen = set()
+    current: Optional[str] = ocid
+
+    while current is not None and current in nodes and current not in ancestry:
+        if current in seen:
+            break
+        seen.add(current)
+        chain.append(current)
+        current = nodes[current].parent_ocid
+
+    prefix = ancestry.get(current, ()) if current is not None else ()
+    for node_ocid in reversed(chain):
+        prefix = prefix + (node_ocid,)
+        ancestry[node_ocid] = prefix
+
+    return ancestry[ocid]
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from ..models.compartment import Compartment
+from ..models.compartment_schedule_policy import CompartmentSchedulePolicy
+from ..models.instance import Instance
+from ..models.instance_config import InstanceConfig
+from ..models.instance_effective_schedule import (
+    SOURCE_COMPARTMENT,
+    SOURCE_INSTANCE,
+    InstanceEffectiveSchedule,
+)
+from .instance_query import compartment_subtree_criteria
+from .scheduler import next_fire_times
+from .tenancy_locks import lock_compartment_tenancies
+
+logger = logging.getLogger(__name__)
+
+# Colunas do agendamento: se mudarem, os próximos disparos são recalculados
+_SCHEDULE_COLUMNS = (
+    "managed",
+    "default_start_cron",
+    "default_stop_cron",
+    "start_timezone",
+    "stop_timezone",
+)
+
+# Colunas contadas nos rollups por compartment
+_ROLLUP_COLUMNS = ("managed", "protection_flag")
+
+# Limite de profundidade da subida recursiva (proteção contra ciclos)
+_MAX_TREE_DEPTH = 64
+
+
+@dataclass
+class EffectiveScheduleChanges:
+    """Resultado de um refresh de agendamentos efetivos."""
+    upserted: int = 0
+    deleted: int = 0
+    # Compartments com instâncias cujo managed/protection_flag efetivo mudou
+    # (passar para refresh_compartment_rollups)
+    rollup_compartments: Set[Any] = field(default_factory=set)
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def get_effective_schedules(
+    db: Session,
+    instance_ids: Iterable[Any],
+) -> Dict[Any, InstanceEffectiveSchedule]:
+    """Agendamentos efetivos das instâncias informadas, em uma consulta (``{instance_id: linha}``)."""
+    ids = list(instance_ids)
+    if not ids:
+        return {}
+    return {
+        row.instance_id: row
+        for row in db.scalars(
+            select(InstanceEffectiveSchedule).where(InstanceEffectiveSchedule.instance_id.in_(ids))
+        )
+    }
+
+
+def refresh_effective_schedules(
+    db: Session,
+    compartment_ids: Iterable[Any] = (),
+    instance_ids: Iterable[Any] = (),
+    now: Optional[datetime] = None,
+    recompute: bool = False,
+) -> EffectiveScheduleChanges:
+    """
+    Recalcula o agendamento efetivo das instâncias ativas dos compartments
+    e/ou das instâncias informadas.
+
+    Regra de resolução, por instância:
+
+    1. com InstanceConfig, ``managed``/``protection_flag`` são sempre dela;
+       cada CRON vazio nela vem da política do compartment mais próximo na
+       trilha até a raiz (o próprio compartment incluído); cada CRON é
+       avaliado no timezone de onde veio (configuração ou política);
+    2. sem InstanceConfig, vale a política (protection_flag=False);
+    3. sem nenhuma das duas, a instância não tem linha.
+
+    As políticas de todos os compartments envolvidos são resolvidas em uma
+    única consulta (``WITH RECURSIVE`` subindo por ``parent_id``). Os
+    próximos disparos só são recalculados quando o agendamento muda, então
+    um disparo vencido e ainda não processado pelo tick não se perde; linhas
+    inalteradas não são reescritas.
+
+    Trava as tenancies envolvidas antes de ler (mesmo lock dos rollups, ver
+    :func:`~app.services.tenancy_locks.lock_tenancies`): dois refreshes
+    concorrentes não gravam por cima um do outro a partir do mesmo estado.
+
+    Não faz commit.
+
+    :param recompute: recalcula os próximos disparos mesmo sem mudança
+    :return: linhas gravadas/removidas e compartments a atualizar nos rollups
+    """
+    now = now or datetime.now(timezone.utc)
+    compartment_ids = {cid for cid in compartment_ids if cid is not None}
+    instance_ids = set(instance_ids)
+    changes = EffectiveScheduleChanges()
+    if not compartment_ids and not instance_ids:
+        return changes
+
+    scope = []
+    locked_compartments = set(compartment_ids)
+    if compartment_ids:
+        scope.append(Instance.compartment_id.in_(list(compartment_ids)))
+    if instance_ids:
+        scope.append(Instance.id.in_(list(instance_ids)))
+        locked_compartments.update(
+            db.scalars(select(Instance.compartment_id).where(Instance.id.in_(list(instance_ids))))
+        )
+    lock_compartment_tenancies(db, locked_compartments)
+
+    targets = db.execute(
+        select(
+            Instance.id,
+            Instance.compartment_id,
+            InstanceConfig.id.label("config_id"),
+            InstanceConfig.managed,
+            InstanceConfig.protection_flag,
+            InstanceConfig.default_start_cron,
+            InstanceConfig.default_stop_cron,
+            InstanceConfig.timezone,
+        )
+        .outerjoin(InstanceConfig, InstanceConfig.instance_id == Instance.id)
+        .where(or_(*scope), Instance.is_active.is_(True))
+    ).all()
+
+    table = InstanceEffectiveSchedule.__table__
+    existing = {
+        row.instance_id: row
+        for row in db.execute(
+            select(table, Instance.compartment_id)
+            .join(Instance, Instance.id == table.c.instance_id)
+            .where(or_(*scope))
+        ).all()
+    }
+
+    policies = _nearest_policies(db, {t.compartment_id for t in targets})
+
+    rows: List[Dict[str, Any]] = []
+    for target in targets:
+        desired = _resolve(target, policies.get(target.compartment_id))
+        if desired is None:
+            # Linha antiga (se houver) fica em ``existing`` e é removida abaixo
+            continue
+        old = existing.pop(target.id, None)
+
+        if (
+            old is not None
+            and not recompute
+            and all(old._mapping[name] == desired[name] for name in _SCHEDULE_COLUMNS)
+        ):
+            desired["next_start_at"] = old.next_start_at
+            desired["next_stop_at"] = old.next_stop_at
+        else:
+            desired["next_start_at"], desired["next_stop_at"] = _next_fire_times(
+                target.id, desired, now
+            )
+
+        if old is not None and all(old._mapping[name] == value for name, value in desired.items()):
+            continue
+
+        if old is None or any(old._mapping[name] != desired[name] for name in _ROLLUP_COLUMNS):
+            changes.rollup_compartments.add(target.compartment_id)
+        rows.append({"instance_id": target.id, **desired, "updated_at": now})
+
+    if rows:
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.instance_id],
+            set_={name: stmt.excluded[name] for name in rows[0] if name != "instance_id"},
+        )
+        db.execute(stmt, rows)
+        changes.upserted = len(rows)
+
+    # Sobraram as linhas de instâncias inativas ou sem configuração/política
+    if existing:
+        db.execute(delete(table).where(table.c.instance_id.in_(list(existing))))
+        changes.deleted = len(existing)
+        changes.rollup_compartments.update(
+            row.compartment_id
+            for row in existing.values()
+            if any(row._mapping[name] for name in _ROLLUP_COLUMNS)
+        )
+
+    logger.info(
+        "Agendamentos efetivos: %d instâncias avaliadas, %d gravados, %d removidos",
+        len(targets),
+        changes.upserted,
+        changes.deleted,
+    )
+    return changes
+
+
+def refresh_policy_subtree(
+    db: Session,
+    compartment: Compartment,
+    now: Optional[datetime] = None,
+) -> EffectiveScheduleChanges:
+    """
+    Recalcula os agendamentos efetivos da subárvore de ``compartment`` após
+    criar, alterar ou remover a política dele.
+
+    A subárvore vem do índice ``text_pattern_ops`` de ``compartments.path``.
+    Não faz commit.
+    """
+    compartment_ids = db.scalars(
+        select(Compartment.id).where(
+            Compartment.tenancy_ocid == compartment.tenancy_ocid,
+            Compartment.is_active.is_(True),
+            compartment_subtree_criteria(compartment.path),
+        )
+    )
+    return refresh_effective_schedules(db, compartment_ids=compartment_ids, now=now)
+
+
+def refresh_all_effective_schedules(
+    db: Session,
+    now: Optional[datetime] = None,
+) -> EffectiveScheduleChanges:
+    """
+    Recalcula os agendamentos efetivos de todas as instâncias ativas.
+
+    Para alinhar as linhas já gravadas depois de uma mudança na regra de
+    resolução; o dia a dia usa os refreshes incrementais. Não faz commit.
+    """
+    compartment_ids = db.scalars(select(Compartment.id).where(Compartment.is_active.is_(True)))
+    return refresh_effective_schedules(db, compartment_ids=compartment_ids, now=now)
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _nearest_policies(db: Session, compartment_ids: Set[Any]) -> Dict[Any, Any]:
+    """
+    Política do compartment mais próximo (ele mesmo ou um ancestral) de cada
+    compartment informado, em uma consulta (``{compartment_id: política}``).
+    """
+    if not compartment_ids:
+        return {}
+
+    chain = (
+        select(
+            Compartment.id.label("start_id"),
+            Compartment.id,
+            Compartment.parent_id,
+            literal_column("0").label("depth"),
+        )
+        .where(Compartment.id.in_(list(compartment_ids)))
+        .cte("chain", recursive=True)
+    )
+    ancestor = aliased(Compartment)
+    chain = chain.union_all(
+        select(chain.c.start_id, ancestor.id, ancestor.parent_id, chain.c.depth + 1)
+        .join(chain, ancestor.id == chain.c.parent_id)
+        .where(chain.c.depth < _MAX_TREE_DEPTH)
+    )
+
+    policy = CompartmentSchedulePolicy
+    rows = db.execute(
+        select(
+            chain.c.start_id,
+            policy.compartment_id,
+            policy.managed,
+            policy.default_start_cron,
+            policy.default_stop_cron,
+            policy.timezone,
+        )
+        .join(policy, policy.compartment_id == chain.c.id)
+        .order_by(chain.c.start_id, chain.c.depth)
+        .distinct(chain.c.start_id)
+    ).all()
+    return {row.start_id: row for row in rows}
+
+
+def _resolve(target: Any, policy: Optional[Any]) -> Optional[Dict[str, Any]]:
+    """Colunas do agendamento efetivo de uma instância (None = sem linha)."""
+    if target.config_id is None:
+        if policy is None:
+            return None
+        return {
+            "source": SOURCE_COMPARTMENT,
+            "policy_compartment_id": policy.compartment_id,
+            "managed": bool(policy.managed),
+            "protection_flag": False,
+            "default_start_cron": policy.default_start_cron,
+            "default_stop_cron": policy.default_stop_cron,
+            "start_timezone": policy.timezone or "UTC",
+            "stop_timezone": policy.timezone or "UTC",
+        }
+
+    # Com configuração, managed/protection_flag são sempre dela; da política
+    # só vêm os CRONs que ela deixou vazios, cada um com o timezone da política
+    config_timezone = target.timezone or "UTC"
+    start_cron, start_timezone = target.default_start_cron, config_timezone
+    stop_cron, stop_timezone = target.default_stop_cron, config_timezone
+    own_cron = bool(start_cron or stop_cron)
+    inherits = policy is not None and not (start_cron and stop_cron)
+    if inherits:
+        policy_timezone = policy.timezone or "UTC"
+        if not start_cron:
+            start_cron, start_timezone = policy.default_start_cron, policy_timezone
+        if not stop_cron:
+            stop_cron, stop_timezone = policy.default_stop_cron, policy_timezone
+
+    return {
+        "source": SOURCE_INSTANCE if own_cron or policy is None else SOURCE_COMPARTMENT,
+        "policy_compartment_id": policy.compartment_id if inherits else None,
+        "managed": bool(target.managed),
+        "protection_flag": bool(target.protection_flag),
+        "default_start_cron": start_cron,
+        "default_stop_cron": stop_cron,
+        "start_timezone": start_timezone,
+        "stop_timezone": stop_timezone,
+    }
+
+
+def _next_fire_times(instance_id: Any, values: Dict[str, Any], now: datetime) -> Any:
+    try:
+        return next_fire_times(
+            values["managed"],
+            values["default_start_cron"],
+            values["default_stop_cron"],
+            values["start_timezone"],
+            values["stop_timezone"],
+            now,
+        )
+    except ValueError:
+        # CRON/timezone gravados antes da validação: instância fica sem disparos
+        logger.exception(
+            "CRON/timezone inválido no agendamento efetivo da instância %s; sem disparos",
+            instance_id,
+        )
+        return None, None
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional
+from uuid import UUID
+
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models.instance import Instance
+from ..models.instance_config import InstanceConfig
+from .compartment_rollups import refresh_compartment_rollups
+from .effective_schedules import get_effective_schedules, refresh_effective_schedules
+from .instance_query import InstanceFilters, instance_filter_criteria
+from .scheduler import validate_schedule
+
+logger = logging.getLogger(__name__)
+
+# Status de cada item do lote
+ITEM_CREATED = "created"
+ITEM_UPDATED = "updated"
+ITEM_NOT_FOUND = "not_found"
+ITEM_INVALID = "invalid"
+
+# Colunas de InstanceConfig que um patch pode alterar, com o default de
+# uma configuração nova
+_PATCHABLE_FIELDS: Dict[str, Any] = {
+    "managed": False,
+    "protection_flag": False,
+    "default_start_cron": None,
+    "default_stop_cron": None,
+    "timezone": "UTC",
+    "notes": None,
+}
+_NOT_NULL_FIELDS = frozenset({"managed", "protection_flag", "timezone"})
+
+# Campos validados antes de gravar (CRON/timezone)
+_SCHEDULE_FIELDS = frozenset({"default_start_cron", "default_stop_cron", "timezone"})
+
+
+@dataclass
+class BulkConfigItem:
+    """Patch (só os campos enviados) a aplicar na configuração de uma instância."""
+    instance_id: UUID
+    patch: Mapping[str, Any]
+
+
+@dataclass
+class BulkConfigResult:
+    instance_id: UUID
+    status: str
+    error: Optional[str] = None
+    next_start_at: Optional[datetime] = None
+    next_stop_at: Optional[datetime] = None
+
+
+@dataclass
+class BulkConfigReport:
+    """Resultado por item, na ordem dos itens recebidos."""
+    results: List[BulkConfigResult] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(Counter(r.status for r in self.results))
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def select_instance_ids(db: Session, filters: InstanceFilters, limit: Optional[int] = None) -> List[UUID]:
+    """
+    IDs das instâncias que casam com ``filters`` (mesmos critérios de
+    ``GET /instances``: subárvore, tags, etc.), ordenados como a listagem.
+
+    :param limit: máximo de IDs devolvidos (None = sem limite)
+    """
+    stmt = (
+        select(Instance.id)
+        .where(*instance_filter_criteria(filters))
+        .order_by(Instance.display_name.asc(), Instance.id.asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return list(db.scalars(stmt))
+
+
+def bulk_upsert_instance_configs(
+    db: Session,
+    items: List[BulkConfigItem],
+    now: Optional[datetime] = None,
+) -> BulkConfigReport:
+    """
+    Aplica um lote de patches de configuração com um único
+    INSERT ... ON CONFLICT (instance_id) DO UPDATE (executemany).
+
+    - Instâncias e configurações atuais são carregadas em duas consultas (as
+      configurações com ``FOR UPDATE``, para que um PUT concorrente não seja
+      sobrescrito com valores antigos).
+    - Cada patch é mesclado com a configuração atual (ou com os defaults) e
+      validado como no PUT. CRON/timezone inválidos marcam só o item como
+      ``invalid``.
+    - Itens repetidos (mesma instância) depois do primeiro são ``invalid``.
+    - Os agendamentos efetivos das instâncias gravadas são recalculados em
+      um único refresh (os próximos disparos do resultado vêm dele), e os
+      rollups dos compartments cujas flags efetivas mudaram, em seguida.
+
+    Não faz commit: o lote inteiro entra na transação de quem chamou.
+
+    :return: resultado por item (created/updated/not_found/invalid)
+    """
+    now = now or datetime.now(timezone.utc)
+    report = BulkConfigReport()
+    if not items:
+        return report
+
+    ids = list({item.instance_id for item in items})
+    known = set(db.scalars(select(Instance.id).where(Instance.id.in_(ids))))
+    current: Dict[UUID, InstanceConfig] = {
+        cfg.instance_id: cfg
+        for cfg in db.scalars(
+            select(InstanceConfig).where(InstanceConfig.instance_id.in_(ids)).with_for_update()
+        )
+    }
+
+    rows: List[Dict[str, Any]] = []
+    pending: Dict[UUID, BulkConfigResult] = {}
+
+    for item in items:
+        result = BulkConfigResult(item.instance_id, ITEM_NOT_FOUND)
+        report.results.append(result)
+
+        if item.instance_id not in known:
+            continue
+        if item.instance_id in pending:
+            result.status, result.error = ITEM_INVALID, "Instância repetida no lote"
+            continue
+
+        try:
+            values = _merge_patch(current.get(item.instance_id), item.patch, now)
+        except ValueError as exc:
+            result.status, result.error = ITEM_INVALID, str(exc)
+            continue
+
+        pending[item.instance_id] = result
+        rows.append({"id": uuid.uuid4(), "instance_id": item.instance_id, "created_at": now, **values})
+
+    if rows:
+        table = InstanceConfig.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.instance_id],
+            set_={
+                name: stmt.excluded[name]
+                for name in rows[0]
+                if name not in ("id", "instance_id", "created_at")
+            },
+        ).returning(table.c.instance_id, literal_column("(xmax = 0)"))
+
+        for instance_id, was_inserted in db.execute(stmt, rows).all():
+            pending[instance_id].status = ITEM_CREATED if was_inserted else ITEM_UPDATED
+
+        # As configurações carregadas acima ficaram desatualizadas
+        for cfg in current.values():
+            db.expire(cfg)
+
+        changes = refresh_effective_schedules(db, instance_ids=pending, now=now)
+        refresh_compartment_rollups(db, changes.rollup_compartments)
+
+        schedules = get_effective_schedules(db, pending)
+        for instance_id, result in pending.items():
+            schedule = schedules.get(instance_id)
+            if schedule is not None:
+                result.next_start_at = schedule.next_start_at
+                result.next_stop_at = schedule.next_stop_at
+
+    logger.info("Upsert em lote de configurações: %s", report.counts())
+    return report
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _merge_patch(
+    cfg: Optional[InstanceConfig],
+    patch: Mapping[str, Any],
+    now: datetime,
+) -> Dict[str, Any]:
+    """
+    Configuração completa (colunas de InstanceConfig) resultante de aplicar
+    ``patch`` sobre ``cfg`` (ou sobre os defaults, se não houver config).
+
+    :raises ValueError: campo obrigatório nulo ou CRON/timezone inválidos
+    """
+    values = {
+        name: getattr(cfg, name) if cfg is not None else default
+        for name, default in _PATCHABLE_FIELDS.items()
+    }
+
+    for name, value in patch.items():
+        if name not in values:
+            logger.debug("Campo %s não existe no modelo InstanceConfig, ignorando", name)
+            continue
+        if value is None and name in _NOT_NULL_FIELDS:
+            raise ValueError(f"Campo {name} não pode ser nulo")
+        values[name] = value
+
+    if cfg is None or _SCHEDULE_FIELDS.intersection(patch):
+        try:
+            validate_schedule(values["default_start_cron"], values["default_stop_cron"], values["timezone"])
+        except ValueError as exc:
+            raise ValueError(f"Agendamento inválido: {exc}") from exc
+
+    values["updated_at"] = now
+    return values
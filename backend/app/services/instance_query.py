@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists, func, or_, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+from ..models.compartment import Compartment
+from ..models.instance import Instance
+from ..models.instance_effective_schedule import InstanceEffectiveSchedule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class TagPredicate:
+    """
+    Predicado de tag de instância.
+
+    - ``namespace`` None: freeform tag (``freeform_tags[key]``)
+    - ``namespace`` preenchido: defined tag (``defined_tags[namespace][key]``)
+    - ``value`` None: basta a chave existir
+    """
+    key: str
+    value: Optional[str] = None
+    namespace: Optional[str] = None
+
+
+@dataclass
+class InstanceFilters:
+    """
+    Filtros da listagem de instâncias. None = não filtra.
+
+    Cada filtro de igualdade tem um índice composto ``(coluna, display_name, id)``
+    (ver models/instance.py), então o keyset continua sendo um range scan.
+    """
+    lifecycle_state: Optional[str] = None
+    region: Optional[str] = None
+    shape: Optional[str] = None
+    managed: Optional[bool] = None
+    protection_flag: Optional[bool] = None
+    is_active: Optional[bool] = True
+    # Subárvore: path do compartment (inclusive) cujos descendentes entram
+    compartment_path: Optional[str] = None
+    # Todos os predicados precisam casar (AND)
+    tags: List[TagPredicate] = field(default_factory=list)
+
+
+@dataclass
+class InstanceRow:
+    """Instância listada, com as flags efetivas (False se não houver agendamento efetivo)."""
+    instance: Instance
+    managed: bool
+    protection_flag: bool
+
+
+@dataclass
+class InstancePage:
+    items: List[InstanceRow] = field(default_factory=list)
+    # Cursor opaco para a próxima página (None = última página)
+    next_cursor: Optional[str] = None
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def resolve_compartment_path(db: Session, compartment_ocid: str) -> Optional[str]:
+    """Path do compartment ativo (ex: /tenancy/app/prod), ou None se não existir."""
+    return db.execute(
+        select(Compartment.path).where(
+            Compartment.compartment_ocid == compartment_ocid,
+            Compartment.is_active.is_(True),
+        )
+    ).scalar()
+
+
+def instance_filter_criteria(filters: InstanceFilters) -> List[Any]:
+    """
+    Critérios SQLAlchemy equivalentes a ``filters``.
+
+    Só referenciam ``instances``: ``managed``/``protection_flag`` (efetivos;
+    ``managed`` herdado da política quando a instância não tem config) viram
+    EXISTS / NOT EXISTS sobre ``instance_effective_schedules``, atendidos
+    pelos índices ``(flag, instance_id)``. Instâncias sem linha contam como
+    managed=False e protection_flag=False.
+    """
+    criteria: List[Any] = []
+
+    if filters.is_active is not None:
+        criteria.append(Instance.is_active.is_(filters.is_active))
+    if filters.lifecycle_state is not None:
+        criteria.append(Instance.lifecycle_state == filters.lifecycle_state)
+    if filters.region is not None:
+        criteria.append(Instance.region == filters.region)
+    if filters.shape is not None:
+        criteria.append(Instance.shape == filters.shape)
+    if filters.managed is not None:
+        criteria.append(_effective_flag_criteria("managed", filters.managed))
+    if filters.protection_flag is not None:
+        criteria.append(_effective_flag_criteria("protection_flag", filters.protection_flag))
+    if filters.compartment_path is not None:
+        criteria.append(subtree_criteria(filters.compartment_path))
+    if filters.tags:
+        criteria.extend(tag_criteria(filters.tags))
+
+    return criteria
+
+
+def subtree_criteria(path: str) -> Any:
+    """
+    Instâncias do compartment ``path`` e de todos os seus descendentes.
+
+    Igualdade + prefixo ``path/``, atendidos pelo índice ``text_pattern_ops``
+    de ``compartment_path_cache`` (range scan, sem varrer a tabela).
+    """
+    return _path_subtree(Instance.compartment_path_cache, path)
+
+
+def compartment_subtree_criteria(path: str) -> Any:
+    """Compartment ``path`` e todos os seus descendentes (índice ``text_pattern_ops`` de ``path``)."""
+    return _path_subtree(Compartment.path, path)
+
+
+def count_instances(db: Session, filters: InstanceFilters) -> int:
+    """Quantidade de instâncias que casam com ``filters`` (mesmos critérios da listagem)."""
+    return db.execute(
+        select(func.count())
+        .select_from(Instance)
+        .where(*instance_filter_criteria(filters))
+    ).scalar_one()
+
+
+def parse_tag_predicate(raw: str, defined: bool = False) -> TagPredicate:
+    """
+    Converte o formato da API em :class:`TagPredicate`.
+
+    - freeform: ``Key=Value`` ou ``Key``
+    - defined: ``Namespace.Key=Value`` ou ``Namespace.Key``
+
+    O valor pode conter ``=``; nomes de namespace e de chave não podem conter
+    ``.`` na OCI, então o primeiro ``.`` separa os dois.
+
+    :raises ValueError: se o predicado for inválido
+    """
+    name, sep, value = raw.partition("=")
+    namespace = None
+    if defined:
+        namespace, dot, name = name.partition(".")
+        if not dot or not namespace:
+            raise ValueError(f"Defined tag inválida (esperado Namespace.Key[=Value]): {raw!r}")
+    if not name:
+        raise ValueError(f"Tag inválida (chave vazia): {raw!r}")
+    return TagPredicate(key=name, value=value if sep else None, namespace=namespace)
+
+
+def validate_tag_predicates(predicates: Sequence[TagPredicate]) -> None:
+    """
+    Exige ao menos um predicado com valor quando há filtro por tag.
+
+    Só os predicados com valor são atendidos pelos índices GIN
+    ``jsonb_path_ops``; um filtro só de chaves (``?``) varreria a tabela.
+
+    :raises ValueError: se todos os predicados forem só de chave
+    """
+    if predicates and all(predicate.value is None for predicate in predicates):
+        raise ValueError(
+            "Filtro por tag só com chaves não é suportado: "
+            "informe ao menos um predicado Key=Value"
+        )
+
+
+def tag_criteria(predicates: Sequence[TagPredicate]) -> List[Any]:
+    """
+    Critérios SQLAlchemy para ``predicates`` (AND entre todos).
+
+    Os predicados com valor viram no máximo dois containments
+    (``freeform_tags @> {...}`` e ``defined_tags @> {ns: {...}}``), atendidos
+    pelos índices GIN ``jsonb_path_ops``. Predicados só de chave não são
+    atendidos por esse opclass e entram como filtro residual (``?``), então
+    devem vir acompanhados de algum predicado com valor (ver
+    :func:`validate_tag_predicates`). A mesma chave com valores diferentes
+    entra como containment separado (o AND não casa nenhuma instância, em vez
+    de o último valor sobrescrever os outros).
+    """
+    freeform: Dict[str, str] = {}
+    defined: Dict[str, Dict[str, str]] = {}
+    criteria: List[Any] = []
+
+    for predicate in predicates:
+        if predicate.namespace is None:
+            if predicate.value is None:
+                criteria.append(Instance.freeform_tags.has_key(predicate.key))
+            elif freeform.setdefault(predicate.key, predicate.value) != predicate.value:
+                criteria.append(Instance.freeform_tags.contains({predicate.key: predicate.value}))
+        else:
+            if predicate.value is None:
+                criteria.append(
+                    Instance.defined_tags[predicate.namespace].has_key(predicate.key)
+                )
+                continue
+            keys = defined.setdefault(predicate.namespace, {})
+            if keys.setdefault(predicate.key, predicate.value) != predicate.value:
+                criteria.append(
+                    Instance.defined_tags.contains({predicate.namespace: {predicate.key: predicate.value}})
+                )
+
+    if freeform:
+        criteria.insert(0, Instance.freeform_tags.contains(freeform))
+    if defined:
+        criteria.insert(0, Instance.defined_tags.contains(defined))
+
+    return criteria
+
+
+def list_instances_page(
+    db: Session,
+    filters: InstanceFilters,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> InstancePage:
+    """
+    Uma página de instâncias ordenadas por ``(display_name, id)``.
+
+    Paginação por keyset: a próxima página começa em
+    ``(display_name, id) > (último display_name, último id)``, então a página N
+    custa o mesmo que a primeira (sem OFFSET).
+
+    :param limit: tamanho da página (limitado a MAX_PAGE_SIZE)
+    :param cursor: ``next_cursor`` da página anterior
+    :raises ValueError: se o cursor for inválido
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    stmt = (
+        select(
+            Instance,
+            func.coalesce(InstanceEffectiveSchedule.managed, False),
+            func.coalesce(InstanceEffectiveSchedule.protection_flag, False),
+        )
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .where(*instance_filter_criteria(filters))
+        .order_by(Instance.display_name.asc(), Instance.id.asc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        last_name, last_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Instance.display_name, Instance.id) > tuple_(last_name, last_id)
+        )
+
+    rows = db.execute(stmt).all()
+    page = InstancePage(
+        items=[InstanceRow(instance, managed, protection) for instance, managed, protection in rows[:limit]]
+    )
+    if len(rows) > limit:
+        last = page.items[-1].instance
+        page.next_cursor = encode_cursor(last.display_name, last.id)
+
+    return page
+
+
+def encode_cursor(display_name: str, instance_id: UUID) -> str:
+    """Cursor opaco (base64url de JSON) com a chave do último item da página."""
+    raw = json.dumps([display_name, str(instance_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, UUID]:
+    """
+    :raises ValueError: se o cursor não tiver sido gerado por :func:`encode_cursor`
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        display_name, instance_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(display_name), UUID(instance_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _effective_flag_criteria(flag: str, value: bool) -> Any:
+    # Semi-join (True) / anti-join (False) contra as linhas com a flag ligada,
+    # lidas do índice (flag, instance_id). O alias evita correlacionar com o
+    # OUTER JOIN da listagem.
+    schedule = aliased(InstanceEffectiveSchedule)
+    flagged = exists().where(
+        schedule.instance_id == Instance.id,
+        getattr(schedule, flag).is_(True),
+    )
+    return flagged if value else ~flagged
+
+
+def _path_subtree(column: Any, path: str) -> Any:
+    # O "/" final evita casar irmãos com prefixo em comum (/t/app vs /t/app2)
+    return or_(column == path, column.startswith(path + "/", autoescape=True))
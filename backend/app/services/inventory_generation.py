@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models.inventory_generation import InventoryGeneration
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def get_inventory_generation(db: Session, tenancy_ocid: str) -> int:
+    """
+    Geração atual do inventário da tenancy (0 se nunca houve sync).
+
+    Leitura por chave primária: barata o bastante para ser feita a cada request.
+    """
+    generation = db.execute(
+        select(InventoryGeneration.generation).where(
+            InventoryGeneration.tenancy_ocid == tenancy_ocid
+        )
+    ).scalar()
+    return generation or 0
+
+
+def bump_inventory_generation(db: Session, tenancy_ocid: str) -> int:
+    """
+    Incrementa a geração do inventário da tenancy (criando a linha se preciso).
+
+    Não faz commit: chamada na transação do sync, a nova geração só fica
+    visível junto com os dados que ela versiona.
+
+    :return: nova geração
+    """
+    table = InventoryGeneration.__table__
+    stmt = pg_insert(table).values(
+        tenancy_ocid=tenancy_ocid,
+        generation=1,
+        updated_at=datetime.now(timezone.utc),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.tenancy_ocid],
+        set_={
+            "generation": table.c.generation + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(table.c.generation)
+
+    generation = db.execute(stmt).scalar_one()
+    logger.info("Inventário da tenancy %s agora na geração %d", tenancy_ocid, generation)
+    return generation
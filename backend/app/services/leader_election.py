@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Jobs que rodam em um único processo (líder) por vez
+LEADER_JOBS = ("scheduler", "sync")
+
+# Primeira chave do pg_advisory_lock(int, int): namespace da aplicação
+_LOCK_NAMESPACE = zlib.crc32(b"stopstart-oci") & 0x7FFFFFFF
+
+
+@dataclass
+class LeaderInfo:
+    """Processo que segura o lock de um job, visto pelo pg_stat_activity."""
+    job: str
+    holder: str
+    pid: int
+    client_addr: Optional[str]
+    since: datetime
+    held_seconds: float
+
+
+def lock_key(job: str) -> int:
+    """Segunda chave do advisory lock de ``job`` (estável entre processos)."""
+    return zlib.crc32(job.encode("utf-8")) & 0x7FFFFFFF
+
+
+class LeaderLock:
+    """
+    Liderança de um job via ``pg_try_advisory_lock`` de sessão.
+
+    O lock fica preso a uma conexão dedicada, aberta a cada tentativa (fora do
+    pool, via NullPool): se o processo morrer ou a conexão cair, o Postgres
+    libera o lock e outro processo assume no próximo ciclo. Como a conexão
+    nasce na tentativa que ganhou o lock, ``pg_stat_activity.backend_start``
+    marca o início da liderança (ver :func:`get_leaders`).
+
+    A conexão usa TCP keepalive curto nos dois lados (libpq e
+    ``tcp_keepalives_*`` do servidor), para que a morte do host do líder
+    libere o lock em segundos, e não no keepalive padrão do sistema (horas).
+    Não usa ``idle_session_timeout``: a conexão fica ociosa enquanto o job
+    roda, e um job longo (sync) perderia o lock.
+    """
+
+    def __init__(self, engine: Engine, job: str, holder: str):
+        self.engine = create_engine(
+            engine.url,
+            poolclass=NullPool,
+            connect_args=_keepalive_connect_args(),
+        )
+        self.job = job
+        self.holder = holder
+        self.key = lock_key(job)
+        self.acquired_at: Optional[float] = None
+        self._conn: Optional[Connection] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def held_seconds(self) -> float:
+        """Há quanto tempo este processo segura o lock (0 se não é líder)."""
+        return time.monotonic() - self.acquired_at if self.acquired_at is not None else 0.0
+
+    def ensure(self) -> bool:
+        """
+        Confirma a liderança (se já é líder) ou tenta assumi-la.
+
+        :return: True se este processo é o líder do job
+        """
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+                return True
+            except Exception:
+                logger.warning(
+                    "Conexão do lock de liderança '%s' caiu após %.1fs; liderança perdida",
+                    self.job,
+                    self.held_seconds,
+                )
+                self._discard()
+
+        conn = self.engine.connect()
+        try:
+            # application_name identifica o líder para os demais processos
+            conn.execute(
+                text("SELECT set_config('application_name', :name, false)"),
+                {"name": f"stopstart:{self.job}:{self.holder}"[:63]},
+            )
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:ns, :key)"),
+                {"ns": _LOCK_NAMESPACE, "key": self.key},
+            ).scalar()
+            # Sai da transação implícita; o lock de sessão continua preso à conexão
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+
+        if not acquired:
+            conn.close()
+            return False
+
+        self._conn = conn
+        self.acquired_at = time.monotonic()
+        logger.info("Liderança do job '%s' assumida por %s", self.job, self.holder)
+        return True
+
+    def release(self) -> None:
+        """Libera o lock (se for líder) e fecha a conexão dedicada."""
+        if self._conn is None:
+            return
+
+        held = self.held_seconds
+        try:
+            self._conn.execute(
+                text("SELECT pg_advisory_unlock(:ns, :key)"),
+                {"ns": _LOCK_NAMESPACE, "key": self.key},
+            )
+            self._conn.commit()
+        except Exception:
+            logger.exception("Erro ao liberar o lock de liderança '%s'", self.job)
+        finally:
+            self._discard()
+        logger.info("Liderança do job '%s' liberada após %.1fs", self.job, held)
+
+    def _discard(self) -> None:
+        conn, self._conn, self.acquired_at = self._conn, None, None
+        try:
+            conn.close()
+        except Exception:
+            logger.debug("Erro ao fechar conexão do lock '%s'", self.job, exc_info=True)
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def run_leader_loop(
+    engine: Engine,
+    job: str,
+    holder: str,
+    interval: float,
+    fn: Callable[[], None],
+    stop_event: Optional[threading.Event] = None,
+    poll_interval: Optional[float] = None,
+) -> None:
+    """
+    Executa ``fn`` a cada ``interval`` segundos, apenas enquanto este processo
+    for o líder de ``job``.
+
+    A liderança é checada a cada ``poll_interval`` segundos, independente de
+    ``interval`` (o sync roda de hora em hora, mas o failover não pode levar
+    uma hora). Ao assumir a liderança o job roda imediatamente. Erros em
+    ``fn`` são logados e não derrubam o loop (nem a liderança).
+
+    Em uma partição de rede o líder antigo pode ainda não ter percebido a
+    queda quando outro assume; os jobs toleram isso (o tick usa SKIP LOCKED e
+    o enfileiramento é idempotente).
+
+    :param engine: engine usada para a conexão dedicada do lock
+    :param job: nome do job (um de LEADER_JOBS)
+    :param holder: identificador deste processo (ex: host:pid)
+    :param interval: intervalo entre execuções, em segundos
+    :param fn: job a executar
+    :param stop_event: encerra o loop (liberando o lock) quando setado
+    :param poll_interval: intervalo entre checagens da liderança
+                          (default: Settings.LEADER_POLL_SECONDS)
+    """
+    if poll_interval is None:
+        poll_interval = get_settings().LEADER_POLL_SECONDS
+    stop_event = stop_event or threading.Event()
+    lock = LeaderLock(engine, job, holder)
+    was_leader = False
+    next_run = 0.0
+
+    try:
+        while not stop_event.is_set():
+            try:
+                leader = lock.ensure()
+            except Exception:
+                logger.exception("Erro ao verificar liderança do job '%s'", job)
+                leader = False
+
+            if leader and not was_leader:
+                # Acabou de assumir: não sabe quando o líder anterior rodou o job
+                next_run = time.monotonic()
+            was_leader = leader
+
+            if not leader:
+                logger.debug("Job '%s': %s não é o líder; aguardando", job, holder)
+                stop_event.wait(poll_interval)
+                continue
+
+            if time.monotonic() >= next_run:
+                started = time.monotonic()
+                try:
+                    fn()
+                except Exception:
+                    logger.exception("Erro ao executar o job '%s'", job)
+                next_run = started + interval
+
+            stop_event.wait(min(poll_interval, max(0.0, next_run - time.monotonic())))
+    finally:
+        lock.release()
+
+
+def get_leaders(db: Session) -> Dict[str, Optional[LeaderInfo]]:
+    """
+    Líder atual de cada job em LEADER_JOBS (None se ninguém segura o lock).
+
+    Consulta ``pg_locks`` + ``pg_stat_activity``, então funciona de qualquer
+    processo (ex: a API), não só do líder.
+    """
+    keys = {lock_key(job): job for job in LEADER_JOBS}
+    leaders: Dict[str, Optional[LeaderInfo]] = {job: None for job in LEADER_JOBS}
+
+    rows = db.execute(
+        text(
+            """
+            SELECT l.objid::bigint AS key,
+                   a.pid,
+                   a.application_name,
+                   host(a.client_addr) AS client_addr,
+                   a.backend_start,
+                   EXTRACT(EPOCH FROM now() - a.backend_start) AS held_seconds
+            FROM pg_locks l
+            JOIN pg_stat_activity a ON a.pid = l.pid
+            WHERE l.locktype = 'advisory'
+              AND l.granted
+              AND l.objsubid = 2
+              AND l.classid::bigint = :ns
+            """
+        ),
+        {"ns": _LOCK_NAMESPACE},
+    ).all()
+
+    for row in rows:
+        job = keys.get(row.key)
+        if job is None:
+            continue
+        holder = row.application_name or ""
+        prefix = f"stopstart:{job}:"
+        leaders[job] = LeaderInfo(
+            job=job,
+            holder=holder[len(prefix):] if holder.startswith(prefix) else holder,
+            pid=row.pid,
+            client_addr=row.client_addr,
+            since=row.backend_start,
+            held_seconds=float(row.held_seconds),
+        )
+
+    return leaders
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _keepalive_connect_args() -> Dict[str, Any]:
+    """connect_args (psycopg2/libpq) com TCP keepalive curto nos dois lados da conexão do lock."""
+    settings = get_settings()
+    idle = settings.LEADER_KEEPALIVE_IDLE_SECONDS
+    interval = settings.LEADER_KEEPALIVE_INTERVAL_SECONDS
+    count = settings.LEADER_KEEPALIVE_COUNT
+    return {
+        # Cliente: o líder percebe que perdeu a conexão (e o lock)
+        "keepalives": 1,
+        "keepalives_idle": idle,
+        "keepalives_interval": interval,
+        "keepalives_count": count,
+        # Servidor: o Postgres derruba a sessão (liberando o lock) de um host morto
+        "options": (
+            f"-c tcp_keepalives_idle={idle} "
+            f"-c tcp_keepalives_interval={interval} "
+            f"-c tcp_keepalives_count={count}"
+        ),
+    }
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import oci
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.instance import Instance
+from ..models.instance_effective_schedule import InstanceEffectiveSchedule
+from .compartment_rollups import refresh_compartment_rollups
+from .oci_clients import OCIClients, build_oci_clients
+from .oci_retry import call_with_backoff
+from .scheduler import DueAction
+
+logger = logging.getLogger(__name__)
+
+# Ações de lifecycle aceitas pelo executor (subconjunto de InstanceAction do OCI)
+LIFECYCLE_ACTIONS = ("START", "STOP", "SOFTSTOP", "RESET")
+
+# Ações bloqueadas por protection_flag (derrubam a instância)
+_PROTECTED_ACTIONS = frozenset({"STOP", "SOFTSTOP", "RESET"})
+
+# Nome da API usado como chave do rate limiter
+_INSTANCE_ACTION_API = "instance_action"
+
+# Status possíveis de um ActionResult
+STATUS_DISPATCHED = "dispatched"
+STATUS_FAILED = "failed"
+STATUS_NOT_FOUND = "not_found"
+STATUS_SKIPPED_UNMANAGED = "skipped_unmanaged"
+STATUS_SKIPPED_PROTECTED = "skipped_protected"
+
+# ComputeClient por região, um conjunto por thread do pool
+_worker_state = threading.local()
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+
+    Acumula ``rate`` tokens por segundo até ``capacity``; ``acquire`` consome um
+    token, bloqueando a thread chamadora até haver saldo.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Consome um token.
+
+        :return: tempo (segundos) que a thread ficou esperando
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+
+                delay = (1.0 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """
+    Um :class:`TokenBucket` por (região, API), criado sob demanda.
+
+    O estado fica na memória do processo: processos diferentes (vários
+    ``action-worker``) não dividem o mesmo bucket, cada um gasta a taxa toda.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, region: str, api: str) -> float:
+        key = (region, api)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket.acquire()
+
+
+@dataclass
+class ActionResult:
+    """Resultado de uma ação de lifecycle."""
+    instance_id: Any
+    action: str
+    scheduled_at: Optional[datetime]
+    status: str
+    region: Optional[str] = None
+    instance_ocid: Optional[str] = None
+    dispatched_at: Optional[datetime] = None
+    attempts: int = 0
+    throttle_wait: float = 0.0
+    lifecycle_state: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def dispatch_delay(self) -> Optional[float]:
+        """Atraso (segundos) entre o horário agendado e o envio ao OCI."""
+        if self.dispatched_at is None or self.scheduled_at is None:
+            return None
+        return (self.dispatched_at - self.scheduled_at).total_seconds()
+
+
+@dataclass
+class ActionReport:
+    """Resumo de uma execução do executor."""
+    results: List[ActionResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def counts(self) -> Dict[str, int]:
+        """Quantidade de resultados por status."""
+        return dict(Counter(r.status for r in self.results))
+
+    @property
+    def dispatched(self) -> int:
+        return sum(1 for r in self.results if r.status == STATUS_DISPATCHED)
+
+    @property
+    def throughput(self) -> float:
+        """Ações enviadas ao OCI por segundo."""
+        return self.dispatched / self.seconds if self.seconds > 0 else 0.0
+
+    def dispatch_delays(self) -> Dict[str, float]:
+        """Percentis (p50/p95/max, em segundos) do atraso agendado -> envio."""
+        delays = sorted(
+            r.dispatch_delay for r in self.results if r.dispatch_delay is not None
+        )
+        if not delays:
+            return {}
+        return {
+            "p50": _percentile(delays, 50),
+            "p95": _percentile(delays, 95),
+            "max": delays[-1],
+        }
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def build_action_clients(oci_config: Mapping[str, Any]) -> OCIClients:
+    """
+    Constrói os clients OCI usados pelo executor (reaproveitáveis entre lotes).
+
+    :param oci_config: dict de configuração OCI (ex: oci.config.from_file())
+    """
+    return build_oci_clients(oci_config)
+
+
+def dispatch_actions(
+    db: Session,
+    oci_config: Mapping[str, Any],
+    actions: Iterable[DueAction],
+    max_workers: Optional[int] = None,
+) -> ActionReport:
+    """
+    Envia ações de lifecycle ao OCI usando o config informado.
+
+    Ver :func:`execute_actions`.
+
+    :param oci_config: dict de configuração OCI (ex: oci.config.from_file())
+    """
+    return execute_actions(db, build_action_clients(oci_config), actions, max_workers=max_workers)
+
+
+def execute_actions(
+    db: Session,
+    clients: OCIClients,
+    actions: Iterable[DueAction],
+    max_workers: Optional[int] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> ActionReport:
+    """
+    Executa ações de lifecycle (START/STOP/SOFTSTOP/RESET) em paralelo.
+
+    - Instâncias e agendamentos efetivos são carregados em uma única consulta.
+    - Ações de instâncias não gerenciadas (sem agendamento efetivo ou
+      managed=False, próprio ou herdado do compartment) são ignoradas, assim como ações que derrubam a instância quando
+      ``protection_flag`` está ligado.
+    - As chamadas ``instance_action`` rodam em um pool de até ``max_workers``
+      threads, limitadas por um token bucket por região e por API, com retry
+      com backoff e jitter em 429/5xx (idempotente: um ``opc_retry_token``
+      por ação).
+    - O ``lifecycle_state`` devolvido pelo OCI é gravado na instância (e os
+      rollups dos compartments afetados são atualizados).
+
+    Não faz commit. O commit/rollback é responsabilidade de quem chamou.
+
+    :param db: sessão SQLAlchemy
+    :param clients: clients OCI (o ComputeClient de cada região é criado a
+                    partir de ``clients.config``)
+    :param actions: ações a executar (ex: retorno de run_scheduler_tick)
+    :param max_workers: máximo de chamadas em paralelo (default: Settings.ACTION_MAX_WORKERS)
+    :param limiter: rate limiter compartilhado (default: um novo, a partir das Settings)
+    :return: resultado por ação, throughput e atrasos de envio
+    """
+    settings = get_settings()
+    if max_workers is None:
+        max_workers = settings.ACTION_MAX_WORKERS
+    if limiter is None:
+        limiter = RateLimiter(settings.ACTION_RATE_PER_SECOND, settings.ACTION_BURST)
+
+    actions = list(actions)
+    started = time.monotonic()
+    report = ActionReport()
+    if not actions:
+        return report
+
+    rows = _load_targets(db, {a.instance_id for a in actions})
+    to_dispatch: List[Tuple[ActionResult, Instance]] = []
+
+    for due in actions:
+        result = ActionResult(due.instance_id, due.action, due.scheduled_at, STATUS_NOT_FOUND)
+        report.results.append(result)
+
+        if due.action not in LIFECYCLE_ACTIONS:
+            result.status = STATUS_FAILED
+            result.error = f"Ação desconhecida: {due.action!r}"
+            continue
+
+        instance, schedule = rows.get(due.instance_id, (None, None))
+        if instance is None:
+            continue
+
+        result.region = instance.region
+        result.instance_ocid = instance.instance_ocid
+
+        if schedule is None or not schedule.managed:
+            result.status = STATUS_SKIPPED_UNMANAGED
+        elif schedule.protection_flag and due.action in _PROTECTED_ACTIONS:
+            result.status = STATUS_SKIPPED_PROTECTED
+            logger.info(
+                "Ação %s ignorada: instância %s está protegida",
+                due.action,
+                instance.instance_ocid,
+            )
+        else:
+            to_dispatch.append((result, instance))
+
+    if to_dispatch:
+        touched_compartments = set()
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(to_dispatch))),
+            thread_name_prefix="oci-action",
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _dispatch_in_worker, clients, limiter, instance.region, instance.instance_ocid, result.action
+                )
+                for result, instance in to_dispatch
+            ]
+
+            for (result, instance), future in zip(to_dispatch, futures):
+                outcome = future.result()
+                result.attempts = outcome.attempts
+                result.throttle_wait = outcome.throttle_wait
+                result.dispatched_at = outcome.dispatched_at
+
+                if outcome.error is not None:
+                    result.status = STATUS_FAILED
+                    result.error = outcome.error
+                    logger.error(
+                        "Falha ao enviar %s para instância %s: %s",
+                        result.action,
+                        instance.instance_ocid,
+                        outcome.error,
+                    )
+                    continue
+
+                result.status = STATUS_DISPATCHED
+                result.lifecycle_state = outcome.lifecycle_state
+                if outcome.lifecycle_state and outcome.lifecycle_state != instance.lifecycle_state:
+                    instance.lifecycle_state = outcome.lifecycle_state
+                    touched_compartments.add(instance.compartment_id)
+
+        db.flush()
+        refresh_compartment_rollups(db, touched_compartments)
+
+    report.seconds = time.monotonic() - started
+    delays = report.dispatch_delays()
+    logger.info(
+        "Executor de ações: %s em %.2fs (%.1f ações/s); atraso agendado->envio p50=%.2fs p95=%.2fs max=%.2fs",
+        report.counts(),
+        report.seconds,
+        report.throughput,
+        delays.get("p50", 0.0),
+        delays.get("p95", 0.0),
+        delays.get("max", 0.0),
+    )
+    return report
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+@dataclass
+class _DispatchOutcome:
+    """Resultado de uma chamada instance_action dentro do worker."""
+    dispatched_at: Optional[datetime] = None
+    attempts: int = 0
+    throttle_wait: float = 0.0
+    lifecycle_state: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _load_targets(
+    db: Session,
+    instance_ids: Iterable[Any],
+) -> Dict[Any, Tuple[Instance, Optional[InstanceEffectiveSchedule]]]:
+    """Carrega instâncias ativas + agendamentos efetivos em uma única consulta."""
+    rows = (
+        db.query(Instance, InstanceEffectiveSchedule)
+        .outerjoin(InstanceEffectiveSchedule, InstanceEffectiveSchedule.instance_id == Instance.id)
+        .filter(Instance.id.in_(list(instance_ids)), Instance.is_active.is_(True))
+        .all()
+    )
+    return {instance.id: (instance, schedule) for instance, schedule in rows}
+
+
+def _region_compute(clients: OCIClients, region: str) -> Any:
+    """ComputeClient da thread atual para ``region`` (criado na primeira chamada)."""
+    computes = getattr(_worker_state, "computes", None)
+    if computes is None:
+        computes = _worker_state.computes = {}
+
+    compute = computes.get(region)
+    if compute is None:
+        if clients.config:
+            compute = oci.core.ComputeClient(dict(clients.config, region=region))
+        else:
+            # Sem config (ex: clients fake em testes) reaproveita o client existente
+            compute = clients.compute
+        computes[region] = compute
+    return compute
+
+
+def _dispatch_in_worker(
+    clients: OCIClients,
+    limiter: RateLimiter,
+    region: str,
+    instance_ocid: str,
+    action: str,
+) -> _DispatchOutcome:
+    """
+    Envia ``action`` para a instância, respeitando o rate limiter da região.
+
+    Cada tentativa (inclusive retentativas) consome um token do bucket.
+    Todas as tentativas levam o mesmo ``opc_retry_token``: um 5xx devolvido
+    depois de o OCI já ter aceitado a ação (ex: RESET) não a executa de novo.
+    Erros são devolvidos no resultado, para não abortar as demais ações.
+    """
+    settings = get_settings()
+    compute = _region_compute(clients, region)
+    outcome = _DispatchOutcome()
+    retry_token = uuid.uuid4().hex
+
+    def attempt() -> Any:
+        outcome.throttle_wait += limiter.acquire(region, _INSTANCE_ACTION_API)
+        outcome.attempts += 1
+        if outcome.dispatched_at is None:
+            outcome.dispatched_at = datetime.now(timezone.utc)
+        return compute.instance_action(instance_ocid, action, opc_retry_token=retry_token)
+
+    try:
+        response = call_with_backoff(
+            attempt,
+            max_retries=settings.ACTION_MAX_RETRIES,
+            base_delay=settings.ACTION_BACKOFF_BASE_SECONDS,
+            max_delay=settings.ACTION_BACKOFF_MAX_SECONDS,
+            retry_server_errors=True,
+        )
+    except oci.exceptions.ServiceError as exc:
+        outcome.error = f"{exc.status} {exc.code}: {exc.message}"
+        return outcome
+    except Exception as exc:  # noqa: BLE001 - erro de rede/SDK não deve derrubar o lote
+        outcome.error = repr(exc)
+        return outcome
+
+    outcome.lifecycle_state = getattr(response.data, "lifecycle_state", None)
+    return outcome
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por nearest-rank de uma lista já ordenada (não vazia)."""
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
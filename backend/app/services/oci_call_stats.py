@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import oci
+from prometheus_client import Counter, Histogram
+
+from ..core.metrics import HTTP_LATENCY_BUCKETS
+from .oci_retry import THROTTLE_STATUS
+
+# Métricas das chamadas OCI (todas as chamadas dos clients instrumentados do processo)
+OCI_REQUESTS = Counter(
+    "stopstart_oci_requests",
+    "Requisições às APIs OCI, por serviço, operação e resultado (ok, throttled, server_error, error).",
+    ["service", "operation", "outcome"],
+)
+OCI_REQUEST_SECONDS = Histogram(
+    "stopstart_oci_request_duration_seconds",
+    "Latência de cada requisição às APIs OCI (uma página de listagem = uma requisição).",
+    ["service", "operation"],
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+OCI_PAGES = Counter(
+    "stopstart_oci_pages",
+    "Páginas recebidas das operações paginadas (list_*/search_*).",
+    ["service", "operation"],
+)
+OCI_RETRIES = Counter(
+    "stopstart_oci_retries",
+    "Requisições repetidas por call_with_backoff após 429/5xx (retries internos do SDK não entram).",
+    ["service", "operation"],
+)
+
+# Prefixos das operações paginadas do SDK
+_PAGINATED_PREFIXES = ("list_", "search_")
+
+
+@dataclass
+class OCIOperationStats:
+    """Resumo das requisições de uma operação OCI (ex: compute.list_instances)."""
+    service: str
+    operation: str
+    # Requisições feitas (inclui as que falharam e as repetidas)
+    calls: int = 0
+    # Respostas de operações paginadas (páginas recebidas)
+    pages: int = 0
+    # Novas tentativas de call_with_backoff (ver :func:`retry_callback`)
+    retries: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    # Outros erros (4xx que não 429, timeout/conexão)
+    errors: int = 0
+    total_seconds: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+
+
+class OCICallRecorder:
+    """
+    Agrega as requisições feitas pelos clients embrulhados com :meth:`wrap`
+    (thread-safe: os workers de listagem compartilham o mesmo recorder).
+
+    Cada invocação de um método do client conta como uma requisição: com
+    ``list_call_get_all_results`` cada página passa pelo wrapper, e cada nova
+    tentativa de ``call_with_backoff`` também. Os retries são registrados
+    explicitamente por quem repete (:meth:`record_retry`, via
+    :func:`retry_callback`). Retries internos do SDK (``retry_strategy``)
+    acontecem dentro de uma invocação e não são vistos pelo wrapper.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], OCIOperationStats] = {}
+        self._latencies: Dict[Tuple[str, str], List[float]] = {}
+
+    def wrap(self, client: Any, service: str) -> "InstrumentedOCIClient":
+        """Embrulha ``client`` (IdentityClient, ComputeClient, ...) neste recorder."""
+        if isinstance(client, InstrumentedOCIClient):
+            return client
+        return InstrumentedOCIClient(client, service, self)
+
+    def record(
+        self,
+        service: str,
+        operation: str,
+        seconds: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        key = (service, operation)
+        outcome = _outcome(error)
+        paginated = error is None and operation.startswith(_PAGINATED_PREFIXES)
+
+        with self._lock:
+            stats = self._operation_stats(key)
+            stats.calls += 1
+            stats.total_seconds += seconds
+            self._latencies[key].append(seconds)
+            if paginated:
+                stats.pages += 1
+            if outcome == "throttled":
+                stats.throttled += 1
+            elif outcome == "server_error":
+                stats.server_errors += 1
+            elif outcome == "error":
+                stats.errors += 1
+
+        OCI_REQUESTS.labels(service, operation, outcome).inc()
+        OCI_REQUEST_SECONDS.labels(service, operation).observe(seconds)
+        if paginated:
+            OCI_PAGES.labels(service, operation).inc()
+
+    def record_retry(self, service: str, operation: str) -> None:
+        """Registra uma nova tentativa de ``service.operation`` (antes de repeti-la)."""
+        with self._lock:
+            self._operation_stats((service, operation)).retries += 1
+        OCI_RETRIES.labels(service, operation).inc()
+
+    def summary(self) -> Dict[str, OCIOperationStats]:
+        """
+        Resumo por operação (``"serviço.operação"``), com percentis de latência.
+        """
+        with self._lock:
+            items = [
+                (dataclasses.replace(stats), sorted(self._latencies[key]))
+                for key, stats in self._stats.items()
+            ]
+
+        result: Dict[str, OCIOperationStats] = {}
+        for stats, latencies in sorted(items, key=lambda item: (item[0].service, item[0].operation)):
+            stats.total_seconds = round(stats.total_seconds, 3)
+            stats.p50_ms = round(_percentile(latencies, 50) * 1000, 1)
+            stats.p95_ms = round(_percentile(latencies, 95) * 1000, 1)
+            stats.p99_ms = round(_percentile(latencies, 99) * 1000, 1)
+            result[f"{stats.service}.{stats.operation}"] = stats
+        return result
+
+    def _operation_stats(self, key: Tuple[str, str]) -> OCIOperationStats:
+        # Chamar com self._lock
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = OCIOperationStats(*key)
+            self._latencies[key] = []
+        return stats
+
+
+class InstrumentedOCIClient:
+    """
+    Proxy de um client do SDK OCI: os métodos públicos são cronometrados e
+    registrados no :class:`OCICallRecorder`; os demais atributos são repassados.
+    """
+
+    def __init__(self, client: Any, service: str, recorder: OCICallRecorder):
+        self._client = client
+        self._service = service
+        self._recorder = recorder
+
+    @property
+    def wrapped_client(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        service, recorder = self._service, self._recorder
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                response = attr(*args, **kwargs)
+            except BaseException as exc:
+                recorder.record(service, name, time.perf_counter() - started, exc)
+                raise
+            recorder.record(service, name, time.perf_counter() - started)
+            return response
+
+        return call
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def instrument_clients(clients: Any, recorder: Optional[OCICallRecorder] = None) -> Any:
+    """
+    Cópia de um ``OCIClients`` com identity/compute/search embrulhados em um
+    recorder (novo, se não informado), disponível em ``clients.recorder``.
+    """
+    recorder = recorder or OCICallRecorder()
+    return dataclasses.replace(
+        clients,
+        identity=recorder.wrap(clients.identity, "identity"),
+        compute=recorder.wrap(clients.compute, "compute"),
+        search=recorder.wrap(clients.search, "search") if clients.search is not None else None,
+        recorder=recorder,
+    )
+
+
+def retry_callback(client: Any, operation: str) -> Optional[Callable[[int, BaseException], None]]:
+    """
+    Callback ``on_retry`` de ``call_with_backoff`` que registra cada nova
+    tentativa de ``operation`` no recorder de ``client``.
+
+    :return: None se ``client`` não for instrumentado (nada a registrar)
+    """
+    if not isinstance(client, InstrumentedOCIClient):
+        return None
+    recorder, service = client._recorder, client._service
+    return lambda attempt, error: recorder.record_retry(service, operation)
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, oci.exceptions.ServiceError):
+        if error.status == THROTTLE_STATUS:
+            return "throttled"
+        if 500 <= error.status < 600:
+            return "server_error"
+    return "error"
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Percentil ``pct`` (0-100) de uma lista ordenada, pelo método nearest-rank."""
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
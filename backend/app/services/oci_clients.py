@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
+
+import oci
+
+from .oci_call_stats import OCICallRecorder
+
+
+@dataclass
+class OCIClients:
+    """Container simples para agrupar os clients OCI usados no sync e no executor de ações."""
+    identity: oci.identity.IdentityClient
+    compute: oci.core.ComputeClient
+    tenancy_ocid: str
+    region: str
+    # Usado apenas pela fonte de inventário "search"
+    search: Optional[oci.resource_search.ResourceSearchClient] = None
+    # Config OCI original, usada para criar clients adicionais (ex: por worker)
+    config: Dict[str, Any] = field(default_factory=dict)
+    # Contabiliza as chamadas OCI (ver instrument_clients); clients criados a
+    # partir destes (por região, por worker) são embrulhados no mesmo recorder
+    recorder: Optional[OCICallRecorder] = None
+
+    def wrap(self, client: Any, service: str) -> Any:
+        """Embrulha um client criado a partir destes no mesmo recorder (se houver)."""
+        return self.recorder.wrap(client, service) if self.recorder is not None else client
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def build_oci_clients(oci_config: Mapping[str, Any]) -> OCIClients:
+    """
+    Constrói os clients OCI (identity, compute e resource search) da região
+    do config.
+
+    :param oci_config: dict de configuração (ex: oci.config.from_file())
+    """
+    config_dict = dict(oci_config)
+    tenancy_ocid = config_dict["tenancy"]
+    region = config_dict["region"]
+
+    identity_client = oci.identity.IdentityClient(config_dict)
+    compute_client = oci.core.ComputeClient(config_dict)
+    search_client = oci.resource_search.ResourceSearchClient(config_dict)
+
+    return OCIClients(
+        identity=identity_client,
+        compute=compute_client,
+        tenancy_ocid=tenancy_ocid,
+        region=region,
+        search=search_client,
+        config=config_dict,
+    )
+
+
+def build_region_clients(clients: OCIClients, region: str) -> OCIClients:
+    """
+    Retorna os clients para ``region``, reaproveitando o IdentityClient (a API
+    de identity é global) e criando ComputeClient/ResourceSearchClient
+    apontando para a região.
+    """
+    if region == clients.region:
+        return clients
+
+    config_dict = dict(clients.config, region=region)
+    return OCIClients(
+        identity=clients.identity,
+        compute=clients.wrap(oci.core.ComputeClient(config_dict), "compute"),
+        tenancy_ocid=clients.tenancy_ocid,
+        region=region,
+        search=clients.wrap(oci.resource_search.ResourceSearchClient(config_dict), "search"),
+        config=config_dict,
+        recorder=clients.recorder,
+    )
@@ -1,113 +1,437 @@
 from __future__ import annotations
 
+import abc
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar
 
 import oci
-from oci.pagination import list_call_get_all_results
+from oci.pagination import list_call_get_all_results, list_call_get_all_results_generator
+from sqlalchemy import String, any_, bindparam, func, literal_column, not_, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from ..core.config import get_settings
 from ..models.compartment import Compartment
 from ..models.instance import Instance
+from .compartment_rollups import refresh_compartment_rollups, refresh_rollups_after_sync
+from .effective_schedules import refresh_effective_schedules
+from .inventory_generation import bump_inventory_generation
+from .oci_call_stats import OCIOperationStats, instrument_clients, retry_callback
+from .oci_clients import OCIClients, build_oci_clients, build_region_clients
+from .oci_retry import call_with_backoff
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Estado por thread dos workers de listagem (cada worker tem seu próprio ComputeClient,
+# já que os clients do SDK OCI não são thread-safe)
+_worker_state = threading.local()
+
+# Estados de instância mantidos no inventário (terminadas são ignoradas)
+_ACTIVE_INSTANCE_STATES = frozenset({
+    "PROVISIONING",
+    "RUNNING",
+    "STOPPED",
+    "STOPPING",
+    "STARTING",
+})
+
+# Fontes de inventário de instâncias:
+# - "list": ListInstances por compartment (uma ou mais chamadas por compartment)
+# - "search": Resource Search estruturado (poucas chamadas para a tenancy inteira)
+INVENTORY_SOURCES = ("list", "search")
+
+# Modos de commit do sync:
+# - "run": nenhum commit no sync; quem chamou commita tudo de uma vez (atômico)
+# - "compartment": commit a cada compartment listado por completo (opt-in;
+#   um sync interrompido mantém o que já foi gravado). Só com a fonte "list":
+#   o Resource Search não entrega as instâncias agrupadas por compartment
+COMMIT_MODES = ("run", "compartment")
+
+# Fases cronometradas do sync (SyncReport.phase_seconds). Na listagem de
+# instâncias, "instance_listing" é o tempo esperando o OCI e
+# "instance_upsert" o tempo gravando no banco (as duas se intercalam).
+SYNC_PHASES = (
+    "tree_fetch",
+    "compartment_upsert",
+    "instance_listing",
+    "instance_upsert",
+    "derived_refresh",
+    "total",
+)
+
+# Sentinela de fim de iteração em _iter_timed
+_EXHAUSTED = object()
+
+# Query de Resource Search usada pela fonte "search"
+_INSTANCE_SEARCH_QUERY = "query instance resources return allAdditionalFields"
+_SEARCH_PAGE_LIMIT = 1000
+
+# Campos que compõem o fingerprint (content_hash) de cada linha sincronizada.
+# Se o fingerprint calculado for igual ao gravado, a linha não é reescrita.
+# compartment_path_cache fica de fora: é mantido pelo sync de compartments
+# (ver _refresh_instance_path_caches), então renomear/mover um compartment
+# não reescreve todas as instâncias abaixo dele pelo upsert.
+_COMPARTMENT_HASH_FIELDS = (
+    "name",
+    "description",
+    "parent_ocid",
+    "path",
+    "is_tenancy_root",
+)
+_INSTANCE_HASH_FIELDS = (
+    "compartment_ocid",
+    "compartment_id",
+    "display_name",
+    "region",
+    "availability_domain",
+    "lifecycle_state",
+    "shape",
+    "hostname",
+    "image_ocid",
+    "freeform_tags",
+    "defined_tags",
+)
+
 
 @dataclass
-class OCIClients:
-    """Container simples para agrupar os clients OCI usados no sync."""
-    identity: oci.identity.IdentityClient
-    compute: oci.core.ComputeClient
-    tenancy_ocid: str
+class BatchStats:
+    """Um lote de instâncias gravado por um writer."""
     region: str
+    rows: int
+    # Tempo gravando o lote (statements, flush e expunge)
+    seconds: float
+    # RSS atual do processo ao fim do lote (0 fora do Linux)
+    rss_bytes: int
+    # Lote descartado pelo rollback do savepoint
+    failed: bool = False
+
+
+@dataclass
+class SyncCounts:
+    """Contadores de um passo do sync (compartments ou instâncias)."""
+    inserted: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    # Linhas de lotes descartados (só com Settings.OCI_SYNC_BATCH_SAVEPOINTS)
+    failed: int = 0
+    # compartment_id (antigo e novo) das instâncias escritas e, no passo de
+    # compartments, dos que tiveram o path alterado (renomeados/movidos);
+    # usado para atualizar só os agendamentos efetivos e rollups afetados
+    touched_compartments: Set[Any] = field(default_factory=set, repr=False)
+    # Segundos gastos em cada fase (ver SYNC_PHASES)
+    phase_seconds: Dict[str, float] = field(default_factory=dict, repr=False)
+    # Lotes gravados pelos writers de instâncias
+    batches: List[BatchStats] = field(default_factory=list, repr=False)
+
+    @property
+    def modified(self) -> int:
+        """Linhas efetivamente escritas (inseridas, alteradas ou desativadas)."""
+        return self.inserted + self.changed + self.deactivated
+
+    def merge(self, other: "SyncCounts") -> None:
+        """Soma os contadores e lotes de ``other`` (as fases ficam de fora)."""
+        self.inserted += other.inserted
+        self.changed += other.changed
+        self.unchanged += other.unchanged
+        self.deactivated += other.deactivated
+        self.failed += other.failed
+        self.touched_compartments |= other.touched_compartments
+        self.batches.extend(other.batches)
+
+    def batch_summary(self) -> Dict[str, Any]:
+        """Resumo dos lotes gravados: quantidade, tempo de flush e maior RSS medido."""
+        seconds = [batch.seconds for batch in self.batches]
+        rss_max = max((batch.rss_bytes for batch in self.batches), default=0)
+        return {
+            "batches": len(self.batches),
+            "failed_batches": sum(1 for batch in self.batches if batch.failed),
+            "flush_seconds_total": round(sum(seconds), 3),
+            "flush_seconds_max": round(max(seconds, default=0.0), 3),
+            "rss_mb_max": round(rss_max / 2 ** 20, 1),
+        }
+
+
+@dataclass
+class SyncReport:
+    """Resultado de um sync completo de inventário."""
+    compartments: SyncCounts = field(default_factory=SyncCounts)
+    # Total de instâncias (soma de todas as regiões sincronizadas)
+    instances: SyncCounts = field(default_factory=SyncCounts)
+    # Contadores de instâncias por região
+    regions: Dict[str, SyncCounts] = field(default_factory=dict)
+    # Regiões cuja listagem falhou (região -> mensagem de erro)
+    failed_regions: Dict[str, str] = field(default_factory=dict)
+    # Geração do inventário após o sync (None se nada mudou)
+    generation: Optional[int] = None
+    tenancy_ocid: Optional[str] = None
+    # Modo de commit usado ("run" ou "compartment"; ver COMMIT_MODES)
+    commit_mode: str = "run"
+    # Segundos gastos em cada fase (ver SYNC_PHASES)
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    # Chamadas OCI do sync por operação ("compute.list_instances" -> resumo)
+    oci_calls: Dict[str, OCIOperationStats] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class SourceRun:
+    """Resultado de uma fonte de inventário em :func:`compare_inventory_sources`."""
+    source: str
+    seconds: float
+    # instance_ocid -> colunas que seriam gravadas em ``instances``
+    rows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class _SearchedInstance:
+    """
+    Instância montada a partir de um resultado do Resource Search.
+
+    Expõe os mesmos atributos de ``oci.core.models.Instance`` lidos pelo sync,
+    para que as duas fontes gerem exatamente as mesmas linhas.
+    """
+    id: str
+    compartment_id: str
+    display_name: str
+    availability_domain: Optional[str]
+    lifecycle_state: str
+    shape: Optional[str] = None
+    image_id: Optional[str] = None
+    freeform_tags: Optional[Dict[str, Any]] = None
+    defined_tags: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _RegionBatch:
+    """Item produzido pela listagem multi-região e consumido pela thread de escrita."""
+    region: str
+    compartment_ocid: Optional[str] = None
+    instances: List[Any] = field(default_factory=list)
+    # Última página do compartment
+    last_page: bool = False
+    # True no último item da região (com ``error`` preenchido se a listagem falhou)
+    done: bool = False
+    error: Optional[BaseException] = None
 
 
 # ============================================================
 # Funções públicas (API do serviço)
 # ============================================================
 
-def sync_inventory(db: Session, oci_config: Mapping[str, Any]) -> None:
+def sync_inventory(
+    db: Session,
+    oci_config: Mapping[str, Any],
+    max_in_flight: Optional[int] = None,
+    bulk: Optional[bool] = None,
+    all_regions: Optional[bool] = None,
+    source: Optional[str] = None,
+    commit_mode: Optional[str] = None,
+    report: Optional[SyncReport] = None,
+) -> SyncReport:
     """
     Sincroniza completamente o inventário:
-    - Árvore de compartments da tenancy
-    - Instâncias de compute por compartment
+    - Árvore de compartments da tenancy (uma única vez, é global)
+    - Instâncias de compute por compartment (na região do config ou em todas
+      as regiões assinadas, em paralelo)
 
-    Não faz commit. O commit/rollback é responsabilidade de quem chamou.
+    Não faz commit (exceto no modo de commit "compartment"). O commit/rollback
+    é responsabilidade de quem chamou.
 
     :param db: sessão SQLAlchemy já aberta
     :param oci_config: dict de configuração OCI (ex: oci.config.from_file())
+    :param max_in_flight: máximo de compartments listados em paralelo
+                          (default: Settings.OCI_SYNC_MAX_IN_FLIGHT)
+    :param bulk: se True, usa a persistência set-based (INSERT ... ON CONFLICT)
+                 em vez do unit-of-work do ORM (default: Settings.OCI_SYNC_BULK_UPSERT)
+    :param all_regions: se True, sincroniza instâncias de todas as regiões assinadas
+                        da tenancy (default: Settings.OCI_SYNC_ALL_REGIONS)
+    :param source: fonte do inventário de instâncias, "list" (ListInstances por
+                   compartment) ou "search" (Resource Search)
+                   (default: Settings.OCI_SYNC_INVENTORY_SOURCE)
+    :param commit_mode: "run" (tudo em uma transação, commitada por quem chamou)
+                        ou "compartment" (commit a cada compartment listado;
+                        a geração do inventário só é incrementada no fim)
+                        (default: Settings.OCI_SYNC_COMMIT_MODE)
+    :param report: relatório a preencher (default: um novo). Preenchido à
+                   medida que as etapas terminam; se o sync falhar, quem chamou
+                   fica com o parcial (fases concluídas, tempo total e chamadas OCI)
+    :return: contadores de linhas inseridas/alteradas/inalteradas/desativadas
+    :raises ValueError: modo de commit desconhecido, ou "compartment" com a fonte "search"
     """
-    clients = _build_oci_clients(oci_config)
-    logger.info("Iniciando sync completo de inventário OCI para tenancy %s", clients.tenancy_ocid)
+    settings = get_settings()
+    if bulk is None:
+        bulk = settings.OCI_SYNC_BULK_UPSERT
+    if all_regions is None:
+        all_regions = settings.OCI_SYNC_ALL_REGIONS
+    if source is None:
+        source = settings.OCI_SYNC_INVENTORY_SOURCE
+    commit_mode = _resolve_commit_mode(commit_mode, source)
+
+    started = time.perf_counter()
+    clients = instrument_clients(build_oci_clients(oci_config))
+    logger.info(
+        "Iniciando sync completo de inventário OCI para tenancy %s "
+        "(bulk=%s, all_regions=%s, commit_mode=%s)",
+        clients.tenancy_ocid,
+        bulk,
+        all_regions,
+        commit_mode,
+    )
+
+    report = report if report is not None else SyncReport()
+    report.tenancy_ocid = clients.tenancy_ocid
+    report.commit_mode = commit_mode
+    try:
+        report.compartments = (
+            sync_compartments_bulk(db, clients) if bulk else sync_compartments(db, clients)
+        )
+
+        if all_regions:
+            sync_instances_all_regions(
+                db,
+                clients,
+                max_in_flight=max_in_flight,
+                bulk=bulk,
+                source=source,
+                commit_mode=commit_mode,
+                report=report,
+            )
+        elif bulk:
+            report.instances = sync_instances_bulk(
+                db, clients, max_in_flight=max_in_flight, source=source, commit_mode=commit_mode
+            )
+            report.regions[clients.region] = report.instances
+        else:
+            report.instances = sync_instances(
+                db, clients, max_in_flight=max_in_flight, source=source, commit_mode=commit_mode
+            )
+            report.regions[clients.region] = report.instances
+
+        with _timed_phase(report.phase_seconds, "derived_refresh"):
+            # Instâncias novas/movidas e subárvores movidas podem herdar outra política
+            touched = report.compartments.touched_compartments | report.instances.touched_compartments
+            schedule_changes = refresh_effective_schedules(db, compartment_ids=touched)
+
+            refresh_rollups_after_sync(
+                db,
+                clients.tenancy_ocid,
+                report.instances.touched_compartments | schedule_changes.rollup_compartments,
+                structure_changed=bool(report.compartments.modified),
+            )
+
+            # Invalida os caches em memória (árvore de compartments, ETags) das APIs
+            if report.compartments.modified or report.instances.modified:
+                report.generation = bump_inventory_generation(db, clients.tenancy_ocid)
+    finally:
+        for counts in (report.compartments, report.instances):
+            for phase, seconds in counts.phase_seconds.items():
+                report.phase_seconds[phase] = report.phase_seconds.get(phase, 0.0) + seconds
+        report.phase_seconds["total"] = time.perf_counter() - started
+        report.oci_calls = clients.recorder.summary()
+
+    for name, stats in report.oci_calls.items():
+        logger.info(
+            "Chamadas OCI %s: %d (páginas=%d, retries=%d, 429=%d, 5xx=%d, erros=%d) "
+            "p50=%.1fms p95=%.1fms p99=%.1fms",
+            name,
+            stats.calls,
+            stats.pages,
+            stats.retries,
+            stats.throttled,
+            stats.server_errors,
+            stats.errors,
+            stats.p50_ms,
+            stats.p95_ms,
+            stats.p99_ms,
+        )
 
-    sync_compartments(db, clients)
-    sync_instances(db, clients)
+    batches = report.instances.batch_summary()
+    if batches["batches"]:
+        logger.info(
+            "Lotes de instâncias gravados: %d (descartados=%d) | flush total=%.3fs máx=%.3fs | "
+            "RSS máx. ao fim de um lote=%.1f MiB",
+            batches["batches"],
+            batches["failed_batches"],
+            batches["flush_seconds_total"],
+            batches["flush_seconds_max"],
+            batches["rss_mb_max"],
+        )
 
-    logger.info("Sync completo de inventário OCI finalizado para tenancy %s", clients.tenancy_ocid)
+    logger.info(
+        "Sync completo de inventário OCI finalizado para tenancy %s: %s",
+        clients.tenancy_ocid,
+        report,
+    )
+    return report
 
 
-def sync_compartments(db: Session, clients: OCIClients) -> List[Compartment]:
+def sync_compartments(db: Session, clients: OCIClients) -> SyncCounts:
     """
     Sincroniza a tabela compartments com a árvore de compartments da tenancy.
 
-    - Insere/atualiza compartments existentes no OCI.
+    - Insere/atualiza compartments existentes no OCI (só reescreve os que
+      tiveram o content_hash alterado).
     - Marca como inativos (is_active = False) os que não existirem mais no OCI.
 
     :param db: sessão SQLAlchemy
     :param clients: objeto com IdentityClient, ComputeClient, tenancy_ocid, region
-    :return: lista de compartments sincronizados (ativos após o sync)
+    :return: contadores de linhas inseridas/alteradas/inalteradas/desativadas
     """
     tenancy_ocid = clients.tenancy_ocid
     identity = clients.identity
 
     logger.info("Buscando árvore de compartments no OCI para tenancy %s", tenancy_ocid)
 
-    tenancy = identity.get_tenancy(tenancy_ocid).data
-    tenancy_name = tenancy.name
+    counts = SyncCounts()
+    with _timed_phase(counts.phase_seconds, "tree_fetch"):
+        tenancy = identity.get_tenancy(tenancy_ocid).data
+        tenancy_name = tenancy.name
 
-    remote_nodes = _fetch_compartment_tree(identity, tenancy_ocid, tenancy_name)
+        remote_nodes = _fetch_compartment_tree(identity, tenancy_ocid, tenancy_name)
     logger.info("Foram retornados %d nós de árvore (incluindo raiz tenancy).", len(remote_nodes))
 
+    upsert_started = time.perf_counter()
+
     # Busca tudo que já temos dessa tenancy no banco
     existing: Dict[str, Compartment] = {
         c.compartment_ocid: c
         for c in db.query(Compartment).filter(Compartment.tenancy_ocid == tenancy_ocid)
     }
 
-    updated_or_created: List[Compartment] = []
     remote_ocids: Set[str] = set()
 
     for node in remote_nodes:
         ocid = node["compartment_ocid"]
         remote_ocids.add(ocid)
 
+        values = _compartment_values(tenancy_ocid, node)
+
         comp = existing.get(ocid)
         if comp is None:
-            comp = Compartment(
-                tenancy_ocid=tenancy_ocid,
-                compartment_ocid=ocid,
-                name=node["name"],
-                description=node.get("description"),
-                parent_ocid=node.get("parent_ocid"),
-                path=node["path"],
-                is_tenancy_root=node["is_tenancy_root"],
-            )
-            # Marca ativo, se o modelo tiver esse campo
-            if hasattr(comp, "is_active"):
-                setattr(comp, "is_active", True)
+            comp = Compartment(**values)
             db.add(comp)
             existing[ocid] = comp
+            counts.inserted += 1
+        elif comp.content_hash == values["content_hash"] and comp.is_active:
+            # Nada mudou: não toca no objeto (evita UPDATE e bump de updated_at)
+            counts.unchanged += 1
         else:
-            comp.name = node["name"]
-            comp.description = node.get("description")
-            comp.parent_ocid = node.get("parent_ocid")
-            comp.path = node["path"]
-            comp.is_tenancy_root = node["is_tenancy_root"]
-            if hasattr(comp, "is_active"):
-                setattr(comp, "is_active", True)
-
-        updated_or_created.append(comp)
+            for field_name, value in values.items():
+                setattr(comp, field_name, value)
+            counts.changed += 1
 
     # Flush para garantir IDs (UUID) gerados antes de ajustarmos parent_id
     db.flush()
@@ -120,186 +444,868 @@ def sync_compartments(db: Session, clients: OCIClients) -> List[Compartment]:
     for comp in existing.values():
         if comp.parent_ocid:
             parent = ocid_to_model.get(comp.parent_ocid)
-            if parent is not None:
+            if parent is not None and comp.parent_id != parent.id:
                 comp.parent_id = parent.id  # type: ignore[attr-defined]
-        else:
+        elif comp.parent_id is not None:
             comp.parent_id = None  # type: ignore[attr-defined]
 
     # Marca como inativos os compartments que sumiram do OCI
-    missing = [c for ocid, c in existing.items() if ocid not in remote_ocids]
+    missing = [
+        c for ocid, c in existing.items()
+        if ocid not in remote_ocids and c.is_active
+    ]
     for comp in missing:
-        if hasattr(comp, "is_active"):
-            setattr(comp, "is_active", False)
-
-    logger.info(
-        "Sync de compartments concluído. Ativos/atualizados: %d, marcados inativos: %d",
-        len(updated_or_created),
-        len(missing),
-    )
+        comp.is_active = False
+    counts.deactivated = len(missing)
 
     db.flush()
-    return updated_or_created
+    _refresh_instance_path_caches(db, tenancy_ocid, counts.touched_compartments)
+
+    # Já gravados: tira os objetos da sessão, que segue aberta até o commit de quem chamou
+    for comp in existing.values():
+        db.expunge(comp)
+    counts.phase_seconds["compartment_upsert"] = time.perf_counter() - upsert_started
+
+    logger.info("Sync de compartments concluído: %s", counts)
+    return counts
 
 
-def sync_instances(db: Session, clients: OCIClients) -> List[Instance]:
+def sync_instances(
+    db: Session,
+    clients: OCIClients,
+    max_in_flight: Optional[int] = None,
+    source: Optional[str] = None,
+    commit_mode: Optional[str] = None,
+) -> SyncCounts:
     """
     Sincroniza a tabela instances com as instâncias de compute da tenancy (na região do config).
 
-    - Lista instâncias por compartment ativo.
-    - Insere/atualiza instâncias encontradas.
+    - Lista instâncias por compartment ativo, página a página (até
+      ``max_in_flight`` compartments em paralelo).
+    - Insere/atualiza instâncias encontradas em lotes de
+      ``Settings.OCI_SYNC_BATCH_SIZE`` (só reescreve as que tiveram o
+      content_hash alterado).
     - Marca como inativas (is_active = False) as instâncias que não aparecerem mais no OCI.
 
+    A listagem no OCI roda em um pool de threads, mas toda escrita na sessão
+    acontece na thread chamadora. Cada lote é gravado com flush e seus objetos
+    saem da sessão (expunge); entre lotes só os OCIDs vistos ficam em memória,
+    então o pico não cresce com o tamanho da frota.
+
     :param db: sessão SQLAlchemy
     :param clients: objeto com IdentityClient, ComputeClient, tenancy_ocid, region
-    :return: lista de instâncias sincronizadas (ativas após o sync)
+    :param max_in_flight: máximo de compartments listados em paralelo
+                          (default: Settings.OCI_SYNC_MAX_IN_FLIGHT; 1 = sequencial)
+    :param source: fonte do inventário, "list" ou "search"
+                   (default: Settings.OCI_SYNC_INVENTORY_SOURCE)
+    :param commit_mode: "run" ou "compartment" (default: Settings.OCI_SYNC_COMMIT_MODE)
+    :return: contadores de linhas inseridas/alteradas/inalteradas/desativadas
+    """
+    return _sync_region_instances(
+        db, clients, max_in_flight, source, _OrmInstanceWriter, commit_mode
+    )
+
+
+def sync_compartments_bulk(db: Session, clients: OCIClients) -> SyncCounts:
+    """
+    Versão set-based de :func:`sync_compartments` (somente PostgreSQL).
+
+    - Grava os nós em lotes com INSERT ... ON CONFLICT (compartment_ocid) DO UPDATE.
+    - Resolve parent_id de toda a tenancy com um único UPDATE.
+    - Marca como inativos os compartments que sumiram do OCI com um único UPDATE.
+    - Propaga paths renomeados/movidos para o cache das instâncias com um único UPDATE.
+
+    Não carrega objetos ORM; a sessão só é usada para executar os statements.
+
+    :param db: sessão SQLAlchemy
+    :param clients: objeto com IdentityClient, ComputeClient, tenancy_ocid, region
+    :return: contadores de linhas inseridas/alteradas/inalteradas/desativadas
     """
     tenancy_ocid = clients.tenancy_ocid
-    region = clients.region
-    compute = clients.compute
+    identity = clients.identity
+    batch_size = get_settings().OCI_SYNC_BATCH_SIZE
 
-    logger.info(
-        "Iniciando sync de instâncias para tenancy %s na região %s",
-        tenancy_ocid,
-        region,
-    )
+    logger.info("Buscando árvore de compartments no OCI para tenancy %s (bulk)", tenancy_ocid)
+
+    counts = SyncCounts()
+    with _timed_phase(counts.phase_seconds, "tree_fetch"):
+        tenancy = identity.get_tenancy(tenancy_ocid).data
+        remote_nodes = _fetch_compartment_tree(identity, tenancy_ocid, tenancy.name)
+    logger.info("Foram retornados %d nós de árvore (incluindo raiz tenancy).", len(remote_nodes))
+
+    with _timed_phase(counts.phase_seconds, "compartment_upsert"):
+        rows = [_compartment_values(tenancy_ocid, node) for node in remote_nodes]
+
+        for start in range(0, len(rows), batch_size):
+            _upsert_compartment_rows(db, rows[start:start + batch_size], counts)
 
-    # Busca compartments ativos dessa tenancy
-    compartments_q = db.query(Compartment).filter(
-        Compartment.tenancy_ocid == tenancy_ocid
+        _resolve_compartment_parents(db, tenancy_ocid)
+        counts.deactivated = _deactivate_missing_compartments(
+            db, tenancy_ocid, [r["compartment_ocid"] for r in rows]
+        )
+        _refresh_instance_path_caches(db, tenancy_ocid, counts.touched_compartments)
+
+    logger.info("Sync de compartments (bulk) concluído: %s", counts)
+    return counts
+
+
+def sync_instances_bulk(
+    db: Session,
+    clients: OCIClients,
+    max_in_flight: Optional[int] = None,
+    source: Optional[str] = None,
+    commit_mode: Optional[str] = None,
+) -> SyncCounts:
+    """
+    Versão set-based de :func:`sync_instances` (somente PostgreSQL).
+
+    As páginas retornadas pelo OCI são acumuladas em lotes de
+    ``Settings.OCI_SYNC_BATCH_SIZE`` e gravadas com
+    INSERT ... ON CONFLICT (instance_ocid) DO UPDATE, que só reescreve as linhas
+    cujo content_hash mudou. As que sumiram do OCI são marcadas como inativas
+    com um único UPDATE no final.
+
+    :param db: sessão SQLAlchemy
+    :param clients: objeto com IdentityClient, ComputeClient, tenancy_ocid, region
+    :param max_in_flight: máximo de compartments listados em paralelo
+                          (default: Settings.OCI_SYNC_MAX_IN_FLIGHT; 1 = sequencial)
+    :param source: fonte do inventário, "list" ou "search"
+                   (default: Settings.OCI_SYNC_INVENTORY_SOURCE)
+    :param commit_mode: "run" ou "compartment" (default: Settings.OCI_SYNC_COMMIT_MODE)
+    :return: contadores de linhas inseridas/alteradas/inalteradas/desativadas
+    """
+    return _sync_region_instances(
+        db, clients, max_in_flight, source, _BulkInstanceWriter, commit_mode
     )
-    if hasattr(Compartment, "is_active"):
-        compartments_q = compartments_q.filter(getattr(Compartment, "is_active") == True)  # noqa: E712
 
-    compartments: List[Compartment] = list(compartments_q)
-    compartment_by_ocid: Dict[str, Compartment] = {
-        c.compartment_ocid: c for c in compartments
-    }
 
-    # Todas as instâncias já cadastradas para essa região
-    existing_instances: Dict[str, Instance] = {
-        inst.instance_ocid: inst
-        for inst in db.query(Instance).filter(Instance.region == region)
-    }
+def sync_instances_all_regions(
+    db: Session,
+    clients: OCIClients,
+    regions: Optional[List[str]] = None,
+    max_in_flight: Optional[int] = None,
+    bulk: Optional[bool] = None,
+    source: Optional[str] = None,
+    commit_mode: Optional[str] = None,
+    report: Optional[SyncReport] = None,
+) -> SyncReport:
+    """
+    Sincroniza as instâncias de várias regiões em paralelo.
 
-    remote_instance_ocids: Set[str] = set()
-    updated_or_created: List[Instance] = []
+    - Cada região tem seu próprio ComputeClient e lista os compartments ativos
+      (já sincronizados uma única vez, a árvore é global) com até
+      ``max_in_flight`` chamadas em paralelo *por região*.
+    - Todas as escritas acontecem na thread chamadora.
+    - A desativação é feita por região e só quando a listagem da região terminou
+      sem erro: uma região com falha não marca instâncias como inativas e não
+      interrompe as demais.
 
-    active_states = {
-        "PROVISIONING",
-        "RUNNING",
-        "STOPPED",
-        "STOPPING",
-        "STARTING",
-    }
+    :param db: sessão SQLAlchemy
+    :param clients: clients da região do config (usados como base)
+    :param regions: regiões a sincronizar (default: regiões assinadas da tenancy)
+    :param max_in_flight: máximo de compartments listados em paralelo por região
+    :param bulk: usa a persistência set-based (default: Settings.OCI_SYNC_BULK_UPSERT)
+    :param source: fonte do inventário, "list" ou "search"
+                   (default: Settings.OCI_SYNC_INVENTORY_SOURCE)
+    :param commit_mode: "run" ou "compartment" (default: Settings.OCI_SYNC_COMMIT_MODE)
+    :param report: relatório a preencher (default: um novo); mantém as regiões
+                   já gravadas mesmo se a função levantar
+    :return: SyncReport com contadores por região, total e regiões com falha
+    :raises RuntimeError: se todas as regiões falharem
+    """
+    settings = get_settings()
+    if max_in_flight is None:
+        max_in_flight = settings.OCI_SYNC_MAX_IN_FLIGHT
+    if bulk is None:
+        bulk = settings.OCI_SYNC_BULK_UPSERT
+    if source is None:
+        source = settings.OCI_SYNC_INVENTORY_SOURCE
+    commit_mode = _resolve_commit_mode(commit_mode, source)
+    if regions is None:
+        regions = _list_subscribed_regions(clients.identity, clients.tenancy_ocid)
+
+    writer_cls = _BulkInstanceWriter if bulk else _OrmInstanceWriter
 
-    for comp in compartments:
-        comp_ocid = comp.compartment_ocid
-        logger.debug(
-            "Listando instâncias em compartment %s (%s)",
-            comp.name,
-            comp_ocid,
+    logger.info(
+        "Iniciando sync de instâncias para tenancy %s nas regiões %s "
+        "(max_in_flight=%d por região, bulk=%s, source=%s)",
+        clients.tenancy_ocid,
+        ", ".join(regions),
+        max_in_flight,
+        bulk,
+        source,
+    )
+
+    compartments = _load_active_compartments(db, clients.tenancy_ocid)
+    region_clients = {region: build_region_clients(clients, region) for region in regions}
+    writers = {region: writer_cls(db, region, compartments, commit_mode) for region in regions}
+
+    report = report if report is not None else SyncReport()
+    phase_seconds = report.instances.phase_seconds
+
+    for batch in _iter_timed(
+        _iter_instances_by_region(region_clients, list(compartments), max_in_flight, source),
+        phase_seconds,
+        "instance_listing",
+    ):
+        writer = writers[batch.region]
+
+        with _timed_phase(phase_seconds, "instance_upsert"):
+            if not batch.done:
+                writer.add(batch.compartment_ocid, batch.instances)
+                if batch.last_page:
+                    writer.compartment_done(batch.compartment_ocid)
+                continue
+
+            if batch.error is not None:
+                logger.error(
+                    "Falha ao listar instâncias na região %s; desativação ignorada para essa região: %s",
+                    batch.region,
+                    batch.error,
+                )
+                report.failed_regions[batch.region] = str(batch.error)
+                report.regions[batch.region] = writer.finish(deactivate=False)
+            else:
+                report.regions[batch.region] = writer.finish(deactivate=True)
+
+    for counts in report.regions.values():
+        report.instances.merge(counts)
+
+    if regions and len(report.failed_regions) == len(regions):
+        raise RuntimeError(
+            f"Sync de instâncias falhou em todas as regiões: {report.failed_regions}"
         )
 
-        # Pega todas as instâncias do compartment (paginação automática)
-        response = list_call_get_all_results(
-            compute.list_instances,
-            compartment_id=comp_ocid,
+    logger.info("Sync de instâncias multi-região concluído: %s", report.instances)
+    return report
+
+
+def compare_inventory_sources(
+    clients: OCIClients,
+    max_in_flight: Optional[int] = None,
+) -> List[SourceRun]:
+    """
+    Executa cada fonte de inventário (:data:`INVENTORY_SOURCES`) contra os mesmos
+    clients e devolve o tempo e as linhas de ``instances`` que cada uma geraria.
+
+    Não acessa o banco: compartment_id/path das linhas recebem o OCID do
+    compartment, o que basta para comparar as fontes entre si. Pensado para
+    rodar offline com os clients de :mod:`app.testing.oci_fake_backend`.
+
+    :param clients: clients OCI (reais ou falsos) com ``search`` preenchido
+    :param max_in_flight: paralelismo usado pelas fontes
+                          (default: Settings.OCI_SYNC_MAX_IN_FLIGHT)
+    """
+    if max_in_flight is None:
+        max_in_flight = get_settings().OCI_SYNC_MAX_IN_FLIGHT
+
+    tenancy = clients.identity.get_tenancy(clients.tenancy_ocid).data
+    nodes = _fetch_compartment_tree(clients.identity, clients.tenancy_ocid, tenancy.name)
+    compartment_ocids = [n["compartment_ocid"] for n in nodes]
+
+    runs: List[SourceRun] = []
+    for source in INVENTORY_SOURCES:
+        run = SourceRun(source=source, seconds=0.0)
+        started = time.perf_counter()
+
+        for comp_ocid, instances, _ in _iter_remote_instances(
+            clients, compartment_ocids, max_in_flight, source
+        ):
+            for inst in instances:
+                if inst.lifecycle_state in _ACTIVE_INSTANCE_STATES:
+                    run.rows[inst.id] = _instance_values(inst, clients.region, comp_ocid, comp_ocid)
+
+        run.seconds = time.perf_counter() - started
+        runs.append(run)
+
+    return runs
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+@contextmanager
+def _timed_phase(phase_seconds: Dict[str, float], phase: str) -> Iterator[None]:
+    """Soma o tempo do bloco em ``phase_seconds[phase]``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_seconds[phase] = phase_seconds.get(phase, 0.0) + time.perf_counter() - started
+
+
+def _iter_timed(items: Iterable[T], phase_seconds: Dict[str, float], phase: str) -> Iterator[T]:
+    """Itera ``items`` somando em ``phase_seconds[phase]`` só o tempo esperando cada item."""
+    iterator = iter(items)
+    while True:
+        with _timed_phase(phase_seconds, phase):
+            item = next(iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return
+        yield item
+
+
+def _load_active_compartments(db: Session, tenancy_ocid: str) -> Dict[str, Tuple[Any, str]]:
+    """
+    Retorna ``{compartment_ocid: (id, path)}`` dos compartments ativos da tenancy.
+
+    Só as colunas necessárias (sem objetos ORM).
+    """
+    return {
+        ocid: (comp_id, path)
+        for ocid, comp_id, path in db.execute(
+            select(Compartment.compartment_ocid, Compartment.id, Compartment.path).where(
+                Compartment.tenancy_ocid == tenancy_ocid,
+                Compartment.is_active.is_(True),
+            )
         )
+    }
+
+
+def _sync_region_instances(
+    db: Session,
+    clients: OCIClients,
+    max_in_flight: Optional[int],
+    source: Optional[str],
+    writer_cls: type,
+    commit_mode: Optional[str] = None,
+) -> SyncCounts:
+    """Sync das instâncias de uma única região (clients.region) com o writer informado."""
+    settings = get_settings()
+    if max_in_flight is None:
+        max_in_flight = settings.OCI_SYNC_MAX_IN_FLIGHT
+    if source is None:
+        source = settings.OCI_SYNC_INVENTORY_SOURCE
+    commit_mode = _resolve_commit_mode(commit_mode, source)
+
+    logger.info(
+        "Iniciando sync de instâncias para tenancy %s na região %s (max_in_flight=%d, source=%s, %s)",
+        clients.tenancy_ocid,
+        clients.region,
+        max_in_flight,
+        source,
+        writer_cls.__name__,
+    )
+
+    compartments = _load_active_compartments(db, clients.tenancy_ocid)
+    writer = writer_cls(db, clients.region, compartments, commit_mode)
+    phase_seconds = writer.counts.phase_seconds
+
+    for comp_ocid, remote_instances, last_page in _iter_timed(
+        _iter_remote_instances(clients, list(compartments), max_in_flight, source),
+        phase_seconds,
+        "instance_listing",
+    ):
+        with _timed_phase(phase_seconds, "instance_upsert"):
+            writer.add(comp_ocid, remote_instances)
+            if last_page:
+                writer.compartment_done(comp_ocid)
+
+    with _timed_phase(phase_seconds, "instance_upsert"):
+        counts = writer.finish(deactivate=True)
+    logger.info("Sync de instâncias concluído na região %s: %s", clients.region, counts)
+    return counts
+
+
+def _resolve_commit_mode(commit_mode: Optional[str], source: str) -> str:
+    if commit_mode is None:
+        commit_mode = get_settings().OCI_SYNC_COMMIT_MODE
+    if commit_mode not in COMMIT_MODES:
+        raise ValueError(f"Modo de commit desconhecido: {commit_mode!r} (use um de {COMMIT_MODES})")
+    if commit_mode == "compartment" and source == "search":
+        # A busca nunca sinaliza o fim de um compartment: o sync rodaria
+        # em uma transação só, sem avisar
+        raise ValueError('O modo de commit "compartment" exige a fonte de inventário "list"')
+    return commit_mode
+
+
+def _current_rss_bytes() -> int:
+    """
+    RSS atual do processo, lido de ``/proc/self/statm`` (páginas residentes).
+
+    Não usa ``ru_maxrss``: ele é o pico do processo inteiro e nunca desce, então
+    não mostraria se um lote devolveu a memória. Fora do Linux retorna 0.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
 
-        for inst in response.data:
+class _InstanceWriter(abc.ABC):
+    """
+    Base dos writers de instâncias de uma região.
+
+    Descarta instâncias terminadas e repetidas, acumula as linhas em lotes de
+    ``Settings.OCI_SYNC_BATCH_SIZE`` e grava cada lote com :meth:`_write_batch`.
+    Entre lotes só os OCIDs vistos ficam em memória (para a desativação).
+
+    - Com ``Settings.OCI_SYNC_BATCH_SAVEPOINTS`` cada lote roda em um savepoint:
+      um lote que falhar no banco é descartado (contado em ``failed``) e o sync
+      continua, ainda em uma única transação.
+    - No modo de commit "compartment" cada compartment listado por completo
+      é commitado (junto com o que já estiver no lote), e antes de cada commit
+      os dados derivados dos compartments gravados desde o anterior
+      (agendamentos efetivos e rollups) são atualizados: o que fica
+      commitado é consistente mesmo se o sync cair depois. A geração do
+      inventário não muda a cada commit (as APIs invalidariam a árvore a cada
+      compartment e veriam o sync pela metade): é incrementada uma vez, no
+      fim do sync ou ao registrar a falha.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        region: str,
+        compartments: Dict[str, Tuple[Any, str]],
+        commit_mode: str = "run",
+    ):
+        settings = get_settings()
+        self.db = db
+        self.region = region
+        self.compartments = compartments
+        self.batch_size = settings.OCI_SYNC_BATCH_SIZE
+        self.savepoints = settings.OCI_SYNC_BATCH_SAVEPOINTS
+        self.commit_mode = commit_mode
+        self.counts = SyncCounts()
+        self.remote_ocids: Set[str] = set()
+        self.batch: List[Dict[str, Any]] = []
+        # Compartments com instâncias gravadas desde o último commit (modo "compartment")
+        self.pending_refresh: Set[Any] = set()
+
+    def add(self, compartment_ocid: str, remote_instances: Iterable[Any]) -> None:
+        comp_id, comp_path = self.compartments[compartment_ocid]
+
+        for inst in remote_instances:
             # Ignora instâncias terminadas (não retornam normalmente, mas por segurança)
-            if inst.lifecycle_state not in active_states:
+            if inst.lifecycle_state not in _ACTIVE_INSTANCE_STATES:
+                continue
+            # Evita a mesma linha duas vezes no mesmo lote
+            if inst.id in self.remote_ocids:
                 continue
 
-            inst_ocid = inst.id
-            remote_instance_ocids.add(inst_ocid)
+            self.remote_ocids.add(inst.id)
+            self.batch.append(_instance_values(inst, self.region, comp_id, comp_path))
+
+            if len(self.batch) >= self.batch_size:
+                self._flush_batch()
+
+    def compartment_done(self, compartment_ocid: str) -> None:
+        """
+        Última página do compartment recebida: no modo "compartment", grava,
+        atualiza os dados derivados do que foi gravado e commita.
+        """
+        if self.commit_mode != "compartment":
+            return
+
+        self._flush_batch()
+        if self.pending_refresh:
+            touched, self.pending_refresh = self.pending_refresh, set()
+            changes = refresh_effective_schedules(self.db, compartment_ids=touched)
+            refresh_compartment_rollups(self.db, touched | changes.rollup_compartments)
+        self.db.commit()
+
+    def finish(self, deactivate: bool) -> SyncCounts:
+        self._flush_batch()
+        if deactivate:
+            self.counts.deactivated = self._deactivate_missing()
+        return self.counts
+
+    def _flush_batch(self) -> None:
+        if not self.batch:
+            return
+
+        rows, self.batch = self.batch, []
+        batch_counts = SyncCounts()
+        started = time.perf_counter()
+        failed = False
+
+        if self.savepoints:
+            try:
+                with self.db.begin_nested():
+                    self._write_batch(rows, batch_counts)
+            except SQLAlchemyError:
+                logger.exception(
+                    "Falha ao gravar lote de %d instâncias da região %s; lote descartado",
+                    len(rows),
+                    self.region,
+                )
+                failed = True
+        else:
+            self._write_batch(rows, batch_counts)
 
-            db_instance = existing_instances.get(inst_ocid)
-            if db_instance is None:
-                db_instance = Instance(
-                    instance_ocid=inst_ocid,
-                    compartment_ocid=inst.compartment_id,
-                    compartment_id=comp.id,
-                    display_name=inst.display_name,
-                    region=region,
-                    availability_domain=inst.availability_domain,
-                    lifecycle_state=inst.lifecycle_state,
-                    shape=inst.shape,
-                    hostname=getattr(inst, "hostname_label", None),
-                    image_ocid=getattr(inst, "image_id", None),
-                    # tags
-                    freeform_tags=getattr(inst, "freeform_tags", None),
-                    defined_tags=getattr(inst, "defined_tags", None),
-                    # cache de path do compartment para facilitar filtros
-                    compartment_path_cache=comp.path,
+        if failed:
+            self.counts.failed += len(rows)
+        else:
+            self.counts.merge(batch_counts)
+            self.pending_refresh |= batch_counts.touched_compartments
+
+        stats = BatchStats(
+            region=self.region,
+            rows=len(rows),
+            seconds=time.perf_counter() - started,
+            rss_bytes=_current_rss_bytes(),
+            failed=failed,
+        )
+        self.counts.batches.append(stats)
+        logger.debug(
+            "Lote de %d instâncias gravado na região %s em %.3fs (RSS=%.1f MiB)",
+            stats.rows,
+            stats.region,
+            stats.seconds,
+            stats.rss_bytes / 2 ** 20,
+        )
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: List[Dict[str, Any]], counts: SyncCounts) -> None:
+        """Grava um lote de linhas e acumula o resultado em ``counts``."""
+
+    @abc.abstractmethod
+    def _deactivate_missing(self) -> int:
+        """Desativa as instâncias da região que não vieram da OCI; retorna quantas."""
+
+
+class _OrmInstanceWriter(_InstanceWriter):
+    """
+    Persiste as instâncias de uma região pelo unit-of-work do ORM.
+
+    A cada lote carrega só as instâncias já cadastradas daquele lote, compara o
+    content_hash e só altera os objetos que mudaram; depois do flush os objetos
+    saem da sessão (expunge), então o identity map não cresce com a frota.
+    """
+
+    def _write_batch(self, rows: List[Dict[str, Any]], counts: SyncCounts) -> None:
+        existing: Dict[str, Instance] = {
+            inst.instance_ocid: inst
+            for inst in self.db.scalars(
+                select(Instance).where(
+                    Instance.instance_ocid.in_([values["instance_ocid"] for values in rows])
                 )
-                if hasattr(db_instance, "is_active"):
-                    setattr(db_instance, "is_active", True)
+            )
+        }
+        created: List[Instance] = []
 
-                db.add(db_instance)
-                existing_instances[inst_ocid] = db_instance
+        for values in rows:
+            comp_id = values["compartment_id"]
+            db_instance = existing.get(values["instance_ocid"])
+            if db_instance is None:
+                db_instance = Instance(**values)
+                self.db.add(db_instance)
+                created.append(db_instance)
+                counts.inserted += 1
+                counts.touched_compartments.add(comp_id)
+            elif db_instance.content_hash == values["content_hash"] and db_instance.is_active:
+                # Nada mudou: não toca no objeto (evita reescrever JSONB e updated_at)
+                counts.unchanged += 1
             else:
                 # Atualiza campos principais
-                db_instance.compartment_ocid = inst.compartment_id
-                db_instance.compartment_id = comp.id
-                db_instance.display_name = inst.display_name
-                db_instance.region = region
-                db_instance.availability_domain = inst.availability_domain
-                db_instance.lifecycle_state = inst.lifecycle_state
-                db_instance.shape = inst.shape
-                db_instance.hostname = getattr(inst, "hostname_label", None)
-                db_instance.image_ocid = getattr(inst, "image_id", None)
-                db_instance.freeform_tags = getattr(inst, "freeform_tags", None)
-                db_instance.defined_tags = getattr(inst, "defined_tags", None)
-                db_instance.compartment_path_cache = comp.path
-                if hasattr(db_instance, "is_active"):
-                    setattr(db_instance, "is_active", True)
-
-            updated_or_created.append(db_instance)
-
-    # Instâncias que existiam no banco, mas não apareceram mais no OCI
-    missing_instances = [
-        inst for ocid, inst in existing_instances.items()
-        if ocid not in remote_instance_ocids
-    ]
-    for inst in missing_instances:
-        if hasattr(inst, "is_active"):
-            setattr(inst, "is_active", False)
+                counts.touched_compartments.update((db_instance.compartment_id, comp_id))
+                for field_name, value in values.items():
+                    setattr(db_instance, field_name, value)
+                counts.changed += 1
+
+        self.db.flush()
+        for db_instance in (*existing.values(), *created):
+            self.db.expunge(db_instance)
+
+    def _deactivate_missing(self) -> int:
+        """Desativa, em lotes, as instâncias da região que não apareceram mais no OCI."""
+        # Só os OCIDs ativos da região (sem objetos ORM)
+        missing = [
+            ocid
+            for ocid in self.db.scalars(
+                select(Instance.instance_ocid).where(
+                    Instance.region == self.region,
+                    Instance.is_active.is_(True),
+                )
+            )
+            if ocid not in self.remote_ocids
+        ]
+
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            instances = self.db.scalars(
+                select(Instance).where(Instance.instance_ocid.in_(chunk))
+            ).all()
+            for inst in instances:
+                inst.is_active = False
+                self.counts.touched_compartments.add(inst.compartment_id)
+            self.db.flush()
+            for inst in instances:
+                self.db.expunge(inst)
+        return len(missing)
+
+
+class _BulkInstanceWriter(_InstanceWriter):
+    """
+    Persiste as instâncias de uma região com INSERT ... ON CONFLICT, um
+    statement por lote (somente PostgreSQL).
+    """
 
-    logger.info(
-        "Sync de instâncias concluído. Ativas/atualizadas: %d, marcadas inativas: %d",
-        len(updated_or_created),
-        len(missing_instances),
+    def _write_batch(self, rows: List[Dict[str, Any]], counts: SyncCounts) -> None:
+        _upsert_instance_rows(self.db, rows, counts)
+
+    def _deactivate_missing(self) -> int:
+        return _deactivate_missing_instances(
+            self.db, self.region, self.remote_ocids, self.counts.touched_compartments
+        )
+
+
+def _list_subscribed_regions(
+    identity_client: oci.identity.IdentityClient,
+    tenancy_ocid: str,
+) -> List[str]:
+    """Retorna os nomes das regiões assinadas (status READY) pela tenancy."""
+    subscriptions = identity_client.list_region_subscriptions(tenancy_ocid).data
+    return sorted(
+        s.region_name for s in subscriptions
+        if getattr(s, "status", "READY") == "READY"
     )
 
-    db.flush()
-    return updated_or_created
+
+def _list_instances_page(
+    compute_client: oci.core.ComputeClient,
+    compartment_ocid: str,
+    page: Optional[str] = None,
+) -> Any:
+    """
+    Uma página de ListInstances de um compartment, repetindo a chamada com
+    backoff quando o OCI responde 429 (só a página, não a listagem inteira).
+    """
+    settings = get_settings()
+    return call_with_backoff(
+        compute_client.list_instances,
+        compartment_id=compartment_ocid,
+        page=page,
+        max_retries=settings.OCI_SYNC_MAX_RETRIES,
+        base_delay=settings.OCI_SYNC_BACKOFF_BASE_SECONDS,
+        max_delay=settings.OCI_SYNC_BACKOFF_MAX_SECONDS,
+        on_retry=retry_callback(compute_client, "list_instances"),
+    )
 
 
-# ============================================================
-# Helpers internos
-# ============================================================
+def _iter_compartment_instance_pages(
+    compute_client: oci.core.ComputeClient,
+    compartment_ocid: str,
+) -> Iterator[Tuple[List[Any], bool]]:
+    """
+    Gera ``(instâncias da página, última página)`` de um compartment à medida
+    que as páginas chegam do OCI (sem materializar a listagem inteira).
+    """
+    for response in list_call_get_all_results_generator(
+        _list_instances_page, "response", compute_client, compartment_ocid
+    ):
+        yield response.data, not response.has_next_page
+
+
+def _init_listing_worker(clients: OCIClients) -> None:
+    """Initializer do pool: cria um ComputeClient dedicado para a thread do worker."""
+    if clients.config:
+        _worker_state.compute = clients.wrap(oci.core.ComputeClient(clients.config), "compute")
+    else:
+        # Sem config (ex: clients fake em testes) reaproveita o client existente
+        _worker_state.compute = clients.compute
 
-def _build_oci_clients(oci_config: Mapping[str, Any]) -> OCIClients:
+
+def _list_page_in_worker(compartment_ocid: str, page: Optional[str]) -> Any:
+    logger.debug("Listando instâncias em compartment %s (página %s)", compartment_ocid, page)
+    return _list_instances_page(_worker_state.compute, compartment_ocid, page)
+
+
+def _iter_instances_by_compartment(
+    clients: OCIClients,
+    compartment_ocids: Iterable[str],
+    max_in_flight: int,
+) -> Iterator[Tuple[str, List[Any], bool]]:
+    """
+    Gera ``(compartment_ocid, instâncias de uma página, última página)``; um
+    compartment com várias páginas aparece várias vezes.
+
+    Com ``max_in_flight > 1`` as páginas são pedidas em um pool de threads, com
+    no máximo ``max_in_flight`` compartments em andamento ao mesmo tempo (a
+    próxima página de um compartment é pedida assim que a anterior chega). Os
+    resultados são devolvidos à thread chamadora (a única que escreve no banco)
+    na ordem em que ficam prontos.
     """
-    Constrói os clients OCI usados no sync a partir do dict de configuração.
+    if max_in_flight <= 1:
+        for comp_ocid in compartment_ocids:
+            logger.debug("Listando instâncias em compartment %s", comp_ocid)
+            for instances, last_page in _iter_compartment_instance_pages(clients.compute, comp_ocid):
+                yield comp_ocid, instances, last_page
+        return
+
+    pending = iter(compartment_ocids)
+    in_flight: Dict[Future, str] = {}
+
+    with ThreadPoolExecutor(
+        max_workers=max_in_flight,
+        thread_name_prefix="oci-list-instances",
+        initializer=_init_listing_worker,
+        initargs=(clients,),
+    ) as executor:
+
+        def submit(comp_ocid: str, page: Optional[str] = None) -> None:
+            in_flight[executor.submit(_list_page_in_worker, comp_ocid, page)] = comp_ocid
+
+        def submit_next() -> None:
+            comp_ocid = next(pending, None)
+            if comp_ocid is not None:
+                submit(comp_ocid)
+
+        for _ in range(max_in_flight):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                comp_ocid = in_flight.pop(future)
+                response = future.result()
+                if response.has_next_page:
+                    submit(comp_ocid, response.next_page)
+                else:
+                    submit_next()
+                yield comp_ocid, response.data, not response.has_next_page
+
+
+def _iter_remote_instances(
+    clients: OCIClients,
+    compartment_ocids: List[str],
+    max_in_flight: int,
+    source: str,
+) -> Iterator[Tuple[str, List[Any], bool]]:
+    """
+    Gera ``(compartment_ocid, instâncias, última página)`` a partir da fonte de
+    inventário escolhida, uma página (ou parte de uma página) por vez.
 
-    :param oci_config: dict de configuração (ex: oci.config.from_file())
+    As duas fontes geram objetos com os mesmos atributos (os de
+    ``oci.core.models.Instance`` usados em :func:`_instance_values`) e só para
+    os compartments informados.
     """
-    config_dict = dict(oci_config)
-    tenancy_ocid = config_dict["tenancy"]
-    region = config_dict["region"]
+    if source == "list":
+        return _iter_instances_by_compartment(clients, compartment_ocids, max_in_flight)
+    if source == "search":
+        return _iter_instances_by_search(clients, compartment_ocids, max_in_flight)
+    raise ValueError(
+        f"Fonte de inventário desconhecida: {source!r} (use uma de {INVENTORY_SOURCES})"
+    )
 
-    identity_client = oci.identity.IdentityClient(config_dict)
-    compute_client = oci.core.ComputeClient(config_dict)
 
-    return OCIClients(
-        identity=identity_client,
-        compute=compute_client,
-        tenancy_ocid=tenancy_ocid,
-        region=region,
+def _iter_search_pages(
+    search_client: oci.resource_search.ResourceSearchClient,
+    query: str,
+) -> Iterator[List[Any]]:
+    """
+    Pagina um Resource Search estruturado, com backoff em 429 por página.
+    """
+    settings = get_settings()
+    details = oci.resource_search.models.StructuredSearchDetails(
+        query=query,
+        type="Structured",
+        matching_context_type="NONE",
     )
 
+    on_retry = retry_callback(search_client, "search_resources")
+
+    page: Optional[str] = None
+    while True:
+        response = call_with_backoff(
+            search_client.search_resources,
+            details,
+            limit=_SEARCH_PAGE_LIMIT,
+            page=page,
+            max_retries=settings.OCI_SYNC_MAX_RETRIES,
+            base_delay=settings.OCI_SYNC_BACKOFF_BASE_SECONDS,
+            max_delay=settings.OCI_SYNC_BACKOFF_MAX_SECONDS,
+            on_retry=on_retry,
+        )
+        yield response.data.items
+
+        if not response.has_next_page:
+            break
+        page = response.next_page
+
+
+def _searched_instance(summary: Any) -> _SearchedInstance:
+    """Converte um ResourceSummary do Resource Search em :class:`_SearchedInstance`."""
+    details = getattr(summary, "additional_details", None) or {}
+    return _SearchedInstance(
+        id=summary.identifier,
+        compartment_id=summary.compartment_id,
+        display_name=summary.display_name,
+        availability_domain=summary.availability_domain,
+        lifecycle_state=summary.lifecycle_state,
+        shape=details.get("shape"),
+        image_id=details.get("imageId"),
+        freeform_tags=summary.freeform_tags,
+        defined_tags=summary.defined_tags,
+    )
+
+
+def _get_instance_in_worker(instance_ocid: str) -> Any:
+    settings = get_settings()
+    compute = _worker_state.compute
+    return call_with_backoff(
+        compute.get_instance,
+        instance_ocid,
+        max_retries=settings.OCI_SYNC_MAX_RETRIES,
+        base_delay=settings.OCI_SYNC_BACKOFF_BASE_SECONDS,
+        max_delay=settings.OCI_SYNC_BACKOFF_MAX_SECONDS,
+        on_retry=retry_callback(compute, "get_instance"),
+    ).data
+
+
+def _iter_instances_by_search(
+    clients: OCIClients,
+    compartment_ocids: List[str],
+    max_in_flight: int,
+) -> Iterator[Tuple[str, List[Any], bool]]:
+    """
+    Gera ``(compartment_ocid, instâncias, False)`` paginando o Resource Search
+    da região (um compartment pode aparecer em qualquer página, então o fim
+    de cada um só é conhecido no fim da busca).
+
+    Poucas chamadas cobrem a tenancy inteira (compartments vazios não custam
+    nada). Os campos que não vierem em ``additional_details`` (shape/imageId)
+    são hidratados com GetInstance, em paralelo e só para essas instâncias.
+    Instâncias de compartments fora de ``compartment_ocids`` são ignoradas,
+    como na fonte "list".
+    """
+    if clients.search is None:
+        raise ValueError("Fonte de inventário 'search' requer OCIClients.search")
+
+    wanted = set(compartment_ocids)
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_in_flight),
+        thread_name_prefix="oci-hydrate-instances",
+        initializer=_init_listing_worker,
+        initargs=(clients,),
+    ) as executor:
+        for page in _iter_search_pages(clients.search, _INSTANCE_SEARCH_QUERY):
+            instances = [
+                _searched_instance(summary)
+                for summary in page
+                if summary.compartment_id in wanted
+            ]
+
+            to_hydrate = [i for i in instances if i.shape is None or i.image_id is None]
+            if to_hydrate:
+                logger.debug("Hidratando %d instâncias via GetInstance", len(to_hydrate))
+                hydrated = executor.map(_get_instance_in_worker, [i.id for i in to_hydrate])
+                for inst, full in zip(to_hydrate, hydrated):
+                    inst.shape = full.shape
+                    inst.image_id = full.image_id
+
+            by_compartment: Dict[str, List[Any]] = {}
+            for inst in instances:
+                by_compartment.setdefault(inst.compartment_id, []).append(inst)
+
+            for comp_ocid, comp_instances in by_compartment.items():
+                yield comp_ocid, comp_instances, False
+
 
 def _fetch_compartment_tree(
     identity_client: oci.identity.IdentityClient,
@@ -392,3 +1398,330 @@ def _fetch_compartment_tree(
         result.append(node_copy)
 
     return result
+
+
+def _content_hash(values: Mapping[str, Any], fields: Iterable[str]) -> str:
+    """
+    Fingerprint (sha256 hex) dos campos sincronizados de uma linha.
+
+    Serialização JSON canônica (chaves ordenadas) para que tags com a mesma
+    informação sempre gerem o mesmo hash.
+    """
+    payload = json.dumps(
+        [values[name] for name in fields],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compartment_values(tenancy_ocid: str, node: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Converte um nó de :func:`_fetch_compartment_tree` no dict de colunas de
+    ``compartments`` (incluindo o content_hash).
+    """
+    values = {
+        "tenancy_ocid": tenancy_ocid,
+        "compartment_ocid": node["compartment_ocid"],
+        "name": node["name"],
+        "description": node.get("description"),
+        "parent_ocid": node.get("parent_ocid"),
+        "path": node["path"],
+        "is_tenancy_root": node["is_tenancy_root"],
+        "is_active": True,
+    }
+    values["content_hash"] = _content_hash(values, _COMPARTMENT_HASH_FIELDS)
+    return values
+
+
+def _instance_values(
+    inst: Any,
+    region: str,
+    compartment_id: Any,
+    compartment_path: str,
+) -> Dict[str, Any]:
+    """
+    Converte uma instância retornada pelo OCI no dict de colunas de ``instances``
+    (incluindo o content_hash).
+    """
+    values = {
+        "instance_ocid": inst.id,
+        "compartment_ocid": inst.compartment_id,
+        "compartment_id": compartment_id,
+        "display_name": inst.display_name,
+        "region": region,
+        "availability_domain": inst.availability_domain,
+        "lifecycle_state": inst.lifecycle_state,
+        "shape": inst.shape,
+        "hostname": getattr(inst, "hostname_label", None),
+        "image_ocid": getattr(inst, "image_id", None),
+        # tags
+        "freeform_tags": getattr(inst, "freeform_tags", None),
+        "defined_tags": getattr(inst, "defined_tags", None),
+        # cache de path do compartment para facilitar filtros
+        "compartment_path_cache": compartment_path,
+        "is_active": True,
+    }
+    values["content_hash"] = _content_hash(values, _INSTANCE_HASH_FIELDS)
+    return values
+
+
+# ============================================================
+# Persistência set-based (PostgreSQL)
+# ============================================================
+
+def _upsert_rows(
+    db: Session,
+    table: Any,
+    conflict_column: str,
+    rows: List[Dict[str, Any]],
+    counts: SyncCounts,
+    track_column: Optional[str] = None,
+) -> None:
+    """
+    INSERT ... ON CONFLICT (conflict_column) DO UPDATE para um lote de linhas.
+
+    Todas as colunas presentes nos dicts (exceto a de conflito) são atualizadas
+    a partir de EXCLUDED; updated_at é ajustado explicitamente, já que o
+    ``onupdate`` do modelo não vale para o ON CONFLICT.
+
+    O DO UPDATE só acontece quando o content_hash mudou (ou a linha estava
+    inativa). O RETURNING devolve apenas linhas inseridas/atualizadas e
+    ``xmax = 0`` distingue INSERT de UPDATE; o restante do lote é contado
+    como inalterado.
+
+    Com ``track_column``, o RETURNING traz também o valor novo e o anterior
+    dessa coluna (a subconsulta enxerga o snapshot de antes do statement)
+    para as linhas escritas, acumulados em ``counts.touched_compartments``.
+    """
+    if not rows:
+        return
+
+    stmt = pg_insert(table)
+    set_ = {
+        name: stmt.excluded[name]
+        for name in rows[0].keys()
+        if name != conflict_column
+    }
+    set_["updated_at"] = func.now()
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[conflict_column]],
+        set_=set_,
+        where=or_(
+            table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+            table.c.is_active.is_(False),
+        ),
+    )
+
+    if track_column is None:
+        stmt = stmt.returning(literal_column("(xmax = 0)"))
+        written = db.execute(stmt, rows).scalars().all()
+    else:
+        previous = table.alias("previous")
+        # O SQLAlchemy não correlaciona subconsultas no RETURNING de um INSERT;
+        # a linha alvo é referenciada pelo nome da tabela
+        old_value = (
+            select(previous.c[track_column])
+            .where(previous.c[conflict_column] == literal_column(f"{table.name}.{conflict_column}"))
+            .scalar_subquery()
+        )
+        stmt = stmt.returning(literal_column("(xmax = 0)"), table.c[track_column], old_value)
+        written = []
+        for was_inserted, new_value, old in db.execute(stmt, rows).all():
+            written.append(was_inserted)
+            counts.touched_compartments.update(v for v in (new_value, old) if v is not None)
+
+    inserted = sum(1 for was_inserted in written if was_inserted)
+
+    counts.inserted += inserted
+    counts.changed += len(written) - inserted
+    counts.unchanged += len(rows) - len(written)
+
+
+def _upsert_compartment_rows(db: Session, rows: List[Dict[str, Any]], counts: SyncCounts) -> None:
+    _upsert_rows(db, Compartment.__table__, "compartment_ocid", rows, counts)
+
+
+def _upsert_instance_rows(db: Session, rows: List[Dict[str, Any]], counts: SyncCounts) -> None:
+    _upsert_rows(db, Instance.__table__, "instance_ocid", rows, counts, track_column="compartment_id")
+
+
+def _resolve_compartment_parents(db: Session, tenancy_ocid: str) -> None:
+    """
+    Ajusta parent_id de todos os compartments da tenancy a partir de parent_ocid
+    em um único UPDATE (só toca as linhas cujo parent_id realmente mudou).
+    """
+    compartments = Compartment.__table__
+    parent = compartments.alias("parent")
+
+    parent_id = (
+        select(parent.c.id)
+        .where(parent.c.compartment_ocid == compartments.c.parent_ocid)
+        .scalar_subquery()
+    )
+
+    db.execute(
+        update(compartments)
+        .where(
+            compartments.c.tenancy_ocid == tenancy_ocid,
+            compartments.c.parent_id.is_distinct_from(parent_id),
+        )
+        .values(parent_id=parent_id)
+    )
+
+
+def _refresh_instance_path_caches(
+    db: Session,
+    tenancy_ocid: str,
+    touched_compartments: Optional[Set[Any]] = None,
+) -> int:
+    """
+    Alinha ``instances.compartment_path_cache`` com o path atual do compartment
+    de cada instância, em um único UPDATE ... FROM.
+
+    Quando um compartment é renomeado ou movido, os paths de toda a subárvore
+    mudam (o sync recalcula a árvore inteira); este UPDATE leva a mudança para
+    as instâncias de todos esses compartments de uma vez, tocando só as linhas
+    cujo cache está desatualizado.
+
+    :param touched_compartments: se informado, recebe o compartment_id das instâncias atualizadas
+    :return: quantidade de instâncias atualizadas
+    """
+    instances = Instance.__table__
+    compartments = Compartment.__table__
+
+    compartment_ids = db.scalars(
+        update(instances)
+        .where(
+            instances.c.compartment_id == compartments.c.id,
+            compartments.c.tenancy_ocid == tenancy_ocid,
+            instances.c.compartment_path_cache.is_distinct_from(compartments.c.path),
+        )
+        .values(compartment_path_cache=compartments.c.path, updated_at=func.now())
+        .returning(instances.c.compartment_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if compartment_ids:
+        logger.info(
+            "Cache de path atualizado em %d instâncias (compartments renomeados/movidos)",
+            len(compartment_ids),
+        )
+    if touched_compartments is not None:
+        touched_compartments.update(compartment_ids)
+    return len(compartment_ids)
+
+
+def _deactivate_missing_compartments(
+    db: Session,
+    tenancy_ocid: str,
+    remote_ocids: Iterable[str],
+) -> int:
+    """Marca como inativos, em um único UPDATE, os compartments ausentes no OCI."""
+    compartments = Compartment.__table__
+    result = db.execute(
+        update(compartments)
+        .where(
+            compartments.c.tenancy_ocid == tenancy_ocid,
+            compartments.c.is_active.is_(True),
+            not_(compartments.c.compartment_ocid == any_(_ocid_array(remote_ocids))),
+        )
+        .values(is_active=False, updated_at=func.now())
+    )
+    return result.rowcount
+
+
+def _deactivate_missing_instances(
+    db: Session,
+    region: str,
+    remote_ocids: Iterable[str],
+    touched_compartments: Optional[Set[Any]] = None,
+) -> int:
+    """
+    Marca como inativas, em um único UPDATE, as instâncias da região ausentes no OCI.
+
+    :param touched_compartments: se informado, recebe o compartment_id das instâncias desativadas
+    """
+    instances = Instance.__table__
+    result = db.execute(
+        update(instances)
+        .where(
+            instances.c.region == region,
+            instances.c.is_active.is_(True),
+            not_(instances.c.instance_ocid == any_(_ocid_array(remote_ocids))),
+        )
+        .values(is_active=False, updated_at=func.now())
+        .returning(instances.c.compartment_id)
+    )
+    compartment_ids = result.scalars().all()
+    if touched_compartments is not None:
+        touched_compartments.update(compartment_ids)
+    return len(compartment_ids)
+
+
+def _ocid_array(ocids: Iterable[str]) -> Any:
+    """Bind de um array text[] (um único parâmetro, independente do tamanho da lista)."""
+    return bindparam(None, list(ocids), type_=ARRAY(String))
+
+
+def _iter_instances_by_region(
+    region_clients: Mapping[str, OCIClients],
+    compartment_ocids: List[str],
+    max_in_flight: int,
+    source: str,
+) -> Iterator[_RegionBatch]:
+    """
+    Lista as instâncias de todas as regiões em paralelo (uma thread por região,
+    cada uma com seu próprio pool de ``max_in_flight`` compartments).
+
+    Os resultados chegam à thread chamadora por uma fila limitada, na ordem em
+    que ficam prontos. Cada região termina com um item ``done=True``; se a
+    listagem falhar, o erro vai nesse item e as demais regiões seguem normalmente.
+    """
+    results: "queue.Queue[_RegionBatch]" = queue.Queue(
+        maxsize=max(1, len(region_clients) * max_in_flight)
+    )
+    # Sinaliza os produtores para pararem se o consumidor desistir (ex: erro no banco)
+    stop = threading.Event()
+
+    def put(item: _RegionBatch) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(region: str, clients: OCIClients) -> None:
+        try:
+            for comp_ocid, instances, last_page in _iter_remote_instances(
+                clients, compartment_ocids, max_in_flight, source
+            ):
+                if not put(_RegionBatch(region, comp_ocid, instances, last_page=last_page)):
+                    return
+        except Exception as exc:  # noqa: BLE001 - erro é repassado ao consumidor
+            put(_RegionBatch(region, done=True, error=exc))
+            return
+        put(_RegionBatch(region, done=True))
+
+    if not region_clients:
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=len(region_clients),
+        thread_name_prefix="oci-sync-region",
+    ) as executor:
+        for region, clients in region_clients.items():
+            executor.submit(produce, region, clients)
+
+        try:
+            pending = len(region_clients)
+            while pending:
+                item = results.get()
+                if item.done:
+                    pending -= 1
+                yield item
+        finally:
+            stop.set()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+import oci
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status HTTP que indicam throttling do OCI (TooManyRequests)
+THROTTLE_STATUS = 429
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Retorna True se a exceção for um 429 (throttling) do OCI."""
+    return isinstance(exc, oci.exceptions.ServiceError) and exc.status == THROTTLE_STATUS
+
+
+def is_server_error(exc: BaseException) -> bool:
+    """Retorna True se a exceção for um erro 5xx do OCI."""
+    return isinstance(exc, oci.exceptions.ServiceError) and 500 <= exc.status < 600
+
+
+def call_with_backoff(
+    fn: Callable[..., T],
+    *args: Any,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    retry_server_errors: bool = False,
+    on_retry: Optional[Callable[[int, BaseException], None]] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Executa ``fn(*args, **kwargs)`` repetindo a chamada quando o OCI devolve 429
+    (e, opcionalmente, 5xx).
+
+    Usa backoff exponencial com jitter completo (delay aleatório entre 0 e
+    ``min(max_delay, base_delay * 2 ** tentativa)``). Qualquer outro erro é
+    propagado imediatamente.
+
+    :param fn: função a ser chamada (ex: list_call_get_all_results)
+    :param max_retries: número máximo de novas tentativas após a primeira
+    :param base_delay: delay base em segundos
+    :param max_delay: teto do delay em segundos
+    :param retry_server_errors: se True, também repete em erros 5xx
+    :param on_retry: callback chamado antes de cada nova tentativa
+                     com (número da tentativa, exceção)
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except oci.exceptions.ServiceError as exc:
+            retryable = is_throttle_error(exc) or (retry_server_errors and is_server_error(exc))
+            if not retryable or attempt >= max_retries:
+                raise
+
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            attempt += 1
+            logger.warning(
+                "OCI retornou %s (tentativa %d/%d). Aguardando %.2fs antes de repetir.",
+                exc.status,
+                attempt,
+                max_retries,
+                delay,
+            )
+            if on_retry is not None:
+                on_retry(attempt, exc)
+            time.sleep(delay)
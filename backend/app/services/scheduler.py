@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.instance import Instance
+from ..models.instance_effective_schedule import InstanceEffectiveSchedule
+
+logger = logging.getLogger(__name__)
+
+# Nomes dos dias da semana no formato do APScheduler, indexados pelo número
+# do cron padrão (0 = domingo ... 6 = sábado; 7 também é domingo)
+_CRON_DAY_NAMES = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+
+@dataclass
+class DueAction:
+    """Ação de lifecycle que venceu em um tick do scheduler."""
+    instance_id: UUID
+    action: str  # "START" ou "STOP"
+    scheduled_at: datetime
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def compute_next_fire_time(
+    cron_expr: Optional[str],
+    tz_name: str,
+    after: datetime,
+) -> Optional[datetime]:
+    """
+    Próximo disparo (UTC) de uma expressão CRON estritamente depois de ``after``.
+
+    :param cron_expr: expressão CRON padrão de 5 campos (ex: "0 8 * * 1-5")
+    :param tz_name: timezone IANA em que a expressão é avaliada
+    :param after: instante de referência (timezone-aware)
+    :return: datetime UTC do próximo disparo, ou None se não houver expressão
+    :raises ValueError: se a expressão ou a timezone forem inválidas
+    """
+    if not cron_expr:
+        return None
+
+    trigger = _crontab_trigger(cron_expr, tz_name)
+    # O APScheduler arredonda ``now`` para cima até o segundo inteiro e aceita
+    # um disparo igual a ele: trunca antes de somar 1s, senão um ``after`` com
+    # fração (07:59:59.5) pularia o disparo das 08:00:00
+    next_fire = trigger.get_next_fire_time(
+        None, after.replace(microsecond=0) + timedelta(seconds=1)
+    )
+    return next_fire.astimezone(timezone.utc) if next_fire else None
+
+
+def next_fire_times(
+    managed: bool,
+    start_cron: Optional[str],
+    stop_cron: Optional[str],
+    start_tz_name: Optional[str],
+    stop_tz_name: Optional[str],
+    now: Optional[datetime] = None,
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Próximos start/stop (UTC) de um agendamento.
+
+    Cada CRON é avaliado no seu timezone (no agendamento efetivo, o start e o
+    stop podem vir de origens diferentes). Agendamentos não gerenciados
+    (managed=False) ficam sem próximos disparos, o que os mantém fora do
+    índice parcial consultado pelo tick.
+
+    :return: ``(next_start_at, next_stop_at)``
+    :raises ValueError: se uma das expressões CRON ou a timezone forem inválidas
+    """
+    if not managed:
+        return None, None
+
+    now = now or _utcnow()
+    return (
+        compute_next_fire_time(start_cron, start_tz_name or "UTC", now),
+        compute_next_fire_time(stop_cron, stop_tz_name or "UTC", now),
+    )
+
+
+def validate_schedule(
+    start_cron: Optional[str],
+    stop_cron: Optional[str],
+    tz_name: Optional[str],
+) -> None:
+    """
+    Valida CRONs e timezone de uma configuração ou política antes de gravar.
+
+    :raises ValueError: se uma das expressões CRON ou a timezone forem inválidas
+    """
+    tz_name = tz_name or "UTC"
+    try:
+        ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Timezone inválida: {tz_name!r}") from exc
+    next_fire_times(True, start_cron, stop_cron, tz_name, tz_name)
+
+
+def run_scheduler_tick(db: Session, now: Optional[datetime] = None) -> List[DueAction]:
+    """
+    Executa um tick do scheduler.
+
+    - Uma única consulta (range nos índices parciais de next_start_at/next_stop_at
+      de ``instance_effective_schedules``) traz os agendamentos efetivos (da
+      própria instância ou herdados do compartment) com algum disparo
+      vencido, travados com
+      ``FOR UPDATE SKIP LOCKED`` para que dois ticks concorrentes não peguem
+      a mesma linha.
+    - Para cada disparo vencido gera uma :class:`DueAction` e recalcula o próximo
+      disparo só dessa coluna.
+    - Disparos atrasados além de ``Settings.SCHEDULER_MISFIRE_GRACE_SECONDS`` são
+      descartados (apenas reagendados), para não ligar/desligar instâncias
+      horas depois do horário configurado.
+
+    Não faz commit. O commit/rollback é responsabilidade de quem chamou.
+
+    :param db: sessão SQLAlchemy
+    :param now: instante do tick (default: agora, UTC)
+    :return: ações vencidas, ordenadas pelo horário agendado
+    """
+    now = now or _utcnow()
+    grace = timedelta(seconds=get_settings().SCHEDULER_MISFIRE_GRACE_SECONDS)
+
+    due_schedules: List[InstanceEffectiveSchedule] = (
+        db.query(InstanceEffectiveSchedule)
+        .join(Instance, Instance.id == InstanceEffectiveSchedule.instance_id)
+        .filter(
+            InstanceEffectiveSchedule.managed.is_(True),
+            Instance.is_active.is_(True),
+            or_(
+                InstanceEffectiveSchedule.next_start_at <= now,
+                InstanceEffectiveSchedule.next_stop_at <= now,
+            ),
+        )
+        .with_for_update(of=InstanceEffectiveSchedule, skip_locked=True)
+        .all()
+    )
+
+    actions: List[DueAction] = []
+    missed = 0
+
+    for schedule in due_schedules:
+        for action, column, cron_expr, tz_name in (
+            ("START", "next_start_at", schedule.default_start_cron, schedule.start_timezone),
+            ("STOP", "next_stop_at", schedule.default_stop_cron, schedule.stop_timezone),
+        ):
+            scheduled_at = getattr(schedule, column)
+            if scheduled_at is None or scheduled_at > now:
+                continue
+
+            if now - scheduled_at <= grace:
+                actions.append(DueAction(schedule.instance_id, action, scheduled_at))
+            else:
+                missed += 1
+                logger.warning(
+                    "Disparo %s da instância %s agendado para %s perdido (atraso maior que %s)",
+                    action,
+                    schedule.instance_id,
+                    scheduled_at.isoformat(),
+                    grace,
+                )
+
+            try:
+                setattr(
+                    schedule, column, compute_next_fire_time(cron_expr, tz_name or "UTC", now)
+                )
+            except ValueError:
+                # Expressão inválida gravada antes da validação: desliga o disparo
+                logger.exception(
+                    "CRON inválido no agendamento da instância %s; desativando %s",
+                    schedule.instance_id,
+                    column,
+                )
+                setattr(schedule, column, None)
+
+    db.flush()
+
+    actions.sort(key=lambda a: a.scheduled_at)
+    logger.info(
+        "Tick do scheduler: %d agendamentos vencidos, %d ações, %d disparos perdidos",
+        len(due_schedules),
+        len(actions),
+        missed,
+    )
+    return actions
+
+
+def recompute_all_next_fire_times(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Recalcula os próximos disparos de todos os agendamentos efetivos.
+
+    Usado depois de uma parada longa do scheduler (disparos vencidos há mais
+    que a tolerância seriam só descartados, um a um, pelo tick). Não faz
+    commit.
+
+    :return: quantidade de agendamentos recalculados
+    """
+    now = now or _utcnow()
+    count = 0
+
+    for row in db.query(InstanceEffectiveSchedule).yield_per(1000):
+        try:
+            row.next_start_at, row.next_stop_at = next_fire_times(
+                row.managed,
+                row.default_start_cron,
+                row.default_stop_cron,
+                row.start_timezone,
+                row.stop_timezone,
+                now,
+            )
+        except ValueError:
+            logger.exception(
+                "CRON/timezone inválido no agendamento da instância %s; ignorando",
+                row.instance_id,
+            )
+            row.next_start_at = None
+            row.next_stop_at = None
+        count += 1
+
+    db.flush()
+    return count
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _crontab_trigger(cron_expr: str, tz_name: str) -> Any:
+    """
+    Cria o CronTrigger do APScheduler para uma expressão CRON padrão.
+
+    O APScheduler numera os dias da semana a partir de segunda (0 = mon), ao
+    contrário do cron padrão (0 = domingo); por isso o campo de dia da semana
+    é convertido para nomes antes de criar o trigger.
+    """
+    fields = cron_expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"Expressão CRON deve ter 5 campos: {cron_expr!r}")
+
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Timezone inválida: {tz_name!r}") from exc
+
+    minute, hour, day, month, day_of_week = fields
+    return CronTrigger(
+        minute=minute,
+        hour=hour,
+        day=day,
+        month=month,
+        day_of_week=_cron_day_of_week(day_of_week),
+        timezone=tz,
+    )
+
+
+def _cron_day_of_week(field: str) -> str:
+    """
+    Converte o campo numérico de dia da semana do cron (0/7 = domingo) para a
+    lista de nomes aceita pelo APScheduler. Campos com nomes ou "*" passam
+    sem alteração.
+    """
+    if field == "*" or any(ch.isalpha() for ch in field):
+        return field
+
+    days = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+
+        if part == "*":
+            start, end = 0, 6
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = end = int(part)
+
+        if not (0 <= start <= 7 and 0 <= end <= 7) or start > end:
+            raise ValueError(f"Dia da semana inválido no CRON: {field!r}")
+
+        days.update(d % 7 for d in range(start, end + 1, step))
+
+    return ",".join(_CRON_DAY_NAMES[d] for d in sorted(days))
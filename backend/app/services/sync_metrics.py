@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..core.metrics import HTTP_LATENCY_BUCKETS, SYNC_PHASE_BUCKETS
+from .oci_inventory_sync import SyncCounts, SyncReport
+
+# Métricas do sync de inventário (registry do processo que roda o sync:
+# comando "sync-oci-inventory" ou "scheduler --metrics-port"). A idade do
+# último sync concluído não fica aqui: a API a calcula a partir de sync_runs
+# (ver app/api/metrics.py), valendo para qualquer processo que rodou o sync.
+SYNC_RUNS = Counter(
+    "stopstart_sync_runs",
+    "Syncs de inventário executados, por resultado.",
+    ["status"],
+)
+SYNC_PHASE_SECONDS = Histogram(
+    "stopstart_sync_phase_duration_seconds",
+    "Duração de cada fase do sync de inventário (total = sync inteiro).",
+    ["phase"],
+    buckets=SYNC_PHASE_BUCKETS,
+)
+SYNC_ROWS = Counter(
+    "stopstart_sync_rows",
+    "Linhas processadas pelo sync, por tabela e resultado.",
+    ["table", "result"],
+)
+SYNC_BATCH_SECONDS = Histogram(
+    "stopstart_sync_batch_flush_duration_seconds",
+    "Tempo gravando cada lote de instâncias (statements, flush e expunge).",
+    ["region"],
+    buckets=HTTP_LATENCY_BUCKETS,
+)
+SYNC_BATCH_RSS = Gauge(
+    "stopstart_sync_batch_rss_bytes",
+    "Maior RSS do processo medido ao fim de um lote no último sync.",
+    multiprocess_mode="mostrecent",
+)
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def record_sync_success(report: SyncReport) -> None:
+    """Registra as durações por fase e as linhas do sync. Chamar depois do commit."""
+    SYNC_RUNS.labels("success").inc()
+    for phase, seconds in report.phase_seconds.items():
+        SYNC_PHASE_SECONDS.labels(phase).observe(seconds)
+
+    _record_rows("compartments", report.compartments)
+    _record_rows("instances", report.instances)
+    for batch in report.instances.batches:
+        SYNC_BATCH_SECONDS.labels(batch.region).observe(batch.seconds)
+    if report.instances.batches:
+        SYNC_BATCH_RSS.set(max(batch.rss_bytes for batch in report.instances.batches))
+
+
+def record_sync_failure() -> None:
+    """Conta um sync que falhou (rollback)."""
+    SYNC_RUNS.labels("failure").inc()
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _record_rows(table: str, counts: SyncCounts) -> None:
+    for result in ("inserted", "changed", "unchanged", "deactivated", "failed"):
+        SYNC_ROWS.labels(table, result).inc(getattr(counts, result))
+
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import base64
+import dataclasses
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.sync_run import STATUS_FAILED, STATUS_RUNNING, STATUS_SUCCESS, SyncRun
+from .inventory_generation import bump_inventory_generation
+from .oci_inventory_sync import SyncCounts, SyncReport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Tamanho máximo do texto de erro gravado
+_MAX_ERROR_LENGTH = 4000
+
+# Erro gravado nas execuções abandonadas (ver OCI_SYNC_RUN_STALE_SECONDS)
+_STALE_RUN_ERROR = "Execução abandonada: o processo terminou sem finalizar o sync"
+
+
+@dataclass
+class SyncRunPage:
+    items: List[SyncRun] = field(default_factory=list)
+    # Cursor opaco para a próxima página (None = última página)
+    next_cursor: Optional[str] = None
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def start_sync_run(
+    db: Session,
+    trigger: str,
+    tenancy_ocid: Optional[str] = None,
+    region: Optional[str] = None,
+) -> SyncRun:
+    """
+    Registra o início de um sync (status running).
+
+    Antes, fecha como failed as execuções presas em running há mais de
+    ``OCI_SYNC_RUN_STALE_SECONDS`` (processo que morreu no meio do sync).
+
+    Não faz commit; quem chama deve commitar antes de começar o sync, para a
+    linha sobreviver a um rollback do sync.
+    """
+    now = datetime.now(timezone.utc)
+    _fail_stale_runs(db, now)
+
+    run = SyncRun(
+        tenancy_ocid=tenancy_ocid,
+        region=region,
+        trigger=trigger,
+        status=STATUS_RUNNING,
+        started_at=now,
+    )
+    db.add(run)
+    db.flush()
+    return run
+
+
+def finish_sync_run(
+    db: Session,
+    run_id: UUID,
+    report: Optional[SyncReport] = None,
+    error: Optional[BaseException] = None,
+) -> Optional[SyncRun]:
+    """
+    Fecha a execução: success com os dados do ``report`` ou failed com ``error``.
+
+    Na falha, ``report`` pode ser o relatório parcial do sync (fases
+    concluídas, tempo total, chamadas OCI), gravado junto com o erro; a
+    geração gravada é ``report.generation`` como quem chamou a deixou depois
+    do rollback (ver :func:`publish_failed_sync_generation`).
+
+    Não faz commit. No sucesso, chamar antes do commit do sync (a execução só
+    aparece como concluída junto com os dados); na falha, depois do rollback.
+
+    :return: a execução atualizada (None se ``run_id`` não existir)
+    """
+    run = db.get(SyncRun, run_id)
+    if run is None:
+        logger.warning("Execução de sync %s não encontrada ao finalizar", run_id)
+        return None
+
+    run.finished_at = datetime.now(timezone.utc)
+    run.duration_seconds = (run.finished_at - run.started_at).total_seconds()
+
+    if report is not None:
+        run.tenancy_ocid = report.tenancy_ocid or run.tenancy_ocid
+        run.phase_seconds = {phase: round(seconds, 3) for phase, seconds in report.phase_seconds.items()}
+        run.row_counts = {
+            "compartments": _counts_dict(report.compartments),
+            "instances": _counts_dict(report.instances),
+            "regions": {region: _counts_dict(counts) for region, counts in report.regions.items()},
+            # Lotes gravados: quantidade, tempo de flush e pico de memória
+            "batches": report.instances.batch_summary(),
+        }
+        run.oci_calls = {
+            name: {
+                key: value
+                for key, value in dataclasses.asdict(stats).items()
+                if key not in ("service", "operation")
+            }
+            for name, stats in report.oci_calls.items()
+        }
+        run.failed_regions = dict(report.failed_regions) or None
+        run.generation = report.generation
+
+    if error is not None:
+        run.status = STATUS_FAILED
+        run.error = f"{type(error).__name__}: {error}"[:_MAX_ERROR_LENGTH]
+    else:
+        run.status = STATUS_SUCCESS
+
+    db.flush()
+    return run
+
+
+def publish_failed_sync_generation(db: Session, report: SyncReport) -> Optional[int]:
+    """
+    Depois do rollback de um sync que falhou, acerta ``report.generation``
+    com o que de fato ficou no banco.
+
+    - Modo "run": nada foi commitado; a geração incrementada no fim do sync
+      (se chegou lá) foi desfeita, então fica None.
+    - Modo "compartment": os compartments commitados antes da falha ficam;
+      a geração é incrementada aqui (uma vez) para as APIs passarem a vê-los.
+      Pode sobrar um incremento sem mudanças, se a falha veio antes do
+      primeiro commit: só invalida os caches uma vez a mais.
+
+    Não faz commit.
+
+    :return: a geração publicada (None se nada foi commitado)
+    """
+    report.generation = None
+    if report.commit_mode == "compartment" and report.tenancy_ocid:
+        report.generation = bump_inventory_generation(db, report.tenancy_ocid)
+    return report.generation
+
+
+def list_sync_runs_page(
+    db: Session,
+    tenancy_ocid: Optional[str] = None,
+    status: Optional[str] = None,
+    trigger: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> SyncRunPage:
+    """
+    Uma página de execuções, mais novas primeiro (``started_at`` desc, ``id`` desc).
+
+    Paginação por keyset sobre os índices ``(tenancy_ocid, started_at, id)`` e
+    ``(started_at, id)``.
+
+    :param limit: tamanho da página (limitado a MAX_PAGE_SIZE)
+    :param cursor: ``next_cursor`` da página anterior
+    :raises ValueError: se o cursor for inválido
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    stmt = (
+        select(SyncRun)
+        .order_by(SyncRun.started_at.desc(), SyncRun.id.desc())
+        .limit(limit + 1)
+    )
+    if tenancy_ocid is not None:
+        stmt = stmt.where(SyncRun.tenancy_ocid == tenancy_ocid)
+    if status is not None:
+        stmt = stmt.where(SyncRun.status == status)
+    if trigger is not None:
+        stmt = stmt.where(SyncRun.trigger == trigger)
+    if cursor:
+        last_started_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(SyncRun.started_at, SyncRun.id) < tuple_(last_started_at, last_id))
+
+    rows = db.scalars(stmt).all()
+    page = SyncRunPage(items=list(rows[:limit]))
+    if len(rows) > limit:
+        last = page.items[-1]
+        page.next_cursor = encode_cursor(last.started_at, last.id)
+    return page
+
+
+def get_last_successful_sync(db: Session, tenancy_ocid: str) -> Optional[SyncRun]:
+    """
+    Última execução concluída com sucesso da tenancy (None se nunca houve).
+
+    Ordenada pelo fim (``finished_at``), como :func:`get_last_success_times`:
+    com syncs sobrepostos, a última a terminar é a que gravou o inventário
+    atual, e a rota e o ``/metrics`` apontam para a mesma execução.
+    """
+    return db.scalars(
+        select(SyncRun)
+        .where(
+            SyncRun.tenancy_ocid == tenancy_ocid,
+            SyncRun.status == STATUS_SUCCESS,
+            SyncRun.finished_at.is_not(None),
+        )
+        .order_by(SyncRun.finished_at.desc(), SyncRun.id.desc())
+        .limit(1)
+    ).first()
+
+
+def get_last_success_times(db: Session) -> Dict[str, datetime]:
+    """
+    Fim da última execução com sucesso de cada tenancy (``{tenancy_ocid: finished_at}``).
+
+    Lido do banco, vale para syncs de qualquer processo (CLI, scheduler em
+    outro host); usado pela idade do último sync em ``/metrics``.
+    """
+    rows = db.execute(
+        select(SyncRun.tenancy_ocid, func.max(SyncRun.finished_at))
+        .where(
+            SyncRun.status == STATUS_SUCCESS,
+            SyncRun.tenancy_ocid.is_not(None),
+            SyncRun.finished_at.is_not(None),
+        )
+        .group_by(SyncRun.tenancy_ocid)
+    ).all()
+    return {tenancy_ocid: finished_at for tenancy_ocid, finished_at in rows}
+
+
+def encode_cursor(started_at: datetime, run_id: UUID) -> str:
+    """Cursor opaco (base64url de JSON) com a chave da última execução da página."""
+    raw = json.dumps([started_at.isoformat(), str(run_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    :raises ValueError: se o cursor não tiver sido gerado por :func:`encode_cursor`
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        started_at, run_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(started_at), UUID(run_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+
+# ============================================================
+# Helpers internos
+# ============================================================
+
+def _fail_stale_runs(db: Session, now: datetime) -> None:
+    cutoff = now - timedelta(seconds=get_settings().OCI_SYNC_RUN_STALE_SECONDS)
+    stale = db.execute(
+        update(SyncRun)
+        .where(SyncRun.status == STATUS_RUNNING, SyncRun.started_at < cutoff)
+        .values(status=STATUS_FAILED, finished_at=now, error=_STALE_RUN_ERROR)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if stale:
+        logger.warning("%d execuções de sync presas em running marcadas como failed", stale)
+
+
+def _counts_dict(counts: SyncCounts) -> Dict[str, Any]:
+    return {
+        "inserted": counts.inserted,
+        "changed": counts.changed,
+        "unchanged": counts.unchanged,
+        "deactivated": counts.deactivated,
+        "failed": counts.failed,
+    }
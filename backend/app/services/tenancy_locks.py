@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import zlib
+from typing import Any, Iterable, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.compartment import Compartment
+
+# Primeira chave do pg_advisory_xact_lock(int, int); diferente da usada pela
+# eleição de líder (leader_election), para os dois nunca colidirem
+_LOCK_NAMESPACE = zlib.crc32(b"stopstart-oci:tenancy") & 0x7FFFFFFF
+
+
+# ============================================================
+# Funções públicas (API do serviço)
+# ============================================================
+
+def tenancy_lock_key(tenancy_ocid: str) -> int:
+    """Segunda chave do advisory lock da tenancy (estável entre processos)."""
+    return zlib.crc32(tenancy_ocid.encode("utf-8")) & 0x7FFFFFFF
+
+
+def lock_tenancies(db: Session, tenancy_ocids: Iterable[str]) -> List[str]:
+    """
+    Serializa, por tenancy, os recálculos de dados derivados (agendamentos
+    efetivos e rollups) via ``pg_advisory_xact_lock``.
+
+    Duas transações que recontam a mesma tenancy (sync, API, executor) se
+    sobrepondo leriam o mesmo estado e a última a gravar desfaria a outra. O
+    lock é de transação: liberado no commit/rollback, sem unlock explícito, e
+    reentrante na mesma sessão. As tenancies são travadas em ordem, para duas
+    transações com várias tenancies não entrarem em deadlock.
+
+    Não faz commit.
+
+    :return: tenancies travadas, na ordem
+    """
+    ocids = sorted({ocid for ocid in tenancy_ocids if ocid})
+    for ocid in ocids:
+        db.execute(
+            select(func.pg_advisory_xact_lock(_LOCK_NAMESPACE, tenancy_lock_key(ocid)))
+        )
+    return ocids
+
+
+def lock_compartment_tenancies(db: Session, compartment_ids: Iterable[Any]) -> List[str]:
+    """
+    :func:`lock_tenancies` para as tenancies dos compartments informados.
+
+    :return: tenancies travadas, na ordem
+    """
+    ids = [cid for cid in compartment_ids if cid is not None]
+    if not ids:
+        return []
+    return lock_tenancies(
+        db,
+        db.scalars(
+            select(Compartment.tenancy_ocid).where(Compartment.id.in_(ids)).distinct()
+        ),
+    )
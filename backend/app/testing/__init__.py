@@ -0,0 +1 @@
+"""Ferramentas de teste e benchmark (não usadas pela API nem pelos workers)."""
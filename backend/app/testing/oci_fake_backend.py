@@ -0,0 +1,253 @@
+"""
+Backend OCI falso e local (sem rede), usado para comparar as fontes de
+inventário ("list" x "search") em velocidade e resultado.
+
+Os clients implementam apenas as operações usadas pelo sync e pelo executor
+de ações, devolvem os mesmos models do SDK (``oci.core.models.Instance``,
+``ResourceSummary`` etc.) e simulam a latência de rede com ``time.sleep``.
+
+Só para testes e benchmarks: fica fora de ``app.services`` e nunca é
+importado pela API.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import oci
+from oci.response import Response
+
+from ..services.oci_clients import OCIClients
+
+_INSTANCE_STATES = ("RUNNING", "RUNNING", "RUNNING", "STOPPED", "STOPPED", "TERMINATED")
+# Estado devolvido por instance_action, como no OCI (transição em andamento)
+_ACTION_STATES = {
+    "START": "STARTING",
+    "STOP": "STOPPING",
+    "SOFTSTOP": "STOPPING",
+    "RESET": "STOPPING",
+}
+_SHAPES = ("VM.Standard.E4.Flex", "VM.Standard3.Flex", "VM.Standard.A1.Flex", "BM.Standard2.52")
+
+
+@dataclass
+class FakeTenancy:
+    """Inventário sintético de uma tenancy (compartments + instâncias de uma região)."""
+    tenancy_ocid: str
+    name: str
+    region: str
+    compartments: List[oci.identity.models.Compartment] = field(default_factory=list)
+    instances: List[oci.core.models.Instance] = field(default_factory=list)
+
+
+def build_fake_tenancy(
+    num_compartments: int = 1500,
+    num_instances: int = 5000,
+    empty_ratio: float = 0.7,
+    region: str = "sa-saopaulo-1",
+    seed: int = 42,
+) -> FakeTenancy:
+    """
+    Gera uma tenancy sintética.
+
+    :param num_compartments: quantidade de compartments (além da raiz)
+    :param num_instances: quantidade de instâncias (inclui algumas TERMINATED)
+    :param empty_ratio: fração de compartments sem nenhuma instância
+    :param seed: semente do gerador aleatório (resultados reprodutíveis)
+    """
+    rnd = random.Random(seed)
+    tenancy_ocid = "ocid1.tenancy.oc1..fake"
+    tenancy = FakeTenancy(tenancy_ocid=tenancy_ocid, name="fake-tenancy", region=region)
+
+    compartment_ocids = [tenancy_ocid]
+    for i in range(num_compartments):
+        ocid = f"ocid1.compartment.oc1..fake{i:06d}"
+        tenancy.compartments.append(
+            oci.identity.models.Compartment(
+                id=ocid,
+                compartment_id=rnd.choice(compartment_ocids),
+                name=f"compartment-{i:06d}",
+                description=None,
+                lifecycle_state="ACTIVE",
+            )
+        )
+        compartment_ocids.append(ocid)
+
+    populated = [
+        ocid for ocid in compartment_ocids
+        if ocid == tenancy_ocid or rnd.random() >= empty_ratio
+    ]
+
+    for i in range(num_instances):
+        tenancy.instances.append(
+            oci.core.models.Instance(
+                id=f"ocid1.instance.oc1.{region}.fake{i:07d}",
+                compartment_id=rnd.choice(populated),
+                display_name=f"vm-{i:07d}",
+                availability_domain=f"AD-{rnd.randint(1, 3)}",
+                fault_domain=f"FAULT-DOMAIN-{rnd.randint(1, 3)}",
+                lifecycle_state=rnd.choice(_INSTANCE_STATES),
+                shape=rnd.choice(_SHAPES),
+                image_id=f"ocid1.image.oc1..fake{rnd.randint(1, 20):03d}",
+                region=region,
+                freeform_tags={"Schedule": rnd.choice(["office-hours", "24x7", "weekend-off"])},
+                defined_tags={"Ops": {"CostCenter": str(rnd.randint(100, 120))}},
+            )
+        )
+
+    return tenancy
+
+
+class _FakeClient:
+    """Base dos clients falsos: latência simulada, paginação e contagem de chamadas."""
+
+    def __init__(self, tenancy: FakeTenancy, latency: float):
+        self.tenancy = tenancy
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _respond(
+        self,
+        operation: str,
+        items: List[Any],
+        page: Optional[str],
+        limit: int,
+        wrap: Any = None,
+    ) -> Response:
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        start = int(page or 0)
+        chunk = items[start:start + limit]
+        next_page = str(start + limit) if start + limit < len(items) else None
+        headers = {"opc-next-page": next_page} if next_page else {}
+        data = wrap(chunk) if wrap is not None else chunk
+        return Response(200, headers, data, None)
+
+
+class FakeIdentityClient(_FakeClient):
+    def get_tenancy(self, tenancy_id: str, **kwargs: Any) -> Response:
+        tenancy = oci.identity.models.Tenancy(id=self.tenancy.tenancy_ocid, name=self.tenancy.name)
+        return self._respond("get_tenancy", [tenancy], None, 1, wrap=lambda chunk: chunk[0])
+
+    def list_compartments(
+        self,
+        compartment_id: str,
+        page: Optional[str] = None,
+        limit: int = 1000,
+        **kwargs: Any,
+    ) -> Response:
+        return self._respond("list_compartments", self.tenancy.compartments, page, limit)
+
+    def list_region_subscriptions(self, tenancy_id: str, **kwargs: Any) -> Response:
+        subscription = oci.identity.models.RegionSubscription(
+            region_name=self.tenancy.region,
+            status="READY",
+            is_home_region=True,
+        )
+        return self._respond("list_region_subscriptions", [subscription], None, 1)
+
+
+class FakeComputeClient(_FakeClient):
+    def __init__(self, tenancy: FakeTenancy, latency: float):
+        super().__init__(tenancy, latency)
+        self._by_compartment: Dict[str, List[Any]] = {}
+        self._by_id: Dict[str, Any] = {}
+        for inst in tenancy.instances:
+            self._by_compartment.setdefault(inst.compartment_id, []).append(inst)
+            self._by_id[inst.id] = inst
+
+    def list_instances(
+        self,
+        compartment_id: str,
+        page: Optional[str] = None,
+        limit: int = 100,
+        **kwargs: Any,
+    ) -> Response:
+        items = self._by_compartment.get(compartment_id, [])
+        return self._respond("list_instances", items, page, limit)
+
+    def get_instance(self, instance_id: str, **kwargs: Any) -> Response:
+        return self._respond(
+            "get_instance", [self._by_id[instance_id]], None, 1, wrap=lambda chunk: chunk[0]
+        )
+
+    def instance_action(self, instance_id: str, action: str, **kwargs: Any) -> Response:
+        inst = self._by_id[instance_id]
+        with self._lock:
+            inst.lifecycle_state = _ACTION_STATES[action]
+        return self._respond("instance_action", [inst], None, 1, wrap=lambda chunk: chunk[0])
+
+
+class FakeResourceSearchClient(_FakeClient):
+    """
+    Resource Search falso: devolve todas as instâncias da tenancy.
+
+    ``hydrate_ratio`` é a fração de resultados sem shape/imageId em
+    ``additional_details``, para exercitar a hidratação via GetInstance.
+    """
+
+    def __init__(self, tenancy: FakeTenancy, latency: float, hydrate_ratio: float = 0.0):
+        super().__init__(tenancy, latency)
+        rnd = random.Random(len(tenancy.instances))
+        self._summaries = []
+        for inst in tenancy.instances:
+            details: Dict[str, Any] = {}
+            if rnd.random() >= hydrate_ratio:
+                details = {"shape": inst.shape, "imageId": inst.image_id, "faultDomain": inst.fault_domain}
+            self._summaries.append(
+                oci.resource_search.models.ResourceSummary(
+                    resource_type="Instance",
+                    identifier=inst.id,
+                    compartment_id=inst.compartment_id,
+                    display_name=inst.display_name,
+                    availability_domain=inst.availability_domain,
+                    lifecycle_state=inst.lifecycle_state,
+                    freeform_tags=inst.freeform_tags,
+                    defined_tags=inst.defined_tags,
+                    additional_details=details,
+                )
+            )
+
+    def search_resources(
+        self,
+        search_details: Any,
+        page: Optional[str] = None,
+        limit: int = 100,
+        **kwargs: Any,
+    ) -> Response:
+        return self._respond(
+            "search_resources",
+            self._summaries,
+            page,
+            limit,
+            wrap=lambda chunk: oci.resource_search.models.ResourceSummaryCollection(items=chunk),
+        )
+
+
+def build_fake_clients(
+    tenancy: FakeTenancy,
+    latency: float = 0.02,
+    hydrate_ratio: float = 0.0,
+) -> OCIClients:
+    """
+    Monta um :class:`OCIClients` com os clients falsos (sem ``config``, então os
+    workers do sync reaproveitam os mesmos clients).
+
+    :param latency: latência simulada por chamada, em segundos
+    :param hydrate_ratio: fração de resultados de busca que exigem GetInstance
+    """
+    return OCIClients(
+        identity=FakeIdentityClient(tenancy, latency),
+        compute=FakeComputeClient(tenancy, latency),
+        tenancy_ocid=tenancy.tenancy_ocid,
+        region=tenancy.region,
+        search=FakeResourceSearchClient(tenancy, latency, hydrate_ratio),
+    )
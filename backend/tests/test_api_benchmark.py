@@ -0,0 +1,45 @@
+import pytest
+
+from app.services.api_benchmark import ROUTE_CONFIG, ROUTE_NAVIGATION, StackBenchmark, _route_of
+
+
+@pytest.mark.parametrize(
+    "size, pct, expected",
+    [(1, 99, 1), (2, 50, 1), (4, 75, 3), (5, 50, 3), (10, 50, 5), (10, 99, 10), (100, 99, 99)],
+)
+def test_percentile_is_nearest_rank(size, pct, expected):
+    result = StackBenchmark("sync", latencies=[float(v) for v in range(size, 0, -1)])
+
+    assert result.percentile(pct) == expected
+
+
+def test_percentile_per_route():
+    result = StackBenchmark(
+        "async",
+        latencies=[0.1, 0.2, 0.9],
+        route_latencies={ROUTE_NAVIGATION: [0.9], ROUTE_CONFIG: [0.1, 0.2]},
+    )
+
+    assert result.percentile(99, ROUTE_NAVIGATION) == 0.9
+    assert result.percentile(99, ROUTE_CONFIG) == 0.2
+    assert result.percentile(50) == 0.2
+
+
+def test_empty_result_reports_zero():
+    result = StackBenchmark("sync")
+
+    assert result.percentile(50) == 0.0
+    assert result.percentile(50, ROUTE_NAVIGATION) == 0.0
+    assert result.requests_per_second == 0.0
+
+
+@pytest.mark.parametrize(
+    "path, route",
+    [
+        ("/api/v1/tenancies/ocid1.tenancy.oc1..x/compartments/root", ROUTE_NAVIGATION),
+        ("/api/v1/tenancies/ocid1.tenancy.oc1..x/compartments/ocid1.compartment.oc1..y", ROUTE_NAVIGATION),
+        ("/api/v1/instances/3f1c2a9d-0000-4000-8000-000000000000/config", ROUTE_CONFIG),
+    ],
+)
+def test_route_of(path, route):
+    assert _route_of(path) == route
@@ -0,0 +1,35 @@
+import zlib
+from types import SimpleNamespace
+
+from app.services.compartment_rollups import _group_by_depth
+from app.services.tenancy_locks import tenancy_lock_key
+
+
+def _row(path):
+    return SimpleNamespace(id=path, path=path)
+
+
+# _group_by_depth
+
+def test_levels_go_from_the_deepest_to_the_root():
+    rows = [_row("/t"), _row("/t/a/b"), _row("/t/a"), _row("/t/c"), _row("/t/a/b/d")]
+
+    assert _group_by_depth(rows) == [["/t/a/b/d"], ["/t/a/b"], ["/t/a", "/t/c"], ["/t"]]
+
+
+def test_skipped_depths_do_not_produce_empty_levels():
+    assert _group_by_depth([_row("/t"), _row("/t/a/b/c")]) == [["/t/a/b/c"], ["/t"]]
+
+
+def test_no_rows_no_levels():
+    assert _group_by_depth([]) == []
+
+
+# tenancy_lock_key
+
+def test_tenancy_lock_key_is_stable_and_fits_int4():
+    ocid = "ocid1.tenancy.oc1..aaaaaaaa"
+
+    assert tenancy_lock_key(ocid) == zlib.crc32(ocid.encode("utf-8")) & 0x7FFFFFFF
+    assert 0 <= tenancy_lock_key(ocid) <= 2**31 - 1
+    assert tenancy_lock_key(ocid) != tenancy_lock_key(ocid + "b")
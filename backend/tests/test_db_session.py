@@ -0,0 +1,22 @@
+import pytest
+
+from app.db.session import async_database_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "postgresql+psycopg2://stopstart:s3cr%40t@db:5432/stopstart",
+            "postgresql+asyncpg://stopstart:s3cr%40t@db:5432/stopstart",
+        ),
+        ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        (
+            "postgresql+psycopg2://u:p@db/app?application_name=api",
+            "postgresql+asyncpg://u:p@db/app?application_name=api",
+        ),
+    ],
+)
+def test_async_database_url_only_swaps_the_driver(url, expected):
+    # A senha não pode sair mascarada ("***"): a URL é usada para conectar
+    assert async_database_url(url) == expected
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.models.instance_effective_schedule import SOURCE_COMPARTMENT, SOURCE_INSTANCE
+from app.services.effective_schedules import _next_fire_times, _resolve
+
+
+def _target(config=True, managed=False, start=None, stop=None, tz="UTC", protection=False):
+    return SimpleNamespace(
+        config_id=uuid4() if config else None,
+        managed=managed if config else None,
+        protection_flag=protection if config else None,
+        default_start_cron=start,
+        default_stop_cron=stop,
+        timezone=tz if config else None,
+    )
+
+
+def _policy(managed=True, start="0 8 * * 1-5", stop="0 20 * * 1-5", tz="America/Sao_Paulo"):
+    return SimpleNamespace(
+        compartment_id=uuid4(),
+        managed=managed,
+        default_start_cron=start,
+        default_stop_cron=stop,
+        timezone=tz,
+    )
+
+
+def test_config_without_cron_keeps_its_managed_false_under_managed_policy():
+    policy = _policy(managed=True)
+
+    row = _resolve(_target(managed=False), policy)
+
+    assert row["managed"] is False
+    assert row["source"] == SOURCE_COMPARTMENT
+    assert row["policy_compartment_id"] == policy.compartment_id
+    assert row["default_start_cron"] == policy.default_start_cron
+    assert row["default_stop_cron"] == policy.default_stop_cron
+    assert row["start_timezone"] == row["stop_timezone"] == policy.timezone
+
+
+def test_config_without_cron_keeps_its_managed_true_under_unmanaged_policy():
+    row = _resolve(_target(managed=True, protection=True), _policy(managed=False))
+
+    assert row["managed"] is True
+    assert row["protection_flag"] is True
+
+
+def test_config_inherits_only_the_empty_cron_with_the_policy_timezone():
+    policy = _policy(stop="0 19 * * 1-5", tz="America/Sao_Paulo")
+
+    row = _resolve(_target(managed=True, start="0 8 * * 1-5", tz="UTC"), policy)
+
+    assert row["source"] == SOURCE_INSTANCE
+    assert row["policy_compartment_id"] == policy.compartment_id
+    assert (row["default_start_cron"], row["start_timezone"]) == ("0 8 * * 1-5", "UTC")
+    assert (row["default_stop_cron"], row["stop_timezone"]) == ("0 19 * * 1-5", "America/Sao_Paulo")
+
+
+def test_inherited_cron_fires_in_the_policy_timezone():
+    row = _resolve(
+        _target(managed=True, start="0 8 * * 1-5", tz="UTC"),
+        _policy(stop="0 19 * * 1-5", tz="America/Sao_Paulo"),
+    )
+
+    # Quinta-feira, 15/10/2026, 12:00 UTC
+    start_at, stop_at = _next_fire_times(uuid4(), row, datetime(2026, 10, 15, 12, 0, tzinfo=timezone.utc))
+
+    assert start_at == datetime(2026, 10, 16, 8, 0, tzinfo=timezone.utc)
+    # 19:00 em São Paulo (UTC-3)
+    assert stop_at == datetime(2026, 10, 15, 22, 0, tzinfo=timezone.utc)
+
+
+def test_config_with_both_crons_ignores_policy():
+    row = _resolve(_target(managed=True, start="0 7 * * *", stop="0 19 * * *"), _policy(managed=False))
+
+    assert row["source"] == SOURCE_INSTANCE
+    assert row["policy_compartment_id"] is None
+    assert row["managed"] is True
+    assert (row["default_start_cron"], row["default_stop_cron"]) == ("0 7 * * *", "0 19 * * *")
+
+
+def test_policy_only():
+    policy = _policy(managed=True)
+
+    row = _resolve(_target(config=False), policy)
+
+    assert row["source"] == SOURCE_COMPARTMENT
+    assert row["managed"] is True
+    assert row["protection_flag"] is False
+
+
+def test_config_without_policy():
+    row = _resolve(_target(managed=True, tz="Europe/Lisbon"), None)
+
+    assert row["source"] == SOURCE_INSTANCE
+    assert row["policy_compartment_id"] is None
+    assert row["managed"] is True
+    assert row["default_start_cron"] is None
+    assert row["start_timezone"] == row["stop_timezone"] == "Europe/Lisbon"
+
+
+def test_no_config_no_policy():
+    assert _resolve(_target(config=False), None) is None
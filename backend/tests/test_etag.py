@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from starlette.requests import Request
+
+from app.api.etag import CACHE_CONTROL, etag_matches, make_etag, not_modified_response
+from app.api.v1.routes.compartments import _rollups_version
+from app.services.compartment_rollups import ROLLUP_COUNTERS
+
+ETAG = make_etag("navigation", "ocid1.tenancy.oc1..x", 7)
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode("latin-1"))]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+# make_etag
+
+def test_etag_is_a_quoted_strong_validator():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert len(ETAG) == 34
+    assert make_etag("navigation", "ocid1.tenancy.oc1..x", 7) == ETAG
+
+
+def test_etag_changes_with_any_part():
+    assert make_etag("navigation", "ocid1.tenancy.oc1..x", 8) != ETAG
+    assert make_etag("navigation", "ocid1.tenancy.oc1..y", 7) != ETAG
+
+
+def test_none_and_empty_parts_are_equivalent():
+    assert make_etag("a", None, "b") == make_etag("a", "", "b")
+
+
+# etag_matches
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        ETAG,
+        f"W/{ETAG}",
+        "*",
+        f'"outro", {ETAG}',
+        f'"outro",W/{ETAG}',
+        f"  {ETAG}  ",
+    ],
+)
+def test_matching_if_none_match(if_none_match):
+    assert etag_matches(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [None, "", '"outro"', ETAG.strip('"'), f"w/{ETAG}", f'"outro", W/"x"'],
+)
+def test_non_matching_if_none_match(if_none_match):
+    assert not etag_matches(if_none_match, ETAG)
+
+
+def test_weak_server_etag_matches_strong_client_tag():
+    assert etag_matches(ETAG, f"W/{ETAG}")
+
+
+# not_modified_response
+
+def test_not_modified_response_when_the_client_has_the_version():
+    response = not_modified_response(_request(f"W/{ETAG}"), ETAG)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+    assert response.headers["cache-control"] == CACHE_CONTROL
+    assert response.body == b""
+
+
+@pytest.mark.parametrize("if_none_match", [None, '"outro"'])
+def test_no_response_when_the_client_is_stale(if_none_match):
+    assert not_modified_response(_request(if_none_match), ETAG) is None
+
+
+# _rollups_version (parte dos rollups no ETag da navegação)
+
+def _rollup(**counts):
+    values = {f"{scope}_{name}": 0 for scope in ("direct", "subtree") for name in ROLLUP_COUNTERS}
+    values.update(counts)
+    return SimpleNamespace(**values)
+
+
+def test_rollups_version_follows_the_counters_not_the_row_timestamps():
+    child = SimpleNamespace(id=uuid4())
+    name = ROLLUP_COUNTERS[0]
+
+    before = _rollups_version([child], {child.id: _rollup()})
+
+    assert _rollups_version([child], {child.id: _rollup()}) == before
+    assert _rollups_version([child], {child.id: _rollup(**{f"subtree_{name}": 1})}) != before
+    assert _rollups_version([child], {child.id: _rollup(**{f"direct_{name}": 1})}) != before
+
+
+def test_rollups_version_distinguishes_missing_rollups_and_child_order():
+    first, second = SimpleNamespace(id=uuid4()), SimpleNamespace(id=uuid4())
+    rollups = {first.id: _rollup(), second.id: _rollup()}
+
+    assert _rollups_version([first, second], rollups) != _rollups_version([second, first], rollups)
+    assert _rollups_version([first, second], rollups) != _rollups_version(
+        [first, second], {first.id: rollups[first.id]}
+    )
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.instance_config_bulk import _merge_patch
+
+NOW = datetime(2026, 10, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def _config(**overrides):
+    values = dict(
+        managed=True,
+        protection_flag=False,
+        default_start_cron="0 8 * * 1-5",
+        default_stop_cron="0 20 * * 1-5",
+        timezone="America/Sao_Paulo",
+        notes="produção",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_new_config_starts_from_the_defaults():
+    values = _merge_patch(None, {"managed": True}, NOW)
+
+    assert values == {
+        "managed": True,
+        "protection_flag": False,
+        "default_start_cron": None,
+        "default_stop_cron": None,
+        "timezone": "UTC",
+        "notes": None,
+        "updated_at": NOW,
+    }
+
+
+def test_patch_keeps_the_fields_it_does_not_send():
+    values = _merge_patch(_config(), {"protection_flag": True}, NOW)
+
+    assert values["protection_flag"] is True
+    assert values["managed"] is True
+    assert values["default_start_cron"] == "0 8 * * 1-5"
+    assert values["timezone"] == "America/Sao_Paulo"
+    assert values["notes"] == "produção"
+
+
+def test_explicit_null_clears_a_nullable_field():
+    values = _merge_patch(_config(), {"notes": None, "default_stop_cron": None}, NOW)
+
+    assert values["notes"] is None
+    assert values["default_stop_cron"] is None
+
+
+@pytest.mark.parametrize("name", ["managed", "protection_flag", "timezone"])
+def test_explicit_null_on_a_required_field_is_rejected(name):
+    with pytest.raises(ValueError, match=f"{name} não pode ser nulo"):
+        _merge_patch(_config(), {name: None}, NOW)
+
+
+def test_unknown_field_is_ignored():
+    values = _merge_patch(_config(), {"display_name": "x", "notes": "ok"}, NOW)
+
+    assert "display_name" not in values
+    assert values["notes"] == "ok"
+
+
+@pytest.mark.parametrize(
+    "patch",
+    [
+        {"default_start_cron": "not a cron"},
+        {"default_stop_cron": "0 25 * * *"},
+        {"timezone": "Mars/Olympus"},
+    ],
+)
+def test_invalid_schedule_is_rejected(patch):
+    with pytest.raises(ValueError, match="Agendamento inválido"):
+        _merge_patch(_config(), patch, NOW)
+
+
+def test_new_config_is_validated_even_without_schedule_fields():
+    # Sem config, os defaults entram junto: a validação roda sempre
+    with pytest.raises(ValueError, match="Agendamento inválido"):
+        _merge_patch(None, {"default_start_cron": "* * *"}, NOW)
+
+
+def test_patch_without_schedule_fields_does_not_revalidate_the_stored_schedule():
+    # Configuração antiga gravada antes da validação: um patch de notes não
+    # deve ser recusado por causa dela
+    values = _merge_patch(_config(default_start_cron="lixo"), {"notes": "ok"}, NOW)
+
+    assert values["default_start_cron"] == "lixo"
+    assert values["notes"] == "ok"
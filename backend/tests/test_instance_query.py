@@ -0,0 +1,201 @@
+import base64
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.instance_query import (
+    TagPredicate,
+    compartment_subtree_criteria,
+    decode_cursor,
+    encode_cursor,
+    parse_tag_predicate,
+    subtree_criteria,
+    tag_criteria,
+    validate_tag_predicates,
+)
+
+
+def _raw_cursor(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+# encode_cursor / decode_cursor
+
+@pytest.mark.parametrize(
+    "display_name",
+    ["web-01", "", "nome com espaço", "ação/çedilha", "a" * 255, '"aspas" e \\barra'],
+)
+def test_cursor_round_trip(display_name):
+    instance_id = uuid4()
+
+    assert decode_cursor(encode_cursor(display_name, instance_id)) == (display_name, instance_id)
+
+
+def test_cursor_is_url_safe_without_padding():
+    # Tamanhos diferentes cobrem os três restos de padding do base64
+    for display_name in ("a", "ab", "abc", "ação>?>?"):
+        cursor = encode_cursor(display_name, uuid4())
+
+        assert "=" not in cursor
+        assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "não-é-base64!",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+        _raw_cursor({"display_name": "x"}),
+        _raw_cursor(["x"]),
+        _raw_cursor(["x", "y", "z"]),
+        _raw_cursor(["x", "não-é-uuid"]),
+        _raw_cursor(["x", None]),
+        _raw_cursor(42),
+    ],
+)
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        decode_cursor(cursor)
+
+
+# parse_tag_predicate
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("Env=prod", TagPredicate(key="Env", value="prod")),
+        ("Env", TagPredicate(key="Env")),
+        ("Env=", TagPredicate(key="Env", value="")),
+        ("Url=a=b=c", TagPredicate(key="Url", value="a=b=c")),
+        ("Team.Owner=ana", TagPredicate(key="Team.Owner", value="ana")),
+    ],
+)
+def test_parse_freeform_tag(raw, expected):
+    assert parse_tag_predicate(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("Ops.Env=prod", TagPredicate(key="Env", value="prod", namespace="Ops")),
+        ("Ops.Env", TagPredicate(key="Env", namespace="Ops")),
+        ("Ops.Url=a.b=c", TagPredicate(key="Url", value="a.b=c", namespace="Ops")),
+    ],
+)
+def test_parse_defined_tag(raw, expected):
+    assert parse_tag_predicate(raw, defined=True) == expected
+
+
+@pytest.mark.parametrize("raw", ["", "=prod"])
+def test_freeform_tag_without_key_is_rejected(raw):
+    with pytest.raises(ValueError, match="chave vazia"):
+        parse_tag_predicate(raw)
+
+
+@pytest.mark.parametrize("raw", ["Env=prod", ".Env=prod", "Env"])
+def test_defined_tag_without_namespace_is_rejected(raw):
+    with pytest.raises(ValueError, match="Namespace.Key"):
+        parse_tag_predicate(raw, defined=True)
+
+
+def test_defined_tag_without_key_is_rejected():
+    with pytest.raises(ValueError, match="chave vazia"):
+        parse_tag_predicate("Ops.=prod", defined=True)
+
+
+# validate_tag_predicates
+
+def test_no_tag_filter_is_valid():
+    validate_tag_predicates([])
+
+
+def test_key_only_filter_is_rejected():
+    with pytest.raises(ValueError, match="Key=Value"):
+        validate_tag_predicates([TagPredicate(key="Env"), TagPredicate(key="Env", namespace="Ops")])
+
+
+def test_key_predicate_is_accepted_next_to_a_valued_one():
+    validate_tag_predicates([TagPredicate(key="Env"), TagPredicate(key="Team", value="ops")])
+
+
+# tag_criteria
+
+def _compiled(criterion):
+    """(SQL com placeholders, valores dos parâmetros na ordem)."""
+    compiled = criterion.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+def test_valued_predicates_become_one_containment_per_column():
+    criteria = tag_criteria(
+        [
+            TagPredicate(key="Env", value="prod"),
+            TagPredicate(key="Team", value="ops"),
+            TagPredicate(key="CostCenter", value="42", namespace="Fin"),
+            TagPredicate(key="Owner", value="ana", namespace="Fin"),
+        ]
+    )
+
+    assert [_compiled(c) for c in criteria] == [
+        ("instances.defined_tags @> %(defined_tags_1)s", [{"Fin": {"CostCenter": "42", "Owner": "ana"}}]),
+        ("instances.freeform_tags @> %(freeform_tags_1)s", [{"Env": "prod", "Team": "ops"}]),
+    ]
+
+
+def test_key_only_predicates_are_residual_filters_after_the_containments():
+    criteria = tag_criteria(
+        [
+            TagPredicate(key="Env"),
+            TagPredicate(key="Owner", namespace="Fin"),
+            TagPredicate(key="Team", value="ops"),
+        ]
+    )
+
+    assert [_compiled(c) for c in criteria] == [
+        ("instances.freeform_tags @> %(freeform_tags_1)s", [{"Team": "ops"}]),
+        ("instances.freeform_tags ? %(freeform_tags_1)s", ["Env"]),
+        ("(instances.defined_tags -> %(defined_tags_1)s) ? %(param_1)s", ["Fin", "Owner"]),
+    ]
+
+
+def test_same_key_with_two_values_keeps_both_predicates():
+    criteria = tag_criteria(
+        [
+            TagPredicate(key="Env", value="prod"),
+            TagPredicate(key="Env", value="dev"),
+            TagPredicate(key="Env", value="prod", namespace="Ops"),
+            TagPredicate(key="Env", value="dev", namespace="Ops"),
+        ]
+    )
+
+    params = [_compiled(c)[1] for c in criteria]
+    assert sorted(map(repr, params)) == sorted(
+        map(repr, [[{"Env": "prod"}], [{"Env": "dev"}], [{"Ops": {"Env": "prod"}}], [{"Ops": {"Env": "dev"}}]])
+    )
+
+
+def test_repeated_predicate_is_not_duplicated():
+    criteria = tag_criteria([TagPredicate(key="Env", value="prod"), TagPredicate(key="Env", value="prod")])
+
+    assert [_compiled(c)[1] for c in criteria] == [[{"Env": "prod"}]]
+
+
+# subtree_criteria / compartment_subtree_criteria
+
+def test_subtree_is_the_path_itself_or_a_slash_prefix():
+    sql, params = _compiled(compartment_subtree_criteria("/t/app"))
+
+    assert sql == "compartments.path = %(path_1)s OR (compartments.path LIKE %(path_2)s || '%%' ESCAPE '/')"
+    # O "/" final evita casar /t/app2; o próprio "/" vira "//" por ser o escape
+    assert params == ["/t/app", "//t//app//"]
+
+
+def test_subtree_escapes_like_wildcards_in_compartment_names():
+    sql, params = _compiled(subtree_criteria("/t/dev_%x"))
+
+    assert sql.startswith("instances.compartment_path_cache = ")
+    assert params == ["/t/dev_%x", "//t//dev/_/%x//"]
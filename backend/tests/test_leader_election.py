@@ -0,0 +1,40 @@
+import zlib
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.leader_election import LEADER_JOBS, _LOCK_NAMESPACE, _keepalive_connect_args, lock_key
+
+_INT4_MAX = 2**31 - 1
+
+
+@pytest.mark.parametrize("job", LEADER_JOBS)
+def test_lock_key_is_stable_and_fits_int4(job):
+    # Outro processo (ou outra versão do Python) precisa chegar à mesma chave
+    assert lock_key(job) == zlib.crc32(job.encode("utf-8")) & 0x7FFFFFFF
+    assert 0 <= lock_key(job) <= _INT4_MAX
+
+
+def test_each_job_has_its_own_lock():
+    assert len({lock_key(job) for job in LEADER_JOBS}) == len(LEADER_JOBS)
+
+
+def test_lock_namespace_fits_int4():
+    assert 0 <= _LOCK_NAMESPACE <= _INT4_MAX
+
+
+def test_keepalive_applies_the_settings_on_both_sides(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "LEADER_KEEPALIVE_IDLE_SECONDS", 7)
+    monkeypatch.setattr(settings, "LEADER_KEEPALIVE_INTERVAL_SECONDS", 2)
+    monkeypatch.setattr(settings, "LEADER_KEEPALIVE_COUNT", 4)
+
+    args = _keepalive_connect_args()
+
+    assert {name: args[name] for name in ("keepalives", "keepalives_idle", "keepalives_interval", "keepalives_count")} == {
+        "keepalives": 1,
+        "keepalives_idle": 7,
+        "keepalives_interval": 2,
+        "keepalives_count": 4,
+    }
+    assert args["options"] == "-c tcp_keepalives_idle=7 -c tcp_keepalives_interval=2 -c tcp_keepalives_count=4"
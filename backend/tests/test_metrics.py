@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.api import metrics as metrics_api
+from app.core.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(metrics_api.MetricsMiddleware)
+    app.include_router(metrics_api.router)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def _families(text: str) -> dict:
+    return {family.name: family for family in text_string_to_metric_families(text)}
+
+
+def _sample_value(family, name: str, **labels) -> float:
+    for sample in family.samples:
+        if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items()):
+            return sample.value
+    raise AssertionError(f"amostra {name} {labels} não encontrada")
+
+
+def test_metrics_endpoint_serves_prometheus_text_format(monkeypatch):
+    monkeypatch.setattr(metrics_api, "get_last_success_times", lambda db: {})
+    client = _client()
+
+    client.get("/items/1")
+    client.get("/items/2")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    families = _families(response.text)
+
+    requests = families["stopstart_http_requests"]
+    assert requests.type == "counter"
+    # Rota pelo template, não pelo path (uma série por rota)
+    assert _sample_value(
+        requests, "stopstart_http_requests_total", method="GET", route="/items/{item_id}", status="200"
+    ) >= 2
+
+    latency = families["stopstart_http_request_duration_seconds"]
+    assert latency.type == "histogram"
+    buckets = [
+        s for s in latency.samples
+        if s.name.endswith("_bucket") and s.labels.get("route") == "/items/{item_id}"
+    ]
+    counts = [s.value for s in buckets]
+    assert counts == sorted(counts)
+    assert buckets[-1].labels["le"] == "+Inf"
+    assert buckets[-1].value == _sample_value(
+        latency, "stopstart_http_request_duration_seconds_count", route="/items/{item_id}"
+    )
+
+    assert families["stopstart_http_requests_in_progress"].type == "gauge"
+    assert not any(name.endswith("_created") for name in families)
+
+
+def test_unmatched_route_has_a_fixed_label():
+    client = _client()
+
+    client.get("/does-not-exist/123")
+
+    families = _families(render_metrics().decode("utf-8"))
+    assert _sample_value(
+        families["stopstart_http_requests"],
+        "stopstart_http_requests_total",
+        route="<unmatched>",
+        status="404",
+    ) >= 1
+
+
+def test_sync_last_success_is_read_per_scrape(monkeypatch):
+    finished_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+    monkeypatch.setattr(metrics_api, "get_last_success_times", lambda db: {"ocid1.tenancy.oc1..x": finished_at})
+
+    families = _families(render_metrics().decode("utf-8"))
+
+    age = _sample_value(
+        families["stopstart_sync_last_success_age_seconds"],
+        "stopstart_sync_last_success_age_seconds",
+        tenancy="ocid1.tenancy.oc1..x",
+    )
+    assert 590 <= age <= 660
+    assert _sample_value(
+        families["stopstart_sync_last_success_timestamp_seconds"],
+        "stopstart_sync_last_success_timestamp_seconds",
+        tenancy="ocid1.tenancy.oc1..x",
+    ) == finished_at.timestamp()
+
+
+def test_sync_last_success_failure_does_not_break_the_scrape(monkeypatch):
+    def fail(db):
+        raise RuntimeError("banco fora do ar")
+
+    monkeypatch.setattr(metrics_api, "get_last_success_times", fail)
+
+    families = _families(render_metrics().decode("utf-8"))
+
+    assert families["stopstart_sync_last_success_age_seconds"].samples == []
+    assert "stopstart_http_requests" in families
+
+
+_WORKER = """
+from app.api.metrics import HTTP_IN_PROGRESS, HTTP_REQUESTS
+HTTP_REQUESTS.labels("GET", "/x", "200").inc(3)
+HTTP_IN_PROGRESS.labels("GET").inc()
+"""
+
+_SCRAPE = """
+from app.core.metrics import render_metrics
+import sys
+sys.stdout.write(render_metrics().decode("utf-8"))
+"""
+
+
+def _run(code: str, env: dict) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def test_multiprocess_mode_aggregates_all_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    # Dois "workers" gravam no mesmo diretório; um terceiro atende o scrape
+    _run(_WORKER, env)
+    _run(_WORKER, env)
+    families = _families(_run(_SCRAPE, env))
+
+    assert _sample_value(
+        families["stopstart_http_requests"], "stopstart_http_requests_total", route="/x"
+    ) == 6
+    # livesum: os workers acima terminaram sem mark_process_dead, então
+    # ainda contam (é o shutdown da API que os remove)
+    assert _sample_value(
+        families["stopstart_http_requests_in_progress"], "stopstart_http_requests_in_progress", method="GET"
+    ) == 2
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.oci_action_executor import (
+    STATUS_DISPATCHED,
+    STATUS_FAILED,
+    ActionReport,
+    ActionResult,
+    TokenBucket,
+    _percentile,
+)
+
+SCHEDULED = datetime(2026, 10, 15, 8, 0, tzinfo=timezone.utc)
+
+
+def _result(delay=None, status=STATUS_DISPATCHED):
+    return ActionResult(
+        instance_id=None,
+        action="START",
+        scheduled_at=SCHEDULED,
+        status=status,
+        dispatched_at=SCHEDULED + timedelta(seconds=delay) if delay is not None else None,
+    )
+
+
+# _percentile
+
+@pytest.mark.parametrize(
+    "size, pct, expected",
+    [(1, 50, 1), (2, 50, 1), (5, 50, 3), (10, 50, 5), (10, 95, 10), (20, 95, 19), (11, 95, 11)],
+)
+def test_percentile_is_nearest_rank(size, pct, expected):
+    assert _percentile(list(range(1, size + 1)), pct) == expected
+
+
+# ActionReport.dispatch_delays
+
+def test_dispatch_delays_ignore_results_that_were_not_sent():
+    report = ActionReport(
+        results=[_result(delay) for delay in (4.0, 1.0, 3.0, 2.0, 5.0)]
+        + [_result(status=STATUS_FAILED)]
+    )
+
+    assert report.dispatch_delays() == {"p50": 3.0, "p95": 5.0, "max": 5.0}
+    assert report.dispatched == 5
+
+
+def test_dispatch_delays_without_dispatches_is_empty():
+    assert ActionReport(results=[_result(status=STATUS_FAILED)]).dispatch_delays() == {}
+
+
+# TokenBucket
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 5)
+
+
+def test_token_bucket_serves_the_burst_without_waiting(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.services.oci_action_executor.time.monotonic", lambda: clock[0])
+    bucket = TokenBucket(rate=2.0, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_token_bucket_waits_for_the_next_token(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr("app.services.oci_action_executor.time.monotonic", lambda: clock[0])
+    monkeypatch.setattr("app.services.oci_action_executor.time.sleep", sleep)
+    bucket = TokenBucket(rate=4.0, capacity=1)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.25)
+    assert sleeps == [pytest.approx(0.25)]
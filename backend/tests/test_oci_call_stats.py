@@ -0,0 +1,131 @@
+import oci
+import pytest
+
+from app.services.oci_call_stats import OCICallRecorder, _outcome, _percentile, retry_callback
+
+
+def _service_error(status: int) -> oci.exceptions.ServiceError:
+    return oci.exceptions.ServiceError(status, "Code", {}, "mensagem")
+
+
+class _FakeCompute:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.region = "sa-saopaulo-1"
+
+    def list_instances(self, compartment_id):
+        if self.fail_with is not None:
+            raise self.fail_with
+        return [compartment_id]
+
+    def get_instance(self, instance_id):
+        return instance_id
+
+
+# _percentile
+
+def test_percentile_of_empty_list_is_zero():
+    assert _percentile([], 50) == 0.0
+
+
+@pytest.mark.parametrize("pct", [0, 50, 95, 99, 100])
+def test_percentile_of_single_value_is_that_value(pct):
+    assert _percentile([0.3], pct) == 0.3
+
+
+@pytest.mark.parametrize(
+    "pct, expected",
+    [(0, 1), (1, 1), (10, 1), (11, 2), (50, 5), (51, 6), (90, 9), (95, 10), (99, 10), (100, 10)],
+)
+def test_percentile_is_nearest_rank(pct, expected):
+    # Nearest-rank: menor valor com ao menos pct% das amostras <= ele
+    assert _percentile(list(range(1, 11)), pct) == expected
+
+
+def test_percentile_never_interpolates():
+    assert _percentile([1.0, 2.0], 50) == 1.0
+    assert _percentile([1.0, 2.0], 75) == 2.0
+
+
+# _outcome
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (None, "ok"),
+        (_service_error(429), "throttled"),
+        (_service_error(500), "server_error"),
+        (_service_error(503), "server_error"),
+        (_service_error(404), "error"),
+        (TimeoutError(), "error"),
+    ],
+)
+def test_outcome(error, expected):
+    assert _outcome(error) == expected
+
+
+# OCICallRecorder
+
+def test_recorder_counts_calls_pages_and_errors_per_operation():
+    recorder = OCICallRecorder()
+    compute = recorder.wrap(_FakeCompute(), "compute")
+
+    compute.list_instances("c1")
+    compute.list_instances("c2")
+    compute.get_instance("i1")
+    recorder.record("compute", "list_instances", 0.5, _service_error(429))
+    recorder.record("compute", "list_instances", 0.5, _service_error(502))
+    recorder.record("compute", "list_instances", 0.5, _service_error(400))
+
+    summary = recorder.summary()
+    assert list(summary) == ["compute.get_instance", "compute.list_instances"]
+    listed = summary["compute.list_instances"]
+    # Só as respostas com sucesso de operações paginadas contam como página
+    assert (listed.calls, listed.pages) == (5, 2)
+    assert (listed.throttled, listed.server_errors, listed.errors) == (1, 1, 1)
+    assert listed.p99_ms == 500.0
+    got = summary["compute.get_instance"]
+    assert (got.calls, got.pages) == (1, 0)
+
+
+def test_wrapped_client_reraises_and_records_the_failure():
+    recorder = OCICallRecorder()
+    compute = recorder.wrap(_FakeCompute(fail_with=_service_error(429)), "compute")
+
+    with pytest.raises(oci.exceptions.ServiceError):
+        compute.list_instances("c1")
+
+    listed = recorder.summary()["compute.list_instances"]
+    assert (listed.calls, listed.pages, listed.throttled) == (1, 0, 1)
+
+
+def test_wrap_passes_attributes_through_and_does_not_wrap_twice():
+    recorder = OCICallRecorder()
+    compute = recorder.wrap(_FakeCompute(), "compute")
+
+    assert compute.region == "sa-saopaulo-1"
+    assert recorder.wrap(compute, "compute") is compute
+    assert recorder.summary() == {}
+
+
+def test_retry_callback_records_retries_of_instrumented_clients_only():
+    recorder = OCICallRecorder()
+    compute = recorder.wrap(_FakeCompute(), "compute")
+
+    on_retry = retry_callback(compute, "list_instances")
+    on_retry(1, _service_error(429))
+    on_retry(2, _service_error(429))
+
+    assert recorder.summary()["compute.list_instances"].retries == 2
+    assert retry_callback(_FakeCompute(), "list_instances") is None
+
+
+def test_summary_is_a_snapshot():
+    recorder = OCICallRecorder()
+    recorder.record("identity", "list_compartments", 0.1)
+
+    first = recorder.summary()["identity.list_compartments"]
+    recorder.record("identity", "list_compartments", 0.1)
+
+    assert first.calls == 1
+    assert recorder.summary()["identity.list_compartments"].calls == 2
@@ -0,0 +1,165 @@
+import sys
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+
+from app.core.config import get_settings
+from app.services import oci_inventory_sync
+from app.services.oci_inventory_sync import (
+    _compartment_values,
+    _content_hash,
+    _current_rss_bytes,
+    _instance_values,
+    _resolve_commit_mode,
+)
+
+COMPARTMENT_ID = UUID("3f1c2a9d-0000-4000-8000-000000000001")
+
+
+def _instance(**overrides):
+    values = dict(
+        id="ocid1.instance.oc1..a",
+        compartment_id="ocid1.compartment.oc1..c",
+        display_name="web-01",
+        availability_domain="AD-1",
+        lifecycle_state="RUNNING",
+        shape="VM.Standard.E4.Flex",
+        hostname_label="web01",
+        image_id="ocid1.image.oc1..i",
+        freeform_tags={"Env": "prod", "Team": "ops"},
+        defined_tags={"Fin": {"CostCenter": "42", "Owner": "ana"}},
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _instance_hash(inst, path="/tenancy/app") -> str:
+    return _instance_values(inst, "sa-saopaulo-1", COMPARTMENT_ID, path)["content_hash"]
+
+
+# _content_hash
+
+def test_hash_ignores_dict_key_order():
+    first = {"tags": {"a": "1", "b": {"x": "1", "y": "2"}}}
+    second = {"tags": {"b": {"y": "2", "x": "1"}, "a": "1"}}
+
+    assert _content_hash(first, ["tags"]) == _content_hash(second, ["tags"])
+
+
+def test_hash_only_covers_the_listed_fields():
+    values = {"name": "a", "is_active": True}
+
+    assert _content_hash(values, ["name"]) == _content_hash({**values, "is_active": False}, ["name"])
+    assert _content_hash(values, ["name"]) != _content_hash({**values, "name": "b"}, ["name"])
+
+
+def test_hash_distinguishes_none_from_empty_and_values_between_fields():
+    assert _content_hash({"a": None}, ["a"]) != _content_hash({"a": ""}, ["a"])
+    assert _content_hash({"a": None}, ["a"]) != _content_hash({"a": {}}, ["a"])
+    assert _content_hash({"a": "x", "b": ""}, ["a", "b"]) != _content_hash({"a": "", "b": "x"}, ["a", "b"])
+
+
+def test_hash_accepts_non_json_values():
+    assert len(_content_hash({"id": COMPARTMENT_ID}, ["id"])) == 64
+
+
+# _instance_values / _compartment_values
+
+def test_instance_hash_is_stable_across_tag_order():
+    reordered = _instance(
+        freeform_tags={"Team": "ops", "Env": "prod"},
+        defined_tags={"Fin": {"Owner": "ana", "CostCenter": "42"}},
+    )
+
+    assert _instance_hash(reordered) == _instance_hash(_instance())
+
+
+def test_instance_hash_changes_with_synced_fields():
+    base = _instance_hash(_instance())
+
+    assert _instance_hash(_instance(lifecycle_state="STOPPED")) != base
+    assert _instance_hash(_instance(freeform_tags={"Env": "dev", "Team": "ops"})) != base
+
+
+def test_instance_hash_ignores_the_compartment_path_cache():
+    # Renomear/mover o compartment não deve reescrever as instâncias abaixo dele
+    assert _instance_hash(_instance(), "/tenancy/novo-nome") == _instance_hash(_instance())
+
+
+def test_instance_without_optional_attributes():
+    inst = _instance()
+    del inst.hostname_label, inst.freeform_tags
+
+    values = _instance_values(inst, "sa-saopaulo-1", COMPARTMENT_ID, "/tenancy/app")
+
+    assert values["hostname"] is None
+    assert values["freeform_tags"] is None
+    assert len(values["content_hash"]) == 64
+
+
+def test_compartment_hash_changes_with_path():
+    node = {
+        "compartment_ocid": "ocid1.compartment.oc1..c",
+        "name": "app",
+        "parent_ocid": "ocid1.tenancy.oc1..t",
+        "path": "/tenancy/app",
+        "is_tenancy_root": False,
+    }
+
+    values = _compartment_values("ocid1.tenancy.oc1..t", node)
+    moved = _compartment_values("ocid1.tenancy.oc1..t", {**node, "path": "/tenancy/outro/app"})
+
+    assert values["description"] is None
+    assert values["content_hash"] != moved["content_hash"]
+
+
+# _resolve_commit_mode
+
+def test_commit_mode_defaults_to_the_setting(monkeypatch):
+    monkeypatch.setattr(get_settings(), "OCI_SYNC_COMMIT_MODE", "compartment")
+
+    assert _resolve_commit_mode(None, "list") == "compartment"
+    assert _resolve_commit_mode("run", "list") == "run"
+
+
+@pytest.mark.parametrize("source", ["list", "search"])
+def test_run_mode_works_with_any_source(source):
+    assert _resolve_commit_mode("run", source) == "run"
+
+
+def test_unknown_commit_mode_is_rejected():
+    with pytest.raises(ValueError, match="Modo de commit desconhecido"):
+        _resolve_commit_mode("batch", "list")
+
+
+def test_compartment_mode_requires_the_list_source(monkeypatch):
+    with pytest.raises(ValueError, match='exige a fonte de inventário "list"'):
+        _resolve_commit_mode("compartment", "search")
+
+    # Também quando o modo vem da configuração
+    monkeypatch.setattr(get_settings(), "OCI_SYNC_COMMIT_MODE", "compartment")
+    with pytest.raises(ValueError, match='exige a fonte de inventário "list"'):
+        _resolve_commit_mode(None, "search")
+
+
+# _current_rss_bytes
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="lê /proc/self/statm")
+def test_current_rss_follows_allocations():
+    before = _current_rss_bytes()
+    block = bytearray(64 * 1024 * 1024)
+
+    assert before > 0
+    assert _current_rss_bytes() >= before + 32 * 1024 * 1024
+    del block
+
+
+def test_current_rss_without_proc_is_zero(monkeypatch):
+    def no_proc(*args, **kwargs):
+        raise FileNotFoundError("/proc/self/statm")
+
+    # Só o open() do módulo: o resto do processo continua lendo arquivos
+    monkeypatch.setattr(oci_inventory_sync, "open", no_proc, raising=False)
+
+    assert _current_rss_bytes() == 0
@@ -0,0 +1,103 @@
+import oci
+import pytest
+
+from app.services import oci_retry
+from app.services.oci_retry import call_with_backoff, is_server_error, is_throttle_error
+
+
+def _service_error(status: int) -> oci.exceptions.ServiceError:
+    return oci.exceptions.ServiceError(status, "Code", {}, "mensagem")
+
+
+class _Flaky:
+    """Falha com os erros informados, na ordem, e depois responde ``"ok"``."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays pedidos a time.sleep; o jitter devolve sempre o teto do intervalo."""
+    recorded = []
+    monkeypatch.setattr(oci_retry.time, "sleep", recorded.append)
+    monkeypatch.setattr(oci_retry.random, "uniform", lambda low, high: high)
+    return recorded
+
+
+def test_error_classification():
+    assert is_throttle_error(_service_error(429))
+    assert not is_throttle_error(_service_error(503))
+    assert is_server_error(_service_error(500))
+    assert is_server_error(_service_error(599))
+    assert not is_server_error(_service_error(429))
+    assert not is_throttle_error(TimeoutError())
+    assert not is_server_error(TimeoutError())
+
+
+def test_success_is_not_retried(sleeps):
+    fn = _Flaky()
+
+    assert call_with_backoff(fn, "a", page="x") == "ok"
+    assert fn.calls == [(("a",), {"page": "x"})]
+    assert sleeps == []
+
+
+def test_throttling_is_retried_with_exponential_backoff(sleeps):
+    fn = _Flaky(_service_error(429), _service_error(429), _service_error(429))
+    retries = []
+
+    result = call_with_backoff(
+        fn, base_delay=0.5, on_retry=lambda attempt, exc: retries.append((attempt, exc.status))
+    )
+
+    assert result == "ok"
+    assert len(fn.calls) == 4
+    assert sleeps == [0.5, 1.0, 2.0]
+    assert retries == [(1, 429), (2, 429), (3, 429)]
+
+
+def test_backoff_is_capped_at_max_delay(sleeps):
+    fn = _Flaky(*[_service_error(429)] * 5)
+
+    call_with_backoff(fn, base_delay=1.0, max_delay=3.0)
+
+    assert sleeps == [1.0, 2.0, 3.0, 3.0, 3.0]
+
+
+def test_gives_up_after_max_retries(sleeps):
+    fn = _Flaky(*[_service_error(429)] * 3)
+
+    with pytest.raises(oci.exceptions.ServiceError) as info:
+        call_with_backoff(fn, max_retries=2)
+
+    assert info.value.status == 429
+    assert len(fn.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_server_errors_are_retried_only_when_asked(sleeps):
+    with pytest.raises(oci.exceptions.ServiceError):
+        call_with_backoff(_Flaky(_service_error(503)))
+    assert sleeps == []
+
+    assert call_with_backoff(_Flaky(_service_error(503)), retry_server_errors=True) == "ok"
+    assert len(sleeps) == 1
+
+
+@pytest.mark.parametrize("error", [_service_error(404), _service_error(400), TimeoutError()])
+def test_other_errors_propagate_immediately(sleeps, error):
+    fn = _Flaky(error)
+
+    with pytest.raises(type(error)):
+        call_with_backoff(fn, retry_server_errors=True)
+
+    assert len(fn.calls) == 1
+    assert sleeps == []
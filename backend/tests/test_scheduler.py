@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.scheduler import _cron_day_of_week, compute_next_fire_time, run_scheduler_tick
+
+UTC = timezone.utc
+
+
+class _FakeQuery:
+    """Cadeia mínima de ``db.query(...)`` usada por run_scheduler_tick."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def with_for_update(self, *args, **kwargs):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class _FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, *args, **kwargs):
+        return _FakeQuery(self.rows)
+
+    def flush(self):
+        pass
+
+
+def _schedule(start_at=None, stop_at=None, start="0 8 * * *", stop="0 20 * * *"):
+    return SimpleNamespace(
+        instance_id=uuid4(),
+        managed=True,
+        default_start_cron=start,
+        default_stop_cron=stop,
+        start_timezone="UTC",
+        stop_timezone="UTC",
+        next_start_at=start_at,
+        next_stop_at=stop_at,
+    )
+
+
+# compute_next_fire_time
+
+def test_next_fire_is_strictly_after_reference():
+    after = datetime(2026, 10, 15, 8, 0, tzinfo=UTC)
+
+    assert compute_next_fire_time("0 8 * * *", "UTC", after) == datetime(2026, 10, 16, 8, 0, tzinfo=UTC)
+
+
+def test_fractional_second_before_fire_keeps_the_fire():
+    after = datetime(2026, 10, 15, 7, 59, 59, 500000, tzinfo=UTC)
+
+    assert compute_next_fire_time("0 8 * * *", "UTC", after) == datetime(2026, 10, 15, 8, 0, tzinfo=UTC)
+
+
+def test_fractional_second_after_fire_skips_it():
+    after = datetime(2026, 10, 15, 8, 0, 0, 300000, tzinfo=UTC)
+
+    assert compute_next_fire_time("0 8 * * *", "UTC", after) == datetime(2026, 10, 16, 8, 0, tzinfo=UTC)
+
+
+def test_next_fire_is_evaluated_in_timezone_and_returned_in_utc():
+    after = datetime(2026, 10, 15, 12, 0, tzinfo=UTC)
+
+    fire = compute_next_fire_time("0 19 * * *", "America/Sao_Paulo", after)
+
+    assert fire == datetime(2026, 10, 15, 22, 0, tzinfo=UTC)
+    assert fire.tzinfo == UTC
+
+
+def test_empty_expression_has_no_fire():
+    assert compute_next_fire_time(None, "UTC", datetime.now(UTC)) is None
+    assert compute_next_fire_time("", "UTC", datetime.now(UTC)) is None
+
+
+@pytest.mark.parametrize(
+    "cron_expr, tz_name",
+    [("0 8 * *", "UTC"), ("0 8 * * 1", "Mars/Olympus"), ("0 25 * * *", "UTC"), ("0 8 * * 8", "UTC")],
+)
+def test_invalid_expression_or_timezone_raises_value_error(cron_expr, tz_name):
+    with pytest.raises(ValueError):
+        compute_next_fire_time(cron_expr, tz_name, datetime.now(UTC))
+
+
+# _cron_day_of_week
+
+@pytest.mark.parametrize(
+    "field, expected",
+    [
+        ("*", "*"),
+        ("0", "sun"),
+        ("7", "sun"),
+        ("1-5", "mon,tue,wed,thu,fri"),
+        ("0,6", "sun,sat"),
+        ("5-7", "sun,fri,sat"),
+        ("*/2", "sun,tue,thu,sat"),
+        ("1-5/2", "mon,wed,fri"),
+        ("mon-fri", "mon-fri"),
+    ],
+)
+def test_cron_day_of_week(field, expected):
+    assert _cron_day_of_week(field) == expected
+
+
+@pytest.mark.parametrize("field", ["8", "5-2", "-1"])
+def test_cron_day_of_week_rejects_out_of_range(field):
+    with pytest.raises(ValueError):
+        _cron_day_of_week(field)
+
+
+def test_weekday_expression_skips_the_weekend():
+    # Sexta-feira, 16/10/2026, depois das 08:00
+    after = datetime(2026, 10, 16, 9, 0, tzinfo=UTC)
+
+    assert compute_next_fire_time("0 8 * * 1-5", "UTC", after) == datetime(2026, 10, 19, 8, 0, tzinfo=UTC)
+
+
+def test_sunday_as_zero_fires_on_sunday():
+    after = datetime(2026, 10, 16, 9, 0, tzinfo=UTC)
+
+    assert compute_next_fire_time("0 8 * * 0", "UTC", after) == datetime(2026, 10, 18, 8, 0, tzinfo=UTC)
+
+
+# run_scheduler_tick
+
+def test_tick_emits_fires_within_the_misfire_grace():
+    now = datetime(2026, 10, 15, 8, 4, tzinfo=UTC)
+    schedule = _schedule(start_at=datetime(2026, 10, 15, 8, 0, tzinfo=UTC))
+
+    actions = run_scheduler_tick(_FakeSession([schedule]), now)
+
+    assert [(a.action, a.scheduled_at) for a in actions] == [("START", datetime(2026, 10, 15, 8, 0, tzinfo=UTC))]
+    assert schedule.next_start_at == datetime(2026, 10, 16, 8, 0, tzinfo=UTC)
+
+
+def test_tick_drops_fires_older_than_the_misfire_grace_but_reschedules_them():
+    now = datetime(2026, 10, 15, 8, 0, tzinfo=UTC) + timedelta(minutes=30)
+    schedule = _schedule(start_at=datetime(2026, 10, 15, 8, 0, tzinfo=UTC))
+
+    actions = run_scheduler_tick(_FakeSession([schedule]), now)
+
+    assert actions == []
+    assert schedule.next_start_at == datetime(2026, 10, 16, 8, 0, tzinfo=UTC)
+
+
+def test_tick_leaves_future_fires_untouched_and_sorts_actions():
+    now = datetime(2026, 10, 15, 20, 1, tzinfo=UTC)
+    late_stop = _schedule(stop_at=datetime(2026, 10, 15, 20, 0, tzinfo=UTC))
+    early_start = _schedule(
+        start_at=datetime(2026, 10, 15, 19, 58, tzinfo=UTC),
+        stop_at=datetime(2026, 10, 16, 20, 0, tzinfo=UTC),
+        start="58 19 * * *",
+    )
+
+    actions = run_scheduler_tick(_FakeSession([late_stop, early_start]), now)
+
+    assert [(a.instance_id, a.action) for a in actions] == [
+        (early_start.instance_id, "START"),
+        (late_stop.instance_id, "STOP"),
+    ]
+    assert early_start.next_stop_at == datetime(2026, 10, 16, 20, 0, tzinfo=UTC)
+
+
+def test_tick_disables_an_invalid_stored_cron():
+    now = datetime(2026, 10, 15, 8, 1, tzinfo=UTC)
+    schedule = _schedule(start_at=datetime(2026, 10, 15, 8, 0, tzinfo=UTC), start="bad cron")
+
+    actions = run_scheduler_tick(_FakeSession([schedule]), now)
+
+    assert [a.action for a in actions] == ["START"]
+    assert schedule.next_start_at is None
@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.instance_query import encode_cursor as encode_instance_cursor
+from app.services.sync_runs import decode_cursor, encode_cursor
+
+
+def _raw_cursor(payload) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "started_at",
+    [
+        datetime(2026, 10, 15, 3, 0, 0, 123456, tzinfo=timezone.utc),
+        datetime(2026, 10, 15, 0, 0, tzinfo=timezone(timedelta(hours=-3))),
+    ],
+)
+def test_cursor_round_trip_keeps_microseconds_and_offset(started_at):
+    run_id = uuid4()
+
+    decoded_at, decoded_id = decode_cursor(encode_cursor(started_at, run_id))
+
+    assert (decoded_at, decoded_id) == (started_at, run_id)
+    assert decoded_at.utcoffset() == started_at.utcoffset()
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(datetime(2026, 10, 15, tzinfo=timezone.utc), uuid4())
+
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "%%%",
+        _raw_cursor(["2026-10-15T03:00:00+00:00"]),
+        _raw_cursor(["ontem", str(uuid4())]),
+        _raw_cursor(["2026-10-15T03:00:00+00:00", "não-é-uuid"]),
+        _raw_cursor([1760497200, str(uuid4())]),
+        _raw_cursor({"started_at": "2026-10-15T03:00:00+00:00"}),
+    ],
+)
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        decode_cursor(cursor)
+
+
+def test_instance_listing_cursor_is_not_a_sync_run_cursor():
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        decode_cursor(encode_instance_cursor("web-01", uuid4()))